@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Measure the per-call overhead of the Python block gateway.
+
+The first part times the pointer to ndarray conversion alone, comparing
+the original pointer_to_ndarray against the per-port ndarray_cache.
+The second part runs a trivial Python sync_block in a flowgraph with a
+small upstream max_noutput_items, with and without the min_items hint.
+"""
+
+import sys
+import time
+import numpy
+from optparse import OptionParser
+from gnuradio import gr, blocks
+from gnuradio.gr import gateway
+from gnuradio.eng_option import eng_option
+
+class copy_block(gr.sync_block):
+    def __init__(self, min_items=None):
+        gr.sync_block.__init__(
+            self,
+            name = "copy",
+            in_sig = [numpy.complex64],
+            out_sig = [numpy.complex64],
+            min_items = min_items,
+        )
+        self.ncalls = 0
+
+    def work(self, input_items, output_items):
+        self.ncalls += 1
+        output_items[0][:] = input_items[0]
+        return len(output_items[0])
+
+def time_conversion(ncalls, nitems, naddrs):
+    dtype = numpy.dtype(numpy.complex64)
+    buf = numpy.zeros(nitems*naddrs, dtype)
+    addrs = [buf.ctypes.data + i*nitems*dtype.itemsize for i in range(naddrs)]
+
+    start = time.time()
+    for i in xrange(ncalls):
+        gateway.pointer_to_ndarray(addrs[i % naddrs], dtype, nitems)
+    old = (time.time() - start) / ncalls
+
+    cache = gateway.ndarray_cache(dtype)
+    start = time.time()
+    for i in xrange(ncalls):
+        cache(addrs[i % naddrs], nitems)
+    new = (time.time() - start) / ncalls
+
+    print "%24s: %8.2f us/call" % ("pointer_to_ndarray", old*1e6)
+    print "%24s: %8.2f us/call (%d buffer addresses, %.1fx)" % (
+        "ndarray_cache", new*1e6, naddrs, old/new)
+
+def time_flowgraph(nsamples, max_noutput_items, min_items):
+    tb = gr.top_block()
+    src = blocks.null_source(gr.sizeof_gr_complex)
+    head = blocks.head(gr.sizeof_gr_complex, int(nsamples))
+    head.set_max_noutput_items(max_noutput_items)
+    op = copy_block(min_items)
+    dst = blocks.null_sink(gr.sizeof_gr_complex)
+    tb.connect(src, head, op, dst)
+    start = time.time()
+    tb.run()
+    delta = time.time() - start
+    print "%24s: %8d calls, %8.2f us/call, %10.4g samples/sec" % (
+        "min_items=%s" % min_items, op.ncalls,
+        delta/max(op.ncalls, 1)*1e6, nsamples/delta)
+
+def main():
+    parser = OptionParser(option_class=eng_option)
+    parser.add_option("-c", "--calls", type="intx", default=100000,
+                      help="number of conversions to time [default=%default]")
+    parser.add_option("-i", "--items", type="intx", default=64,
+                      help="items per conversion [default=%default]")
+    parser.add_option("-N", "--nsamples", type="eng_float", default=4e6,
+                      help="samples through the flowgraph [default=%default]")
+    parser.add_option("-m", "--max-noutput-items", type="intx", default=64,
+                      help="max_noutput_items upstream of the Python block [default=%default]")
+    parser.add_option("", "--min-items", type="intx", default=4096,
+                      help="min_items hint for the second run [default=%default]")
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        sys.exit(1)
+
+    print "Pointer conversion, %d items:" % options.items
+    for naddrs in (1, 8):
+        time_conversion(options.calls, options.items, naddrs)
+
+    print "Python sync_block, max_noutput_items=%d:" % options.max_noutput_items
+    time_flowgraph(options.nsamples, options.max_noutput_items, None)
+    time_flowgraph(options.nsamples, options.max_noutput_items, options.min_items)
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
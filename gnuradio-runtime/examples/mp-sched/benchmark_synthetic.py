@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Sweep the synthetic.py flowgraph over npipes, nstages, ntaps,
+max_noutput_items and CPU affinity in this process, recording real
+time, samples/s, pseudo FLOPS and the per-block work time from the
+performance counters. Writes the results as JSON and, optionally,
+scaling plots.
+"""
+
+import sys
+import os
+import time
+import json
+import socket
+import platform
+import multiprocessing
+from optparse import OptionParser
+from gnuradio import gr, eng_notation
+from gnuradio.eng_option import eng_option
+import synthetic
+
+affinity_modes = ('none', 'pipe', 'stage', 'block')
+
+
+def parse_list(s):
+    """
+    Parse a list of integers like "1-4,8,16".
+    """
+    values = []
+    for field in s.split(','):
+        if '-' in field:
+            first, last = field.split('-')
+            values.extend(range(int(first), int(last) + 1))
+        else:
+            values.append(int(field))
+    return values
+
+
+def set_affinity(tb, mode, cores):
+    """
+    Pin the filter blocks of tb to the given cores:
+      none:  no affinity, the OS schedules all threads
+      pipe:  all stages of pipeline i on core i
+      stage: stage j of every pipeline on core j
+      block: the filter blocks round robin over the cores
+    (modulo the number of cores). Returns the core of each block,
+    indexed [pipe][stage], None when not pinned.
+    """
+    placement = []
+    k = 0
+    for i, pipe in enumerate(tb.pipes):
+        placement.append([])
+        for j, op in enumerate(pipe.stages):
+            core = {'none': None,
+                    'pipe': cores[i % len(cores)],
+                    'stage': cores[j % len(cores)],
+                    'block': cores[k % len(cores)]}[mode]
+            if core is not None:
+                op.set_processor_affinity([core])
+            placement[-1].append(core)
+            k += 1
+    return placement
+
+
+def block_stats(tb, placement, tps):
+    """
+    Returns the performance counters of every filter block; the work
+    times are converted to seconds.
+    """
+    stats = []
+    for i, pipe in enumerate(tb.pipes):
+        for j, op in enumerate(pipe.stages):
+            stats.append({
+                'name': op.alias(),
+                'pipe': i,
+                'stage': j,
+                'core': placement[i][j],
+                'work_time': op.pc_work_time_total() / tps,
+                'work_time_avg': op.pc_work_time_avg() / tps,
+                'noutput_items_avg': op.pc_noutput_items_avg(),
+                'nproduced_avg': op.pc_nproduced_avg(),
+                'input_buffers_full_avg': op.pc_input_buffers_full_avg(0),
+            })
+    return stats
+
+
+def run_one(npipes, nstages, ntaps, max_noutput_items, affinity, cores, nsamples):
+    tb = synthetic.top(npipes, nstages, nsamples, ntaps)
+    placement = set_affinity(tb, affinity, cores)
+    real, user, system = synthetic.measure(tb, max_noutput_items or 10000000)
+    blocks = block_stats(tb, placement, float(gr.high_res_timer_tps()))
+    work = sum(b['work_time'] for b in blocks)
+    return {
+        'npipes': npipes,
+        'nstages': nstages,
+        'ntaps': ntaps,
+        'max_noutput_items': max_noutput_items,
+        'affinity': affinity,
+        'nsamples': nsamples,
+        'real': real,
+        'user': user,
+        'sys': system,
+        'cpu_util': (user + system) / real,
+        'samples_per_sec': nsamples / real,
+        'flop': tb.flop,
+        'flops': tb.flop / real,
+        # without performance counters compiled in, all work times are 0
+        'work_time': work or None,
+        'blocks': blocks,
+    }
+
+
+def host_info():
+    cpu = platform.processor()
+    try:
+        for line in open('/proc/cpuinfo'):
+            if line.startswith('model name'):
+                cpu = line.split(':', 1)[1].strip()
+                break
+    except IOError:
+        pass
+    return {
+        'hostname': socket.gethostname(),
+        'cpu': cpu,
+        'ncores': multiprocessing.cpu_count(),
+        'platform': platform.platform(),
+        'gr_version': gr.version(),
+    }
+
+
+def best_runs(runs):
+    """
+    Returns the fastest of the repeated runs of each configuration, in
+    the order the configurations were run.
+    """
+    best = {}
+    order = []
+    for r in runs:
+        key = (r['ntaps'], r['max_noutput_items'], r['affinity'], r['npipes'], r['nstages'])
+        if key not in best:
+            order.append(key)
+            best[key] = r
+        elif r['real'] < best[key]['real']:
+            best[key] = r
+    return [best[k] for k in order]
+
+
+def plot_results(results, prefix):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        sys.stderr.write("Could not import Matplotlib (http://matplotlib.sourceforge.net/)\n")
+        return []
+
+    runs = best_runs(results['runs'])
+    groups = {}
+    for r in runs:
+        key = (r['ntaps'], r['max_noutput_items'], r['affinity'])
+        groups.setdefault(key, []).append(r)
+    title = "%s, %d cores" % (results['host']['cpu'], results['host']['ncores'])
+
+    def label(key):
+        ntaps, mnoi, affinity = key
+        return "%d taps, max_noutput_items %s, affinity %s" % (ntaps, mnoi or 'default', affinity)
+
+    written = []
+
+    # total throughput against the number of filter blocks
+    fig = plt.figure(figsize=(10, 7))
+    ax = fig.add_subplot(1, 1, 1)
+    for key in sorted(groups):
+        pts = sorted((r['npipes']*r['nstages'], r['flops']*1e-9) for r in groups[key])
+        ax.plot([p[0] for p in pts], [p[1] for p in pts], 'o-', label=label(key))
+    ax.set_xlabel("filter blocks (npipes x nstages)")
+    ax.set_ylabel("pseudo GFLOPS")
+    ax.set_title(title)
+    ax.grid(True)
+    ax.legend(loc='best', prop={'size': 'small'})
+    fig.savefig(prefix + "_flops.png")
+    written.append(prefix + "_flops.png")
+    plt.close(fig)
+
+    # speedup over one block, one plot per group and line per nstages
+    for n, key in enumerate(sorted(groups)):
+        fig = plt.figure(figsize=(10, 7))
+        ax = fig.add_subplot(1, 1, 1)
+        base = [r['flops'] for r in groups[key] if r['npipes'] == 1 and r['nstages'] == 1]
+        if not base:
+            plt.close(fig)
+            continue
+        for nstages in sorted(set(r['nstages'] for r in groups[key])):
+            pts = sorted((r['npipes'], r['flops']/base[0]) for r in groups[key]
+                         if r['nstages'] == nstages)
+            ax.plot([p[0] for p in pts], [p[1] for p in pts], 'o-',
+                    label="%d stages" % nstages)
+        ax.axhline(results['host']['ncores'], color='k', linestyle=':',
+                   label="number of cores")
+        ax.set_xlabel("npipes")
+        ax.set_ylabel("speedup over 1 pipe x 1 stage")
+        ax.set_title("%s\n%s" % (title, label(key)))
+        ax.grid(True)
+        ax.legend(loc='best', prop={'size': 'small'})
+        name = "%s_speedup_%d.png" % (prefix, n)
+        fig.savefig(name)
+        written.append(name)
+        plt.close(fig)
+
+    return written
+
+
+def main():
+    description = """%prog sweeps the synthetic.py flowgraph (npipes pipelines
+of nstages FIR filters) over the given parameters in this process, and writes
+the results, including the per-block work time from the performance counters,
+to a JSON file. Lists are given like 1-4,8,16. With --plot, scaling plots are
+written as PNG files (requires Matplotlib)."""
+    parser = OptionParser(option_class=eng_option, usage="%prog [options] output.json",
+                          description=description)
+    parser.add_option("-p", "--npipes", default="1,2,4,8",
+                      help="numbers of pipelines [default=%default]")
+    parser.add_option("-s", "--nstages", default="1,2,4,8",
+                      help="numbers of stages per pipeline [default=%default]")
+    parser.add_option("-t", "--ntaps", default="256",
+                      help="numbers of filter taps [default=%default]")
+    parser.add_option("-m", "--max-noutput-items", default="0",
+                      help="max_noutput_items values, 0 for the scheduler default [default=%default]")
+    parser.add_option("-a", "--affinity", default="none",
+                      help="affinity modes, of %s [default=%%default]" % (", ".join(affinity_modes),))
+    parser.add_option("-c", "--cores", default=None,
+                      help="cores to pin blocks to [default=all]")
+    parser.add_option("-N", "--nsamples", type="eng_float", default=1e6,
+                      help="samples through each pipeline per run [default=%default]")
+    parser.add_option("-r", "--repeat", type="int", default=3,
+                      help="runs of each configuration [default=%default]")
+    parser.add_option("", "--no-perf-counters", action="store_true", default=False,
+                      help="do not enable the performance counters")
+    parser.add_option("", "--plot", metavar="PREFIX", default=None,
+                      help="write scaling plots to PREFIX_*.png")
+    parser.add_option("-d", "--description", metavar="DESC", default=None,
+                      help="machine description, e.g., \"Dual quad-core Xeon 3 GHz\"")
+    (options, args) = parser.parse_args()
+    if len(args) != 1:
+        parser.print_help()
+        raise SystemExit, 1
+
+    npipes = parse_list(options.npipes)
+    nstages = parse_list(options.nstages)
+    ntaps = parse_list(options.ntaps)
+    mnoi = parse_list(options.max_noutput_items)
+    affinity = options.affinity.split(',')
+    for mode in affinity:
+        if mode not in affinity_modes:
+            parser.error("unknown affinity mode: %s" % mode)
+    if options.cores is None:
+        cores = range(multiprocessing.cpu_count())
+    else:
+        cores = parse_list(options.cores)
+
+    # the counters are only updated when enabled at flowgraph start
+    gr.prefs().set_bool('PerfCounters', 'on', not options.no_perf_counters)
+
+    results = {
+        'host': host_info(),
+        'description': options.description,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'command': sys.argv,
+        'perf_counters': not options.no_perf_counters,
+        'cores': cores,
+        'runs': [],
+    }
+
+    configs = [(p, s, t, m, a) for t in ntaps for m in mnoi for a in affinity
+               for p in npipes for s in nstages]
+    for n, (p, s, t, m, a) in enumerate(configs):
+        for i in range(options.repeat):
+            r = run_one(p, s, t, m, a, cores, options.nsamples)
+            r['repeat'] = i
+            results['runs'].append(r)
+            print "[%d/%d] npipes %3d nstages %3d ntaps %4d mnoi %6s affinity %-5s " \
+                  "real %7.3f cpu %5.2f %s samples/s %sFLOPS" % (
+                n + 1, len(configs), p, s, t, m or 'dflt', a, r['real'], r['cpu_util'],
+                eng_notation.num_to_str(r['samples_per_sec']),
+                eng_notation.num_to_str(r['flops']))
+            sys.stdout.flush()
+
+        # write as we go, so an interrupted sweep keeps its results
+        f = open(args[0] + '.tmp', 'w')
+        json.dump(results, f, indent=1, sort_keys=True)
+        f.close()
+        os.rename(args[0] + '.tmp', args[0])
+
+    if options.plot:
+        for name in plot_results(results, options.plot):
+            print "wrote", name
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        raise SystemExit, 128
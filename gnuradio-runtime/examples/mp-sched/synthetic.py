@@ -24,6 +24,7 @@ from gnuradio import blocks, filter
 from gnuradio.eng_option import eng_option
 from optparse import OptionParser
 import os
+import time
 
 
 class pipeline(gr.hier_block2):
@@ -36,62 +37,57 @@ class pipeline(gr.hier_block2):
                                 gr.io_signature(1, 1, gr.sizeof_float),
                                 gr.io_signature(0, 0, 0))
         taps = ntaps*[1.0/ntaps]
+        self.stages = []
         upstream = self
         for i in range(nstages):
             op = filter.fir_filter_fff(1, taps)
             self.connect(upstream, op)
+            self.stages.append(op)
             upstream = op
 
         self.connect(upstream, blocks.null_sink(gr.sizeof_float))
 
 
 class top(gr.top_block):
-    def __init__(self):
+    def __init__(self, npipes, nstages, nsamples, ntaps=256):
         gr.top_block.__init__(self)
 
-        default_nsamples = 10e6
-        parser=OptionParser(option_class=eng_option)
-        parser.add_option("-p", "--npipelines", type="intx", default=1,
-                          metavar="NPIPES", help="the number of pipelines to create (default=%default)")
-        parser.add_option("-s", "--nstages", type="intx", default=1,
-                          metavar="NSTAGES", help="the number of stages in each pipeline (default=%default)")
-        parser.add_option("-N", "--nsamples", type="eng_float", default=default_nsamples,
-                          help=("the number of samples to run through the graph (default=%s)" %
-                                (eng_notation.num_to_str(default_nsamples))))
-        parser.add_option("-m", "--machine-readable", action="store_true", default=False,
-                          help="enable machine readable output")
-
-        (options, args) = parser.parse_args()
-        if len(args) != 0:
-            parser.print_help()
-            raise SystemExit, 1
-
-        self.npipes = options.npipelines
-        self.nstages = options.nstages
-        self.nsamples = options.nsamples
-        self.machine_readable = options.machine_readable
-
-        ntaps = 256
+        self.npipes = npipes
+        self.nstages = nstages
+        self.nsamples = nsamples
+        self.ntaps = ntaps
+        self.machine_readable = False
 
         # Something vaguely like floating point ops
-        self.flop = 2 * ntaps * options.npipelines * options.nstages * options.nsamples
+        self.flop = 2 * ntaps * npipes * nstages * nsamples
 
         src = blocks.null_source(gr.sizeof_float)
-        head = blocks.head(gr.sizeof_float, int(options.nsamples))
+        head = blocks.head(gr.sizeof_float, int(nsamples))
         self.connect(src, head)
 
-        for n in range(options.npipelines):
-            self.connect(head, pipeline(options.nstages, ntaps))
+        self.pipes = []
+        for n in range(npipes):
+            pipe = pipeline(nstages, ntaps)
+            self.connect(head, pipe)
+            self.pipes.append(pipe)
 
 
-def time_it(tb):
+def measure(tb, max_noutput_items=10000000):
+    """
+    Run tb to completion; returns the real, user and system time taken.
+    """
     start = os.times()
-    tb.run()
+    start_real = time.time()
+    tb.run(max_noutput_items)
+    real = time.time() - start_real
     stop = os.times()
     delta = map((lambda a, b: a-b), stop, start)
-    user, sys, childrens_user, childrens_sys, real = delta
-    total_user = user + childrens_user
-    total_sys  = sys + childrens_sys
+    user, sys, childrens_user, childrens_sys, ticks = delta
+    return real, user + childrens_user, sys + childrens_sys
+
+
+def time_it(tb):
+    real, total_user, total_sys = measure(tb)
     if tb.machine_readable:
         print "%3d %3d %.3e %7.3f %7.3f %7.3f %7.3f %.6e %.3e" % (
             tb.npipes, tb.nstages, tb.nsamples, real, total_user, total_sys, (total_user+total_sys)/real, tb.flop, tb.flop/real)
@@ -107,10 +103,32 @@ def time_it(tb):
         print "pseudo_flop/real %s"    % (eng_notation.num_to_str(tb.flop/real),)
 
 
+def main():
+    default_nsamples = 10e6
+    parser=OptionParser(option_class=eng_option)
+    parser.add_option("-p", "--npipelines", type="intx", default=1,
+                      metavar="NPIPES", help="the number of pipelines to create (default=%default)")
+    parser.add_option("-s", "--nstages", type="intx", default=1,
+                      metavar="NSTAGES", help="the number of stages in each pipeline (default=%default)")
+    parser.add_option("-N", "--nsamples", type="eng_float", default=default_nsamples,
+                      help=("the number of samples to run through the graph (default=%s)" %
+                            (eng_notation.num_to_str(default_nsamples))))
+    parser.add_option("-m", "--machine-readable", action="store_true", default=False,
+                      help="enable machine readable output")
+
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        raise SystemExit, 1
+
+    tb = top(options.npipelines, options.nstages, options.nsamples)
+    tb.machine_readable = options.machine_readable
+    time_it(tb)
+
+
 if __name__ == "__main__":
     try:
-        tb = top()
-        time_it(tb)
+        main()
     except KeyboardInterrupt:
         raise SystemExit, 128
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Time pmt.to_python / pmt.to_pmt for uniform vectors and nested dicts.
+
+The uniform vector conversions are compared against the element by
+element path (init_*vector / *vector_elements) they replaced.
+"""
+
+import sys
+import time
+import numpy
+import pmt
+from optparse import OptionParser
+
+elementwise = {
+    numpy.dtype(numpy.float32): (pmt.init_f32vector, float, pmt.f32vector_elements),
+    numpy.dtype(numpy.complex64): (pmt.init_c32vector, complex, pmt.c32vector_elements),
+    numpy.dtype(numpy.uint8): (pmt.init_u8vector, int, pmt.u8vector_elements),
+}
+
+def elementwise_to_uvector(narr):
+    init, conv, elements = elementwise[narr.dtype]
+    return init(narr.size, map(conv, narr))
+
+def elementwise_to_numpy(narr, uvector):
+    init, conv, elements = elementwise[narr.dtype]
+    return numpy.array(elements(uvector), dtype=narr.dtype)
+
+def timeit(func, niter):
+    start = time.time()
+    for i in xrange(niter):
+        func()
+    return (time.time() - start) / niter
+
+def report(name, old, new):
+    if old is None:
+        print "%32s: %10.1f us" % (name, new*1e6)
+    else:
+        print "%32s: %10.1f us (elementwise %10.1f us, %5.1fx)" % (
+            name, new*1e6, old*1e6, old/new)
+
+def make_nested_dict(width, depth):
+    if depth == 0:
+        return dict(('k%d' % i, float(i)) for i in range(width))
+    return dict(('k%d' % i, make_nested_dict(width, depth - 1)) for i in range(width))
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-n", "--niter", type="int", default=20,
+                      help="iterations per measurement [default=%default]")
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        sys.exit(1)
+    niter = options.niter
+
+    for size in (1024, 65536):
+        for dtype in elementwise:
+            narr = numpy.arange(size).astype(dtype)
+            uvector = pmt.to_pmt(narr)
+            name = "%s[%d]" % (dtype.name, size)
+            report(name + " to_pmt",
+                   timeit(lambda: elementwise_to_uvector(narr), niter),
+                   timeit(lambda: pmt.to_pmt(narr), niter))
+            report(name + " to_python",
+                   timeit(lambda: elementwise_to_numpy(narr, uvector), niter),
+                   timeit(lambda: pmt.to_python(uvector), niter))
+
+    for width, depth in ((16, 1), (8, 3)):
+        d = make_nested_dict(width, depth)
+        p = pmt.to_pmt(d)
+        name = "dict %d wide, %d deep" % (width, depth + 1)
+        report(name + " to_pmt", None, timeit(lambda: pmt.to_pmt(d), niter))
+        report(name + " to_python", None, timeit(lambda: pmt.to_python(p), niter))
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+import sys
+import argparse
+import time
+from volk_test_funcs import *
+import volk_math, volk_types
+
+kernel_sets = {'math': volk_math.avail_tests,
+               'types': volk_types.avail_tests}
+
+def select_tests(sets, kernels):
+    '''
+    Returns the test functions of the given sets, restricted to the
+    given kernel names if any.
+    '''
+    tests = []
+    for s in sets:
+        for func in kernel_sets[s]:
+            if kernels and func.__name__ not in kernels:
+                continue
+            tests.append(func)
+    if kernels:
+        unknown = set(kernels) - set(f.__name__ for f in tests)
+        if unknown:
+            raise ValueError("Unknown kernels: {0}".format(", ".join(sorted(unknown))))
+    return tests
+
+def run(args):
+    tests = select_tests(args.sets, args.kernels)
+    sizes = [int(n) for n in args.nitems]
+
+    conn = create_connection(args.database)
+    create_run_tables(conn)
+    info = machine_info(args.source_dir)
+    run_id = new_run(conn, args.label, info, args.iterations, args.warmup)
+    print("Run {0} '{1}' on {2} ({3}), VOLK machine {4}".format(
+        run_id, args.label, info['hostname'], info['cpu'], info['volk_machine']))
+
+    for func in tests:
+        for N in sizes:
+            print("Running Test: {0} [{1:G} items]".format(func.__name__, N))
+            try:
+                tb = func(N)
+            except AttributeError:
+                print "\tCould not run test. Skipping."
+                break
+            t = timeit(tb, args.iterations, args.warmup)
+            insert_samples(conn, run_id, func.__name__, N, t)
+            print("\t{0:.6f} s (min {1:.6f} s)".format(scipy.mean(t), min(t)))
+
+def list_cmd(args):
+    conn = create_connection(args.database)
+    create_run_tables(conn)
+    for r in list_runs(conn):
+        print("{0:4d} {1:20s} {2} {3:3d} iters  {4} ({5})".format(
+            r['id'], r['label'],
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(r['date'])),
+            r['iters'], r['hostname'], r['cpu']))
+        print("     VOLK {0} machine {1}, GNU Radio {2}{3}".format(
+            r['volk_version'], r['volk_machine'], r['gr_version'],
+            r['git_rev'] and ", git " + r['git_rev'] or ""))
+
+def describe(r):
+    return "run {0} '{1}' ({2}, {3}, {4})".format(
+        r['id'], r['label'], r['hostname'], r['volk_machine'],
+        r['git_rev'] or r['gr_version'])
+
+def compare(args):
+    conn = create_connection(args.database)
+    create_run_tables(conn)
+    base = find_run(conn, args.base)
+    new = find_run(conn, args.new)
+    print("Baseline: " + describe(base))
+    print("Compared: " + describe(new))
+    if base['cpu'] != new['cpu'] or base['hostname'] != new['hostname']:
+        print("Warning: the runs were made on different machines")
+
+    res = compare_samples(get_samples(conn, base['id']),
+                          get_samples(conn, new['id']),
+                          args.alpha, args.threshold)
+    if not res:
+        raise ValueError("The runs have no kernels and sizes in common")
+
+    print("{0:24s} {1:>12s} {2:>12s} {3:>12s} {4:>8s} {5:>10s}".format(
+        "kernel", "nitems", "base (s)", "new (s)", "change", "p"))
+    for r in res:
+        print("{0:24s} {1:12G} {2:12.6f} {3:12.6f} {4:+7.1f}% {5:10.2g}{6}".format(
+            r['kernel'], r['nitems'], r['base'], r['new'], 100*r['change'],
+            r['p'], r['regression'] and "  SLOWER" or ""))
+
+    slower = [r for r in res if r['regression']]
+    print("{0} of {1} cases significantly slower (more than {2:g}%, p < {3:g})".format(
+        len(slower), len(res), 100*args.threshold, args.alpha))
+    return len(slower) and 1 or 0
+
+def main():
+    desc='Benchmark VOLK accelerated blocks into a results database \
+          that keeps every iteration together with the machine, VOLK \
+          machine and build it ran on, and compare two runs for \
+          statistically significant slowdowns. compare exits with \
+          status 1 when it finds one, so it can gate upgrades.'
+    parser = argparse.ArgumentParser(description=desc)
+    parser.add_argument('-D', '--database', type=str,
+                        default="volk_bench.db",
+                        help='Database file to store data in [default: %(default)s]')
+    sub = parser.add_subparsers()
+
+    p = sub.add_parser('run', help='Run a benchmark')
+    p.add_argument('-L', '--label', type=str, required=True,
+                   help='Label of the run, e.g. the VOLK version')
+    p.add_argument('--sets', type=str, nargs='+',
+                   choices=sorted(kernel_sets), default=sorted(kernel_sets),
+                   help='Kernel sets to run [default: %(default)s]')
+    p.add_argument('--kernels', type=str, nargs='+', default=None,
+                   help='Only run these kernels of the sets')
+    p.add_argument('-N', '--nitems', type=float, nargs='+',
+                   default=[1e7],
+                   help='Numbers of items per iteration [default: %(default)s]')
+    p.add_argument('-I', '--iterations', type=int,
+                   default=20,
+                   help='Number of timed iterations [default: %(default)s]')
+    p.add_argument('-W', '--warmup', type=int,
+                   default=2,
+                   help='Number of untimed iterations first [default: %(default)s]')
+    p.add_argument('--source-dir', type=str, default=None,
+                   help='Git tree to record the revision of')
+    p.set_defaults(func=run)
+
+    p = sub.add_parser('list', help='List the stored runs')
+    p.set_defaults(func=list_cmd)
+
+    p = sub.add_parser('compare', help='Compare two runs')
+    p.add_argument('base', help='Baseline run id or label (latest run)')
+    p.add_argument('new', help='Run id or label (latest run) to check')
+    p.add_argument('--alpha', type=float, default=0.01,
+                   help='Significance level [default: %(default)s]')
+    p.add_argument('--threshold', type=float, default=0.05,
+                   help='Relative slowdown to ignore [default: %(default)s]')
+    p.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    try:
+        sys.exit(args.func(args))
+    except (ValueError, KeyError), e:
+        sys.stderr.write("{0}\n".format(e.args[0]))
+        sys.exit(2)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -90,15 +90,15 @@ def run_tests(func, N, iters):
         print "\tCould not run test. Skipping."
         return None
 
-def main():
-    avail_tests = [multiply_const_cc,
-                   multiply_const_ff,
-                   multiply_cc,
-                   multiply_ff,
-                   add_ff,
-                   conjugate_cc,
-                   multiply_conjugate_cc]
+avail_tests = [multiply_const_cc,
+               multiply_const_ff,
+               multiply_cc,
+               multiply_ff,
+               add_ff,
+               conjugate_cc,
+               multiply_conjugate_cc]
 
+def main():
     desc='Time an operation to compare with other implementations. \
           This program runs a simple GNU Radio flowgraph to test a \
           particular math function, mostly to compare the  \
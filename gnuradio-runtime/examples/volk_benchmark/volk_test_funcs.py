@@ -2,7 +2,8 @@
 
 from gnuradio import gr
 from gnuradio import blocks
-import math, sys, os, time
+import math, sys, os, re, time
+import socket, platform, subprocess
 
 try:
     import scipy
@@ -16,12 +17,13 @@ except ImportError:
     sys.stderr.write("Unable to import sqlite3: requires Python 2.5\n")
     sys.exit(1)
 
-def execute(conn, cmd):
+def execute(conn, cmd, params=()):
     '''
     Executes the command cmd to the database opened in connection conn.
+    Values are passed in params and bound by sqlite, not formatted in.
     '''
     c = conn.cursor()
-    c.execute(cmd)
+    c.execute(cmd, params)
     conn.commit()
     c.close()
 
@@ -31,6 +33,15 @@ def create_connection(database):
     '''
     return sqlite3.connect(database)
 
+def check_tablename(tablename):
+    '''
+    Table names (the labels) cannot be bound as parameters, so only
+    plain identifiers are accepted.
+    '''
+    if not re.match(r'^[A-Za-z_][A-Za-z0-9_]*$', tablename):
+        raise ValueError("Invalid label '{0}': use letters, digits and _".format(tablename))
+    return tablename
+
 def new_table(conn, tablename):
     '''
     Create a new table for results.
@@ -39,7 +50,7 @@ def new_table(conn, tablename):
     '''
     cols = "kernel text, nitems int, iters int, avg real, var real, max real, min real"
     cmd = "create table if not exists {0} ({1})".format(
-        tablename, cols)
+        check_tablename(tablename), cols)
     execute(conn, cmd)
 
 def replace_results(conn, tablename, nitems, iters, res):
@@ -47,8 +58,8 @@ def replace_results(conn, tablename, nitems, iters, res):
     Inserts or replaces the results 'res' dictionary values into the table.
     This deletes all old entries of the kernel in this table.
     '''
-    cmd = "DELETE FROM {0} where kernel='{1}'".format(tablename, res["kernel"])
-    execute(conn, cmd)
+    cmd = "DELETE FROM {0} where kernel=?".format(check_tablename(tablename))
+    execute(conn, cmd, (res["kernel"],))
     insert_results(conn, tablename, nitems, iters, res)
 
 def insert_results(conn, tablename, nitems, iters, res):
@@ -56,16 +67,18 @@ def insert_results(conn, tablename, nitems, iters, res):
     Inserts the results dictionary values into the table.
     '''
     cols = "kernel, nitems, iters, avg, var, max, min"
-    cmd = "INSERT INTO {0} ({1}) VALUES ('{2}', {3}, {4}, {5}, {6}, {7}, {8})".format(
-        tablename, cols, res["kernel"], nitems, iters,
-        res["avg"], res["var"], res["max"], res["min"])
-    execute(conn, cmd)
+    cmd = "INSERT INTO {0} ({1}) VALUES (?, ?, ?, ?, ?, ?, ?)".format(
+        check_tablename(tablename), cols)
+    execute(conn, cmd, (res["kernel"], nitems, iters,
+                        res["avg"], res["var"], res["max"], res["min"]))
 
 def list_tables(conn):
     '''
-    Returns a list of all tables in the database.
+    Returns a list of all tables in the database, except the
+    benchmark run tables of volk_bench.py.
     '''
-    cmd = "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
+    cmd = "SELECT name FROM sqlite_master WHERE type='table' " \
+          "AND name NOT LIKE 'bench\\_%' ESCAPE '\\' ORDER BY name"
     c = conn.cursor()
     c.execute(cmd)
     t = c.fetchall()
@@ -77,7 +90,7 @@ def get_results(conn, tablename):
     '''
     Gets all results in tablename.
     '''
-    cmd = "SELECT * FROM {0}".format(tablename)
+    cmd = "SELECT * FROM {0}".format(check_tablename(tablename))
     c = conn.cursor()
     c.execute(cmd)
     fetched = c.fetchall()
@@ -91,8 +104,8 @@ def get_results(conn, tablename):
         r['iters']  = f[2]
         r['avg'] = f[3]
         r['var'] = f[4]
-        r['min'] = f[5]
-        r['max'] = f[6]
+        r['max'] = f[5]
+        r['min'] = f[6]
         res.append(r)
 
     return res
@@ -136,15 +149,20 @@ class helper(gr.top_block):
         for n in xrange(nsnks):
             self.connect((self.op,n), self.snks[n])
 
-def timeit(tb, iterations):
+def timeit(tb, iterations, warmup=0):
     '''
     Given a top block, this function times it for a number of
     iterations and stores the time in a list that is returned.
+    The first warmup runs are made but not timed.
     '''
     r = gr.enable_realtime_scheduling()
     if r != gr.RT_OK:
         print "Warning: failed to enable realtime scheduling"
 
+    for i in xrange(warmup):
+        tb.run()
+        tb.head.reset()
+
     times = []
     for i in xrange(iterations):
         start_time = time.time()
@@ -170,3 +188,170 @@ def format_results(kernel, times):
     return res
 
 
+
+######################################################################
+# Benchmark runs: every timed iteration is kept, together with the
+# machine and build it was measured on, so runs can be compared later.
+######################################################################
+
+def create_run_tables(conn):
+    '''
+    Create the tables used by volk_bench.py. A run is one invocation
+    of the benchmark; its samples are the individual iteration times.
+    '''
+    execute(conn, "create table if not exists bench_runs ("
+            "id integer primary key, label text, date real, "
+            "hostname text, cpu text, volk_machine text, volk_version text, "
+            "gr_version text, git_rev text, iters int, warmup int)")
+    execute(conn, "create table if not exists bench_samples ("
+            "run int references bench_runs(id), kernel text, "
+            "nitems int, time real)")
+    execute(conn, "create index if not exists bench_samples_run "
+            "on bench_samples (run, kernel, nitems)")
+
+def _command_output(cmd, cwd=None):
+    try:
+        p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE)
+        out = p.communicate()[0].strip()
+        if p.returncode == 0:
+            return out
+    except OSError:
+        pass
+    return None
+
+def cpu_name():
+    '''
+    Returns the processor model name.
+    '''
+    try:
+        for line in open('/proc/cpuinfo'):
+            if line.startswith('model name'):
+                return line.split(':', 1)[1].strip()
+    except IOError:
+        pass
+    return platform.processor() or platform.machine()
+
+def machine_info(source_dir=None):
+    '''
+    Returns a dictionary describing where the benchmark runs: host,
+    CPU, the VOLK machine in use and the versions of VOLK and GNU
+    Radio. With source_dir, the git revision of that tree is added.
+    '''
+    info = dict()
+    info['hostname'] = socket.gethostname()
+    info['cpu'] = cpu_name()
+    info['volk_machine'] = _command_output(['volk-config-info', '--machine'])
+    info['volk_version'] = _command_output(['volk-config-info', '--version'])
+    info['gr_version'] = gr.version()
+    info['git_rev'] = None
+    if source_dir is not None:
+        info['git_rev'] = _command_output(['git', 'describe', '--always',
+                                           '--dirty'], source_dir)
+    return info
+
+def new_run(conn, label, info, iters, warmup):
+    '''
+    Records a new run and returns its id.
+    '''
+    c = conn.cursor()
+    c.execute("INSERT INTO bench_runs (label, date, hostname, cpu, "
+              "volk_machine, volk_version, gr_version, git_rev, iters, warmup) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+              (label, time.time(), info['hostname'], info['cpu'],
+               info['volk_machine'], info['volk_version'],
+               info['gr_version'], info['git_rev'], iters, warmup))
+    conn.commit()
+    run = c.lastrowid
+    c.close()
+    return run
+
+def insert_samples(conn, run, kernel, nitems, times):
+    '''
+    Stores the iteration times of one kernel and size in a run.
+    '''
+    c = conn.cursor()
+    c.executemany("INSERT INTO bench_samples (run, kernel, nitems, time) "
+                  "VALUES (?, ?, ?, ?)",
+                  [(run, kernel, nitems, t) for t in times])
+    conn.commit()
+    c.close()
+
+def list_runs(conn):
+    '''
+    Returns all runs, oldest first, as dictionaries.
+    '''
+    c = conn.cursor()
+    c.execute("SELECT * FROM bench_runs ORDER BY id")
+    cols = [d[0] for d in c.description]
+    runs = [dict(zip(cols, r)) for r in c.fetchall()]
+    c.close()
+    return runs
+
+def find_run(conn, name):
+    '''
+    Returns the run with the given id, or the latest run with the
+    given label.
+    '''
+    runs = list_runs(conn)
+    for r in runs:
+        if str(r['id']) == name:
+            return r
+    for r in reversed(runs):
+        if r['label'] == name:
+            return r
+    raise KeyError("No run '{0}' in the database".format(name))
+
+def get_samples(conn, run):
+    '''
+    Returns the iteration times of a run in a dictionary keyed by
+    (kernel, nitems).
+    '''
+    c = conn.cursor()
+    c.execute("SELECT kernel, nitems, time FROM bench_samples WHERE run=?",
+              (run,))
+    samples = dict()
+    for kernel, nitems, t in c.fetchall():
+        samples.setdefault((kernel, nitems), []).append(t)
+    c.close()
+    return samples
+
+def welch_test(a, b):
+    '''
+    Two sided Welch's t-test for a difference of the means of the
+    samples a and b, which may have different variances. Returns the
+    p-value.
+    '''
+    import scipy.stats
+    na, nb = len(a), len(b)
+    va, vb = scipy.var(a, ddof=1)/na, scipy.var(b, ddof=1)/nb
+    if va + vb == 0:
+        return float(scipy.mean(a) == scipy.mean(b))
+    t = (scipy.mean(b) - scipy.mean(a)) / math.sqrt(va + vb)
+    df = (va + vb)**2 / (va**2/(na-1) + vb**2/(nb-1))
+    return 2*scipy.stats.t.sf(abs(t), df)
+
+def compare_samples(base, new, alpha=0.01, threshold=0.05):
+    '''
+    Compares the samples of two runs, as returned by get_samples, for
+    every (kernel, nitems) both have measured. A case is a regression
+    when the new mean is more than threshold (relative) slower and the
+    difference is significant at level alpha.
+
+    Returns a list of dictionaries with the kernel, nitems, both means,
+    the relative change, the p-value and the regression flag.
+    '''
+    res = list()
+    for key in sorted(set(base) & set(new)):
+        a, b = base[key], new[key]
+        if len(a) < 2 or len(b) < 2:
+            continue
+        r = dict()
+        r['kernel'], r['nitems'] = key
+        r['base'] = scipy.mean(a)
+        r['new'] = scipy.mean(b)
+        r['change'] = (r['new'] - r['base']) / r['base']
+        r['p'] = welch_test(a, b)
+        r['regression'] = bool(r['change'] > threshold and r['p'] < alpha)
+        res.append(r)
+    return res
@@ -108,21 +108,21 @@ def run_tests(func, N, iters):
         print "\tCould not run test. Skipping."
         return None
 
-def main():
-    avail_tests = [float_to_char,
-                   float_to_int,
-                   float_to_short,
-                   short_to_float,
-                   short_to_char,
-                   char_to_short,
-                   char_to_float,
-                   int_to_float,
-                   complex_to_float,
-                   complex_to_real,
-                   complex_to_imag,
-                   complex_to_mag,
-                   complex_to_mag_squared]
+avail_tests = [float_to_char,
+               float_to_int,
+               float_to_short,
+               short_to_float,
+               short_to_char,
+               char_to_short,
+               char_to_float,
+               int_to_float,
+               complex_to_float,
+               complex_to_real,
+               complex_to_imag,
+               complex_to_mag,
+               complex_to_mag_squared]
 
+def main():
     desc='Time an operation to compare with other implementations. \
           This program runs a simple GNU Radio flowgraph to test a \
           particular math function, mostly to compare the  \
@@ -147,6 +147,14 @@ namespace gr {
       return gr::block::output_multiple();
     }
 
+    int block__min_noutput_items(void) const {
+      return gr::block::min_noutput_items();
+    }
+
+    void block__set_min_noutput_items(int m) {
+      return gr::block::set_min_noutput_items(m);
+    }
+
     void block__consume(int which_input, int how_many_items) {
       return gr::block::consume(which_input, how_many_items);
     }
@@ -41,6 +41,53 @@ def pointer_to_ndarray(addr, dtype, nitems):
         }
     return numpy.asarray(array_like()).view(dtype.base)
 
+class _array_interface(object):
+    """
+    Reusable holder for an __array_interface__ dict.
+    numpy.asarray only needs the attribute, not a fresh class.
+    """
+    pass
+
+class ndarray_cache(object):
+    """
+    Per-port cache of the ndarray handed to work().
+
+    The dtype descriptors are computed once per port. When the scheduler
+    hands back the same buffer address, the previous view is reused
+    (sliced if fewer items were requested); otherwise only the data
+    pointer and shape of the cached interface are updated.
+    """
+
+    def __init__(self, dtype):
+        self._base = dtype.base
+        self._item_shape = dtype.shape
+        self._holder = _array_interface()
+        self._holder.__array_interface__ = {
+            'data' : (0, False),
+            'typestr' : dtype.base.str,
+            'descr' : dtype.base.descr,
+            'shape' : (0,) + dtype.shape,
+            'strides' : None,
+            'version' : 3
+        }
+        self._addr = None
+        self._nitems = 0
+        self._array = None
+
+    def __call__(self, addr, nitems):
+        if addr == self._addr and nitems <= self._nitems:
+            if nitems == self._nitems: return self._array
+            return self._array[:nitems]
+        iface = self._holder.__array_interface__
+        iface['data'] = (int(addr), False)
+        iface['shape'] = (nitems,) + self._item_shape
+        array = numpy.asarray(self._holder)
+        if array.dtype != self._base: array = array.view(self._base)
+        self._addr = addr
+        self._nitems = nitems
+        self._array = array
+        return array
+
 ########################################################################
 # Handler that does callbacks from C++
 ########################################################################
@@ -82,7 +129,7 @@ class msg_handler(gr.feval_p):
 ########################################################################
 class gateway_block(object):
 
-    def __init__(self, name, in_sig, out_sig, work_type, factor):
+    def __init__(self, name, in_sig, out_sig, work_type, factor, min_items=None):
 
         #ensure that the sigs are iterable dtypes
         def sig_to_dtype_sig(sig):
@@ -95,6 +142,10 @@ class gateway_block(object):
         self.__in_indexes = range(len(self.__in_sig))
         self.__out_indexes = range(len(self.__out_sig))
 
+        #one cached ndarray view per port, reused across work calls
+        self.__in_views = map(ndarray_cache, self.__in_sig)
+        self.__out_views = map(ndarray_cache, self.__out_sig)
+
         #convert the signatures into gr.io_signatures
         def sig_to_gr_io_sigv(sig):
             if not len(sig): return io_signature(0, 0, 0)
@@ -118,6 +169,9 @@ class gateway_block(object):
             setattr(self, attr.replace(prefix, ''), getattr(self.__gateway, attr))
         self.pop_msg_queue = lambda: gr.block_gw_pop_msg_queue_safe(self.__gateway)
 
+        #optional hint so work is called with larger batches
+        if min_items is not None: self.set_min_noutput_items(int(min_items))
+
     def to_basic_block(self):
         """
         Makes this block connectable by hier/top block python
@@ -128,57 +182,60 @@ class gateway_block(object):
         """
         Dispatch tasks according to the action type specified in the message.
         """
-        if self.__message.action == gr.block_gw_message_type.ACTION_GENERAL_WORK:
-            self.__message.general_work_args_return_value = self.general_work(
-
-                input_items=[pointer_to_ndarray(
-                    self.__message.general_work_args_input_items[i],
-                    self.__in_sig[i],
-                    self.__message.general_work_args_ninput_items[i]
-                ) for i in self.__in_indexes],
-
-                output_items=[pointer_to_ndarray(
-                    self.__message.general_work_args_output_items[i],
-                    self.__out_sig[i],
-                    self.__message.general_work_args_noutput_items
-                ) for i in self.__out_indexes],
+        message = self.__message
+        action = message.action
+        if action == gr.block_gw_message_type.ACTION_WORK:
+            #fetch each vector once, every attribute access converts it
+            ninput_items = message.work_args_ninput_items
+            noutput_items = message.work_args_noutput_items
+            in_addrs = message.work_args_input_items
+            out_addrs = message.work_args_output_items
+            in_views = self.__in_views
+            out_views = self.__out_views
+            message.work_args_return_value = self.work(
+                input_items=[in_views[i](in_addrs[i], ninput_items)
+                    for i in self.__in_indexes],
+                output_items=[out_views[i](out_addrs[i], noutput_items)
+                    for i in self.__out_indexes],
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_WORK:
-            self.__message.work_args_return_value = self.work(
-
-                input_items=[pointer_to_ndarray(
-                    self.__message.work_args_input_items[i],
-                    self.__in_sig[i],
-                    self.__message.work_args_ninput_items
-                ) for i in self.__in_indexes],
-
-                output_items=[pointer_to_ndarray(
-                    self.__message.work_args_output_items[i],
-                    self.__out_sig[i],
-                    self.__message.work_args_noutput_items
-                ) for i in self.__out_indexes],
+        elif action == gr.block_gw_message_type.ACTION_GENERAL_WORK:
+            ninput_items = message.general_work_args_ninput_items
+            noutput_items = message.general_work_args_noutput_items
+            in_addrs = message.general_work_args_input_items
+            out_addrs = message.general_work_args_output_items
+            in_views = self.__in_views
+            out_views = self.__out_views
+            message.general_work_args_return_value = self.general_work(
+                input_items=[in_views[i](in_addrs[i], ninput_items[i])
+                    for i in self.__in_indexes],
+                output_items=[out_views[i](out_addrs[i], noutput_items)
+                    for i in self.__out_indexes],
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_FORECAST:
+        elif action == gr.block_gw_message_type.ACTION_FORECAST:
+            #the vector arrives as a tuple, so forecast fills in a list
+            #that is handed back to the scheduler afterwards
+            ninput_items_required = list(message.forecast_args_ninput_items_required)
             self.forecast(
-                noutput_items=self.__message.forecast_args_noutput_items,
-                ninput_items_required=self.__message.forecast_args_ninput_items_required,
+                noutput_items=message.forecast_args_noutput_items,
+                ninput_items_required=ninput_items_required,
             )
+            message.forecast_args_ninput_items_required = ninput_items_required
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_START:
-            self.__message.start_args_return_value = self.start()
+        elif action == gr.block_gw_message_type.ACTION_START:
+            message.start_args_return_value = self.start()
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_STOP:
-            self.__message.stop_args_return_value = self.stop()
+        elif action == gr.block_gw_message_type.ACTION_STOP:
+            message.stop_args_return_value = self.stop()
 
     def forecast(self, noutput_items, ninput_items_required):
         """
         forecast is only called from a general block
         this is the default implementation
         """
-        for ninput_item in ninput_items_required:
-            ninput_item = noutput_items + self.history() - 1;
+        for i in range(len(ninput_items_required)):
+            ninput_items_required[i] = noutput_items + self.history() - 1
         return
 
     def general_work(self, *args, **kwargs):
@@ -203,41 +260,45 @@ class gateway_block(object):
 # Wrappers for the user to inherit from
 ########################################################################
 class basic_block(gateway_block):
-    def __init__(self, name, in_sig, out_sig):
+    def __init__(self, name, in_sig, out_sig, min_items=None):
         gateway_block.__init__(self,
             name=name,
             in_sig=in_sig,
             out_sig=out_sig,
             work_type=gr.GR_BLOCK_GW_WORK_GENERAL,
             factor=1, #not relevant factor
+            min_items=min_items,
         )
 
 class sync_block(gateway_block):
-    def __init__(self, name, in_sig, out_sig):
+    def __init__(self, name, in_sig, out_sig, min_items=None):
         gateway_block.__init__(self,
             name=name,
             in_sig=in_sig,
             out_sig=out_sig,
             work_type=gr.GR_BLOCK_GW_WORK_SYNC,
             factor=1,
+            min_items=min_items,
         )
 
 class decim_block(gateway_block):
-    def __init__(self, name, in_sig, out_sig, decim):
+    def __init__(self, name, in_sig, out_sig, decim, min_items=None):
         gateway_block.__init__(self,
             name=name,
             in_sig=in_sig,
             out_sig=out_sig,
             work_type=gr.GR_BLOCK_GW_WORK_DECIM,
             factor=decim,
+            min_items=min_items,
         )
 
 class interp_block(gateway_block):
-    def __init__(self, name, in_sig, out_sig, interp):
+    def __init__(self, name, in_sig, out_sig, interp, min_items=None):
         gateway_block.__init__(self,
             name=name,
             in_sig=in_sig,
             out_sig=out_sig,
             work_type=gr.GR_BLOCK_GW_WORK_INTERP,
             factor=interp,
+            min_items=min_items,
         )
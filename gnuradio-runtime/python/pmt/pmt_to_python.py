@@ -19,10 +19,9 @@
 
 try: import pmt_swig as pmt
 except: import pmt
+import struct
 import numpy
 
-# SWIG isn't taking in the #define PMT_NIL;
-# getting the singleton locally.
 PMT_NIL = pmt.get_PMT_NIL()
 
 #define missing
@@ -51,56 +50,84 @@ def pmt_from_vector(p):
     return v
 
 def pmt_to_dict(p):
+    #walk the a-list once instead of calling nth() per item
     d = dict()
     items = pmt.dict_items(p)
-    for i in range(pmt.length(items)):
-        pair = pmt.nth(i, items)
-        k = pmt.car(pair)
-        v = pmt.cdr(pair)
-        d[pmt_to_python(k)] = pmt_to_python(v)
+    while pmt.is_pair(items):
+        pair = pmt.car(items)
+        d[pmt_to_python(pmt.car(pair))] = pmt_to_python(pmt.cdr(pair))
+        items = pmt.cdr(items)
+    if not pmt.is_null(items):
+        raise ValueError("improper list in pmt dict")
     return d
 
 def pmt_from_dict(p):
+    #same a-list dict_add would build, without its per-key search
     d = pmt.make_dict()
     for k, v in p.iteritems():
-        #dict is immutable -> therefore pmt_dict_add returns the new dict
-        d = pmt.dict_add(d, python_to_pmt(k), python_to_pmt(v))
+        d = pmt.cons(pmt.cons(python_to_pmt(k), python_to_pmt(v)), d)
     return d
 
-numpy_mappings = {
-    numpy.dtype(numpy.float32): (pmt.init_f32vector, float, pmt.f32vector_elements, pmt.is_f32vector),
-    numpy.dtype(numpy.float64): (pmt.init_f64vector, float, pmt.f64vector_elements, pmt.is_f64vector),
-    numpy.dtype(numpy.complex64): (pmt.init_c32vector, complex, pmt.c32vector_elements, pmt.is_c32vector),
-    numpy.dtype(numpy.complex128): (pmt.init_c64vector, complex, pmt.c64vector_elements, pmt.is_c64vector),
-    numpy.dtype(numpy.int8): (pmt.init_s8vector, int, pmt.s8vector_elements, pmt.is_s8vector),
-    numpy.dtype(numpy.int16): (pmt.init_s16vector, int, pmt.s16vector_elements, pmt.is_s16vector),
-    numpy.dtype(numpy.int32): (pmt.init_s32vector, int, pmt.s32vector_elements, pmt.is_s32vector),
-#    numpy.dtype(numpy.int64): (pmt.init_s64vector, int, pmt.s64vector_elements, pmt.is_s64vector),
-    numpy.dtype(numpy.uint8): (pmt.init_u8vector, int, pmt.u8vector_elements, pmt.is_u8vector),
-    numpy.dtype(numpy.uint16): (pmt.init_u16vector, int, pmt.u16vector_elements, pmt.is_u16vector),
-    numpy.dtype(numpy.uint32): (pmt.init_u32vector, int, pmt.u32vector_elements, pmt.is_u32vector),
-#    numpy.dtype(numpy.uint64): (pmt.init_u64vector, int, pmt.u64vector_elements, pmt.is_u64vector),
-    numpy.dtype(numpy.byte): (pmt.init_u8vector, int, pmt.u8vector_elements, pmt.is_u8vector),
+def pmt_to_pair(p):
+    return (pmt_to_python(pmt.car(p)), pmt_to_python(pmt.cdr(p)))
+
+def pmt_from_pair(p):
+    return pmt.cons(python_to_pmt(p[0]), python_to_pmt(p[1]))
+
+def pmt_to_pair_or_dict(p):
+    #dicts are a-lists, so only try the dict form when it can be one
+    if pmt.is_pair(pmt.car(p)) and pmt.is_dict(pmt.cdr(p)):
+        try: return pmt_to_dict(p)
+        except: pass
+    return pmt_to_pair(p)
+
+########################################################################
+# Uniform vectors are converted through the pmt serial format so that
+# no Python object is created per element. The serialized form is
+#   PST_UNIFORM_VECTOR, uvi tag, u32 nitems, u8 npad, npad bytes, items
+# with all items big-endian, f32 widened to f64 and c32 to 2 x f64.
+########################################################################
+PST_UNIFORM_VECTOR = 0x0a
+UVI_SUBTYPE_MASK = 0x7f
+UVI_HEADER = struct.Struct('>BBIBB')
+
+numpy_mappings = { #numpy dtype: (uvi tag, serialized dtype)
+    numpy.dtype(numpy.uint8): (0x00, numpy.dtype('>u1')),
+    numpy.dtype(numpy.int8): (0x01, numpy.dtype('>i1')),
+    numpy.dtype(numpy.uint16): (0x02, numpy.dtype('>u2')),
+    numpy.dtype(numpy.int16): (0x03, numpy.dtype('>i2')),
+    numpy.dtype(numpy.uint32): (0x04, numpy.dtype('>u4')),
+    numpy.dtype(numpy.int32): (0x05, numpy.dtype('>i4')),
+    numpy.dtype(numpy.uint64): (0x06, numpy.dtype('>u8')),
+    numpy.dtype(numpy.int64): (0x07, numpy.dtype('>i8')),
+    numpy.dtype(numpy.float32): (0x08, numpy.dtype('>f8')),
+    numpy.dtype(numpy.float64): (0x09, numpy.dtype('>f8')),
+    numpy.dtype(numpy.complex64): (0x0a, numpy.dtype('>c16')),
+    numpy.dtype(numpy.complex128): (0x0b, numpy.dtype('>c16')),
 }
 
-uvector_mappings = dict([ (numpy_mappings[key][3], (numpy_mappings[key][2], key)) for key in numpy_mappings ])
+uvector_mappings = dict([ (numpy_mappings[key][0], (key, numpy_mappings[key][1])) for key in numpy_mappings ])
 
 def numpy_to_uvector(numpy_array):
     try:
-        mapping = numpy_mappings[numpy_array.dtype]
-        pc = map(mapping[1], numpy.ravel(numpy_array))
-        return mapping[0](numpy_array.size, pc)
+        utag, wire_dtype = numpy_mappings[numpy_array.dtype]
     except KeyError:
         raise ValueError("unsupported numpy array dtype for converstion to pmt %s"%(numpy_array.dtype))
+    header = UVI_HEADER.pack(PST_UNIFORM_VECTOR, utag, numpy_array.size, 1, 0)
+    data = numpy.ravel(numpy_array).astype(wire_dtype).tostring()
+    return pmt.deserialize_str(header + data)
 
 def uvector_to_numpy(uvector):
-	match = None
-	for test_func in uvector_mappings.keys():
-		if test_func(uvector):
-			match = uvector_mappings[test_func]
-			return numpy.array(match[0](uvector), dtype = match[1])
-	else:
-		raise ValueError("unsupported uvector data type for conversion to numpy array %s"%(uvector))
+    if not pmt.is_uniform_vector(uvector):
+        raise ValueError("unsupported uvector data type for conversion to numpy array %s"%(uvector))
+    s = pmt.serialize_str(uvector)
+    tag, utag, nitems, npad, _ = UVI_HEADER.unpack_from(s)
+    try:
+        dtype, wire_dtype = uvector_mappings[utag & UVI_SUBTYPE_MASK]
+    except KeyError:
+        raise ValueError("unsupported uvector data type for conversion to numpy array %s"%(uvector))
+    offset = UVI_HEADER.size - 1 + npad
+    return numpy.frombuffer(s, wire_dtype, nitems, offset).astype(dtype)
 
 type_mappings = ( #python type, check pmt type, to python, from python
     (None, pmt.is_null, lambda x: None, lambda x: PMT_NIL),
@@ -114,22 +141,49 @@ type_mappings = ( #python type, check pmt type, to python, from python
     (tuple, pmt.is_tuple, pmt_to_tuple, pmt_from_tuple),
     (list, pmt.is_vector, pmt_to_vector, pmt_from_vector),
     (dict, pmt.is_dict, pmt_to_dict, pmt_from_dict),
-    (tuple, pmt.is_pair, lambda x: (pmt_to_python(pmt.car(x)), pmt_to_python(pmt.cdr(x))), lambda x: pmt.cons(python_to_pmt(x[0]), python_to_pmt(x[1]))),
+    (tuple, pmt.is_pair, pmt_to_pair, pmt_from_pair),
     (numpy.ndarray, pmt.is_uniform_vector, uvector_to_numpy, numpy_to_uvector),
 )
 
+########################################################################
+# Dispatch tables. The pmt kinds below are mutually exclusive, apart
+# from null/dict/pair which are resolved in that order, so the first
+# matching check decides the conversion without a fallback scan.
+########################################################################
+to_python_dispatch = (
+    (pmt.is_null, lambda x: None),
+    (pmt.is_pair, pmt_to_pair_or_dict),
+    (pmt.is_uniform_vector, uvector_to_numpy),
+    (pmt.is_symbol, pmt.symbol_to_string),
+    (pmt.is_integer, pmt.to_long),
+    (pmt.is_real, pmt.to_double),
+    (pmt.is_bool, pmt.to_bool),
+    (pmt.is_complex, pmt.to_complex),
+    (pmt.is_uint64, lambda x: long(pmt.to_uint64(x))),
+    (pmt.is_tuple, pmt_to_tuple),
+    (pmt.is_vector, pmt_to_vector),
+)
+
+#python type -> from python, filled in lazily for subclasses
+#(reversed so the first mapping of a python type wins)
+from_python_dispatch = dict(
+    (python_type or type(None), from_python)
+    for python_type, pmt_check, to_python, from_python in reversed(type_mappings)
+)
+
 def pmt_to_python(p):
-    for python_type, pmt_check, to_python, from_python in type_mappings:
+    for pmt_check, to_python in to_python_dispatch:
         if pmt_check(p):
-            try:
-                return to_python(p)
-            except:
-                pass
+            return to_python(p)
     raise ValueError("can't convert %s type to pmt (%s)"%(type(p),p))
 
 def python_to_pmt(p):
+    try:
+        return from_python_dispatch[type(p)](p)
+    except KeyError:
+        pass
     for python_type, pmt_check, to_python, from_python in type_mappings:
-        if python_type is None:
-            if p == None: return from_python(p)
-        elif isinstance(p, python_type): return from_python(p)
+        if python_type is not None and isinstance(p, python_type):
+            from_python_dispatch[type(p)] = from_python
+            return from_python(p)
     raise ValueError("can't convert %s type to pmt (%s)"%(type(p),p))
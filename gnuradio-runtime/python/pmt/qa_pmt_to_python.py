@@ -42,6 +42,30 @@ class test_pmt_to_python(unittest.TestCase):
         self.assertTrue(nparr.dtype==narr.dtype)
         self.assertTrue(np.alltrue(nparr == narr))
 
+    def test_numpy_to_uvector_all_types(self):
+        import numpy as np
+        for dtype in pmt2py.numpy_mappings:
+            narr = (np.arange(-50, 50)*3).astype(dtype)
+            uvector = pmt2py.numpy_to_uvector(narr)
+            self.assertTrue(pmt.is_uniform_vector(uvector))
+            self.assertEqual(pmt.length(uvector), len(narr))
+            nparr = pmt2py.uvector_to_numpy(uvector)
+            self.assertEqual(nparr.dtype, narr.dtype)
+            self.assertTrue(np.alltrue(nparr == narr))
+        self.assertTrue(pmt.is_s64vector(pmt2py.numpy_to_uvector(np.zeros(3, np.int64))))
+        self.assertTrue(pmt.is_u64vector(pmt2py.numpy_to_uvector(np.zeros(3, np.uint64))))
+        self.assertEqual(len(pmt2py.uvector_to_numpy(pmt.make_f32vector(0, 0))), 0)
+
+    def test_nested_dict_and_pair(self):
+        import numpy as np
+        d = {'a': 1, 'b': {'c': 2.5, 'd': (1, 'x')}, 'e': [None, True]}
+        self.assertEqual(pmt.to_python(pmt.to_pmt(d)), d)
+        pdu = pmt.cons(pmt.to_pmt({'len': 3}), pmt.init_u8vector(3, [1, 2, 3]))
+        meta, data = pmt.to_python(pdu)
+        self.assertEqual(meta, {'len': 3})
+        self.assertEqual(list(data), [1, 2, 3])
+        self.assertEqual(pmt.to_python(pmt.cons(pmt.intern('k'), pmt.from_long(4))), ('k', 4))
+
 
 
 if __name__ == '__main__':
@@ -20,7 +20,10 @@
 # Boston, MA 02110-1301, USA.
 #
 
-import sys
+import os
+import bisect
+import tempfile
+import numpy
 from gnuradio import gr, blocks
 import pmt
 
@@ -51,132 +54,449 @@ ftype_to_size = {blocks.GR_FILE_BYTE: gr.sizeof_char,
                  blocks.GR_FILE_FLOAT: gr.sizeof_float,
                  blocks.GR_FILE_DOUBLE: gr.sizeof_double}
 
+ftype_to_dtype = {blocks.GR_FILE_BYTE: numpy.int8,
+                  blocks.GR_FILE_SHORT: numpy.int16,
+                  blocks.GR_FILE_INT: numpy.int32,
+                  blocks.GR_FILE_LONG: numpy.int32,
+                  blocks.GR_FILE_LONG_LONG: numpy.int64,
+                  blocks.GR_FILE_FLOAT: numpy.float32,
+                  blocks.GR_FILE_DOUBLE: numpy.float64}
+
+string_to_ftype = dict((v, k) for (k, v) in ftype_to_string.items())
+
+class metadata_error(RuntimeError):
+    """Invalid or corrupt metadata file."""
+    pass
+
+_not_found = pmt.intern("__parse_file_metadata_not_found__")
+
+def _header_ref(p, key):
+    r = pmt.dict_ref(p, pmt.intern(key), _not_found)
+    if(pmt.eq(r, _not_found)):
+        raise metadata_error("Could not find key '{0}': invalid or corrupt data file.".format(key))
+    return r
+
 def parse_header(p, VERBOSE=False):
-    dump = pmt.PMT_NIL
+    """
+    Parse a header dictionary into a dict of its fields.
 
+    Raises:
+        metadata_error if the header is not valid.
+    """
     info = dict()
 
     if(pmt.is_dict(p) is False):
-        sys.stderr.write("Header is not a PMT dictionary: invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise metadata_error("Header is not a PMT dictionary: invalid or corrupt data file.")
 
     # GET FILE FORMAT VERSION NUMBER
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("version"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("version"), dump)
-        version = pmt.to_long(r)
-        if(VERBOSE):
-            print "Version Number: {0}".format(version)
-    else:
-        sys.stderr.write("Could not find key 'version': invalid or corrupt data file.\n")
-        sys.exit(1)
+    version = pmt.to_long(_header_ref(p, "version"))
+    if(VERBOSE):
+        print "Version Number: {0}".format(version)
 
     # EXTRACT SAMPLE RATE
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("rx_rate"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("rx_rate"), dump)
-        samp_rate = pmt.to_double(r)
-        info["rx_rate"] = samp_rate
-        if(VERBOSE):
-            print "Sample Rate: {0:.2f} sps".format(samp_rate)
-    else:
-        sys.stderr.write("Could not find key 'sr': invalid or corrupt data file.\n")
-        sys.exit(1)
+    samp_rate = pmt.to_double(_header_ref(p, "rx_rate"))
+    info["rx_rate"] = samp_rate
+    if(VERBOSE):
+        print "Sample Rate: {0:.2f} sps".format(samp_rate)
 
     # EXTRACT TIME STAMP
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("rx_time"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("rx_time"), dump)
-        secs = pmt.tuple_ref(r, 0)
-        fracs = pmt.tuple_ref(r, 1)
-        secs = float(pmt.to_uint64(secs))
-        fracs = pmt.to_double(fracs)
-        t = secs + fracs
-        info["rx_time"] = t
-        if(VERBOSE):
-            print "Seconds: {0:.6f}".format(t)
-    else:
-        sys.stderr.write("Could not find key 'time': invalid or corrupt data file.\n")
-        sys.exit(1)
+    r = _header_ref(p, "rx_time")
+    secs = float(pmt.to_uint64(pmt.tuple_ref(r, 0)))
+    fracs = pmt.to_double(pmt.tuple_ref(r, 1))
+    t = secs + fracs
+    info["rx_time"] = t
+    if(VERBOSE):
+        print "Seconds: {0:.6f}".format(t)
 
     # EXTRACT ITEM SIZE
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("size"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("size"), dump)
-        dsize = pmt.to_long(r)
-        info["size"] = dsize
-        if(VERBOSE):
-            print "Item size: {0}".format(dsize)
-    else:
-        sys.stderr.write("Could not find key 'size': invalid or corrupt data file.\n")
-        sys.exit(1)
+    dsize = pmt.to_long(_header_ref(p, "size"))
+    info["size"] = dsize
+    if(VERBOSE):
+        print "Item size: {0}".format(dsize)
 
     # EXTRACT DATA TYPE
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("type"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("type"), dump)
-        dtype = pmt.to_long(r)
-        stype = ftype_to_string[dtype]
-        info["type"] = stype
-        if(VERBOSE):
-            print "Data Type: {0} ({1})".format(stype, dtype)
-    else:
-        sys.stderr.write("Could not find key 'type': invalid or corrupt data file.\n")
-        sys.exit(1)
+    dtype = pmt.to_long(_header_ref(p, "type"))
+    if(dtype not in ftype_to_string):
+        raise metadata_error("Unknown data type {0}: invalid or corrupt data file.".format(dtype))
+    stype = ftype_to_string[dtype]
+    info["type"] = stype
+    if(VERBOSE):
+        print "Data Type: {0} ({1})".format(stype, dtype)
 
     # EXTRACT COMPLEX
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("cplx"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("cplx"), dump)
-        cplx = pmt.to_bool(r)
-        info["cplx"] = cplx
-        if(VERBOSE):
-            print "Complex? {0}".format(cplx)
-    else:
-        sys.stderr.write("Could not find key 'cplx': invalid or corrupt data file.\n")
-        sys.exit(1)
+    cplx = pmt.to_bool(_header_ref(p, "cplx"))
+    info["cplx"] = cplx
+    if(VERBOSE):
+        print "Complex? {0}".format(cplx)
 
     # EXTRACT WHERE CURRENT SEGMENT STARTS
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("strt"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("strt"), dump)
-        seg_start = pmt.to_uint64(r)
-        info["hdr_len"] = seg_start
-        info["extra_len"] = seg_start - HEADER_LENGTH
-        info["has_extra"] = info["extra_len"] > 0
-        if(VERBOSE):
-            print "Header Length: {0} bytes".format(info["hdr_len"])
-            print "Extra Length:  {0}".format((info["extra_len"]))
-            print "Extra Header?  {0}".format(info["has_extra"])
-    else:
-        sys.stderr.write("Could not find key 'strt': invalid or corrupt data file.\n")
-        sys.exit(1)
+    seg_start = pmt.to_uint64(_header_ref(p, "strt"))
+    info["hdr_len"] = seg_start
+    info["extra_len"] = seg_start - HEADER_LENGTH
+    info["has_extra"] = info["extra_len"] > 0
+    if(VERBOSE):
+        print "Header Length: {0} bytes".format(info["hdr_len"])
+        print "Extra Length:  {0}".format((info["extra_len"]))
+        print "Extra Header?  {0}".format(info["has_extra"])
 
     # EXTRACT SIZE OF DATA
-    if(pmt.dict_has_key(p, pmt.string_to_symbol("bytes"))):
-        r = pmt.dict_ref(p, pmt.string_to_symbol("bytes"), dump)
-        nbytes = pmt.to_uint64(r)
-
-        nitems = nbytes/dsize
-        info["nitems"] = nitems
-        info["nbytes"] = nbytes
-
-        if(VERBOSE):
-            print "Size of Data: {0} bytes".format(nbytes)
-            print "              {0} items".format(nitems)
-    else:
-        sys.stderr.write("Could not find key 'size': invalid or corrupt data file.\n")
-        sys.exit(1)
+    nbytes = pmt.to_uint64(_header_ref(p, "bytes"))
+    if(dsize <= 0):
+        raise metadata_error("Invalid item size {0}: invalid or corrupt data file.".format(dsize))
+    nitems = nbytes/dsize
+    info["nitems"] = nitems
+    info["nbytes"] = nbytes
+    if(VERBOSE):
+        print "Size of Data: {0} bytes".format(nbytes)
+        print "              {0} items".format(nitems)
 
     return info
 
 # IF THERE IS EXTRA DATA, PULL OUT THE DICTIONARY AND PARSE IT
 def parse_extra_dict(p, info, VERBOSE=False):
+    """
+    Add the items of an extra header dictionary to info.
+
+    Raises:
+        metadata_error if the extra header is not valid.
+    """
     if(pmt.is_dict(p) is False):
-        sys.stderr.write("Extra header is not a PMT dictionary: invalid or corrupt data file.\n")
-        sys.exit(1)
+        raise metadata_error("Extra header is not a PMT dictionary: invalid or corrupt data file.")
 
     items = pmt.dict_items(p)
-    nitems = pmt.length(items)
-    for i in xrange(nitems):
-        item = pmt.nth(i, items)
+    while(pmt.is_pair(items)):
+        item = pmt.car(items)
         key = pmt.symbol_to_string(pmt.car(item))
         val = pmt.cdr(item)
         info[key] = val
         if(VERBOSE):
             print "{0}: {1}".format(key, val)
+        items = pmt.cdr(items)
+
+    return info
 
+def item_dtype(info):
+    """
+    Get the numpy dtype of one item from a parsed header. Items holding
+    more than one value (vectors, complex integers) get a subarray dtype.
+    """
+    base = numpy.dtype(ftype_to_dtype[string_to_ftype[info["type"]]])
+    if(info["cplx"]):
+        if(base == numpy.float32):
+            base = numpy.dtype(numpy.complex64)
+        elif(base == numpy.float64):
+            base = numpy.dtype(numpy.complex128)
+    if(info["size"] % base.itemsize):
+        raise metadata_error("Item size {0} is not a multiple of the {1} size.".format(
+            info["size"], info["type"]))
+    if(info["size"] == base.itemsize):
+        return base
+    return numpy.dtype((base, info["size"]/base.itemsize))
+
+def read_header(handle, offset=None):
+    """
+    Read and parse the header (and extra header) at the handle's position.
+
+    Returns:
+        the info dict, or None at the end of the file
+    Raises:
+        metadata_error if the header cannot be read.
+    """
+    if(offset is not None):
+        handle.seek(offset, 0)
+    header_str = handle.read(HEADER_LENGTH)
+    if(len(header_str) == 0):
+        return None
+    if(len(header_str) < HEADER_LENGTH):
+        raise metadata_error("Truncated header: invalid or corrupt data file.")
+    try:
+        header = pmt.deserialize_str(header_str)
+    except RuntimeError:
+        raise metadata_error("Could not deserialize header: invalid or corrupt data file.")
+    info = parse_header(header)
+    if(info["extra_len"] > 0):
+        extra_str = handle.read(info["extra_len"])
+        if(len(extra_str) < info["extra_len"]):
+            raise metadata_error("Truncated extra header: invalid or corrupt data file.")
+        try:
+            extra = pmt.deserialize_str(extra_str)
+        except RuntimeError:
+            raise metadata_error("Could not deserialize extras: invalid or corrupt data file.")
+        parse_extra_dict(extra, info)
     return info
+
+class file_metadata_reader(object):
+    """
+    Random access to a file_meta_sink capture.
+
+    The headers are walked once to build an index of the segments: where
+    each header and its data start, the number of items, rx_time and
+    rx_rate. The index is cached in <header file>.idx beside the capture
+    and reused while the header file keeps its size and time stamp.
+
+    The data is read through numpy.memmap views, per segment with
+    segment(), or as one logical sequence of items with len() and
+    slicing. time_to_index() finds the item at a time in O(log n).
+    """
+
+    index_dtype = numpy.dtype([("hdr_offset", "<u8"), ("data_offset", "<u8"),
+                               ("nitems", "<u8"), ("rx_time", "<f8"),
+                               ("rx_rate", "<f8")])
+
+    def __init__(self, filename, detached=False, hdr_filename=None, cache=True):
+        """
+        Args:
+            filename: the capture (the data file for detached headers)
+            detached: the headers are in a separate file
+            hdr_filename: the header file, filename + '.hdr' by default
+            cache: read and write the index cache file
+
+        Raises:
+            metadata_error if the capture is invalid, IOError if it cannot be read.
+        """
+        self.filename = filename
+        self.detached = detached
+        if(detached):
+            self.hdr_filename = hdr_filename or filename + ".hdr"
+        else:
+            self.hdr_filename = filename
+        self.index_filename = self.hdr_filename + ".idx"
+
+        st = os.stat(self.hdr_filename)
+        stamp = numpy.array([st.st_size, int(st.st_mtime*1e6), int(detached)], numpy.int64)
+        self.index = None
+        if(cache):
+            self.index = self._load_index(stamp)
+        if(self.index is None):
+            self.index = self._build_index()
+            if(cache):
+                self._save_index(stamp)
+
+        with open(self.hdr_filename, "rb") as handle:
+            self.info = read_header(handle) or dict()
+        self.dtype = self.info and item_dtype(self.info) or numpy.dtype(numpy.uint8)
+        self.starts = numpy.concatenate(([0], numpy.cumsum(self.index["nitems"], dtype=numpy.int64)))
+
+        data_size = os.path.getsize(self.filename)
+        ends = self.index["data_offset"] + self.index["nitems"]*self.dtype.itemsize
+        if(len(ends) and ends.max() > data_size):
+            raise metadata_error("Data file is shorter than its headers claim: truncated capture.")
+
+    def _build_index(self):
+        entries = []
+        data_offset = 0
+        with open(self.hdr_filename, "rb") as handle:
+            while(True):
+                hdr_offset = handle.tell()
+                info = read_header(handle)
+                if(info is None):
+                    break
+                if(not self.detached):
+                    data_offset = hdr_offset + info["hdr_len"]
+                entries.append((hdr_offset, data_offset, info["nitems"],
+                                info["rx_time"], info["rx_rate"]))
+                if(self.detached):
+                    data_offset += info["nbytes"]
+                else:
+                    handle.seek(data_offset + info["nbytes"], 0)
+        return numpy.array(entries, self.index_dtype)
+
+    def _load_index(self, stamp):
+        try:
+            cached = numpy.load(self.index_filename)
+            try:
+                if(numpy.array_equal(cached["stamp"], stamp)):
+                    return cached["index"].astype(self.index_dtype)
+            finally:
+                cached.close()
+        except Exception:
+            pass
+        return None
+
+    def _save_index(self, stamp):
+        # write to a temporary file and rename, so readers never see half an index
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.index_filename)))
+            with os.fdopen(fd, "wb") as f:
+                numpy.savez(f, stamp=stamp, index=self.index)
+            os.rename(tmp, self.index_filename)
+        except (IOError, OSError):
+            pass
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    def nsegments(self):
+        return len(self.index)
+
+    def segment(self, i):
+        """Get the items of segment i as a read only memmap."""
+        nitems = int(self.index["nitems"][i])
+        if(nitems == 0):
+            return numpy.empty(0, self.dtype)
+        return numpy.memmap(self.filename, self.dtype, "r",
+                            int(self.index["data_offset"][i]), (nitems,))
+
+    def segment_info(self, i):
+        """Get the full header of segment i, including the extra header items."""
+        with open(self.hdr_filename, "rb") as handle:
+            return read_header(handle, int(self.index["hdr_offset"][i]))
+
+    def find_segment(self, n):
+        """Get the segment holding logical item n."""
+        if(n < 0 or n >= len(self)):
+            raise IndexError("item {0} out of range".format(n))
+        return int(numpy.searchsorted(self.starts, n, "right")) - 1
+
+    def __getitem__(self, key):
+        """
+        Get logical items across segments. A range within one segment is
+        a memmap view, a range across segments a copy.
+        """
+        if(not isinstance(key, slice)):
+            if(key < 0): key += len(self)
+            seg = self.find_segment(key)
+            return self.segment(seg)[key - self.starts[seg]]
+        start, stop, step = key.indices(len(self))
+        if(step != 1):
+            # read the covered items in ascending order, then step
+            # through them, so a negative step starts at the top
+            n = len(xrange(start, stop, step))
+            if(n == 0):
+                return numpy.empty(0, self.dtype)
+            last = start + (n - 1)*step
+            return self[min(start, last):max(start, last) + 1][::step]
+        if(start >= stop):
+            return numpy.empty(0, self.dtype)
+        first = self.find_segment(start)
+        last = self.find_segment(stop - 1)
+        parts = [self.segment(seg) for seg in range(first, last + 1)]
+        parts[-1] = parts[-1][:stop - self.starts[last]]
+        parts[0] = parts[0][start - self.starts[first]:]
+        if(len(parts) == 1):
+            return parts[0]
+        return numpy.concatenate(parts)
+
+    def time_to_index(self, t):
+        """
+        Get the logical item at time t (seconds), using the rx_time and
+        rx_rate of the latest segment starting at or before t. A time
+        between two segments maps to the first item of the later one, a
+        time after the capture to len(self).
+        """
+        times = self.index["rx_time"]
+        seg = max(0, bisect.bisect_right(times, t) - 1)
+        offset = int((t - times[seg])*self.index["rx_rate"][seg])
+        offset = min(max(offset, 0), int(self.index["nitems"][seg]))
+        return int(self.starts[seg]) + offset
+
+    def pieces(self, start, stop):
+        """
+        Split the logical items [start, stop) at the segment boundaries.
+
+        Returns:
+            a list of (segment, first item, end item) in segment items
+        """
+        pieces = []
+        if(start >= stop):
+            return pieces
+        for seg in range(self.find_segment(start), self.find_segment(stop - 1) + 1):
+            lo = max(start - int(self.starts[seg]), 0)
+            hi = min(stop - int(self.starts[seg]), int(self.index["nitems"][seg]))
+            if(hi > lo):
+                pieces.append((seg, lo, hi))
+        return pieces
+
+def _copy_items(src_name, src_offset, dst, dtype, nitems, chunk_items=1<<20):
+    """Copy items from a file to an open file in chunks, through a memmap."""
+    if(nitems == 0):
+        return
+    src = numpy.memmap(src_name, dtype, "r", src_offset, (nitems,))
+    for i in xrange(0, nitems, chunk_items):
+        src[i:i + chunk_items].tofile(dst)
+    del src
+
+def extract_piece(job):
+    """
+    Copy part of one segment to an output file laid out by plan_extraction.
+    The header, if any, is the segment's own with rx_time moved to the
+    first copied item and bytes set to the copied size.
+
+    Args:
+        job: a tuple of (source data file, source header file, header
+            offset, data offset, item dtype, first item, end item, output
+            data file, output data offset, output header file or None,
+            output header offset)
+    """
+    (src_name, src_hdr_name, hdr_offset, data_offset, dtype, lo, hi,
+     out_name, out_offset, out_hdr_name, out_hdr_offset) = job
+    if(out_hdr_name is not None):
+        with open(src_hdr_name, "rb") as handle:
+            handle.seek(hdr_offset, 0)
+            header = pmt.deserialize_str(handle.read(HEADER_LENGTH))
+            info = parse_header(header)
+            extra_str = handle.read(info["extra_len"])
+        r = pmt.dict_ref(header, pmt.intern("rx_time"), pmt.PMT_NIL)
+        secs = pmt.to_uint64(pmt.tuple_ref(r, 0))
+        fracs = pmt.to_double(pmt.tuple_ref(r, 1)) + lo/info["rx_rate"]
+        secs += long(fracs)
+        fracs -= long(fracs)
+        header = pmt.dict_add(header, pmt.intern("rx_time"),
+                              pmt.make_tuple(pmt.from_uint64(secs), pmt.from_double(fracs)))
+        header = pmt.dict_add(header, pmt.intern("bytes"),
+                              pmt.from_uint64((hi - lo)*dtype.itemsize))
+        header_str = pmt.serialize_str(header)
+        if(len(header_str) != HEADER_LENGTH):
+            raise metadata_error("Updated header is {0} bytes instead of {1}.".format(
+                len(header_str), HEADER_LENGTH))
+        with open(out_hdr_name, "r+b") as out:
+            out.seek(out_hdr_offset, 0)
+            out.write(header_str)
+            out.write(extra_str)
+    with open(out_name, "r+b") as out:
+        out.seek(out_offset, 0)
+        _copy_items(src_name, data_offset + lo*dtype.itemsize, out, dtype, hi - lo)
+    return (hi - lo)*dtype.itemsize
+
+def plan_extraction(reader, start, stop, outfile, headers=True, detached=False):
+    """
+    Lay out the extraction of items [start, stop) of a capture and create
+    the output files at their final size.
+
+    Args:
+        reader: a file_metadata_reader
+        outfile: the output (data) file
+        headers: write a header per segment piece, as file_meta_sink does
+        detached: write the headers to outfile + '.hdr'
+
+    Returns:
+        a list of jobs for extract_piece
+    """
+    jobs = []
+    out_hdr_name = None
+    if(headers):
+        out_hdr_name = detached and outfile + ".hdr" or outfile
+    data_pos = hdr_pos = 0
+    for (seg, lo, hi) in reader.pieces(start, stop):
+        hdr_offset = int(reader.index["hdr_offset"][seg])
+        data_offset = int(reader.index["data_offset"][seg])
+        hdr_len = 0
+        if(headers):
+            with open(reader.hdr_filename, "rb") as handle:
+                hdr_len = read_header(handle, hdr_offset)["hdr_len"]
+        if(headers and not detached):
+            data_pos = hdr_pos + hdr_len
+        jobs.append((reader.filename, reader.hdr_filename, hdr_offset, data_offset,
+                     reader.dtype, lo, hi, outfile, data_pos, out_hdr_name, hdr_pos))
+        nbytes = (hi - lo)*reader.dtype.itemsize
+        if(headers and not detached):
+            hdr_pos = data_pos + nbytes
+        else:
+            hdr_pos += hdr_len
+            data_pos += nbytes
+    with open(outfile, "wb") as out:
+        out.truncate(headers and not detached and hdr_pos or data_pos)
+    if(headers and detached):
+        with open(out_hdr_name, "wb") as out:
+            out.truncate(hdr_pos)
+    return jobs
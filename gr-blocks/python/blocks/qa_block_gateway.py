@@ -24,6 +24,7 @@ import numpy
 import pmt
 
 from gnuradio import gr, gr_unittest, blocks
+from gnuradio.gr import gateway
 
 class add_2_f32_1_f32(gr.sync_block):
     def __init__(self):
@@ -194,6 +195,68 @@ class vector_to_stream(gr.interp_block):
 
         return len(output_items[0])
 
+class copy_f32(gr.sync_block):
+    def __init__(self, min_items=None):
+        gr.sync_block.__init__(
+            self,
+            name = "copy f32",
+            in_sig = [numpy.float32],
+            out_sig = [numpy.float32],
+            min_items = min_items
+        )
+
+    def work(self, input_items, output_items):
+        output_items[0][:] = input_items[0]
+        return len(output_items[0])
+
+class general_decim2x(gr.basic_block):
+    """
+    A decimator written as a general block, which needs its forecast
+    to get two input items for each output item.
+    """
+    def __init__(self):
+        gr.basic_block.__init__(
+            self,
+            name = "general decim2x",
+            in_sig = [numpy.float32],
+            out_sig = [numpy.float32],
+        )
+        self.short = False
+
+    def forecast(self, noutput_items, ninput_items_required):
+        ninput_items_required[0] = 2*noutput_items
+
+    def general_work(self, input_items, output_items):
+        if len(input_items[0]) < 2*len(output_items[0]):
+            self.short = True
+        n = min(len(output_items[0]), len(input_items[0])//2)
+        output_items[0][:n] = input_items[0][:2*n:2]
+        self.consume(0, 2*n)
+        return n
+
+class general_sum4(gr.basic_block):
+    """
+    A moving sum of four items written as a general block, which relies
+    on the default forecast to get the history items.
+    """
+    def __init__(self):
+        gr.basic_block.__init__(
+            self,
+            name = "general sum4",
+            in_sig = [numpy.float32],
+            out_sig = [numpy.float32],
+        )
+        self.set_history(4)
+        self.short = False
+
+    def general_work(self, input_items, output_items):
+        if len(input_items[0]) < len(output_items[0]) + 3:
+            self.short = True
+        n = max(0, min(len(output_items[0]), len(input_items[0]) - 3))
+        output_items[0][:n] = numpy.convolve(input_items[0][:n + 3], [1, 1, 1, 1], mode='valid')
+        self.consume(0, n)
+        return n
+
 class test_block_gateway(gr_unittest.TestCase):
 
     def test_add_f32(self):
@@ -275,5 +338,56 @@ class test_block_gateway(gr_unittest.TestCase):
         tb.run()
         self.assertEqual(sink.data(), (1, 2, 3, 4, 5, 6, 7, 8, 9, 10))
 
+    def test_min_items(self):
+        tb = gr.top_block()
+        data = range(10000)
+        src = blocks.vector_source_f(data, False)
+        cp = copy_f32(min_items=512)
+        sink = blocks.vector_sink_f()
+        tb.connect(src, cp, sink)
+        tb.run()
+        self.assertEqual(cp.min_noutput_items(), 512)
+        self.assertEqual(sink.data(), tuple(data))
+
+    def test_forecast(self):
+        tb = gr.top_block()
+        data = range(10000)
+        src = blocks.vector_source_f(data, False)
+        d2x = general_decim2x()
+        sink = blocks.vector_sink_f()
+        tb.connect(src, d2x, sink)
+        tb.run()
+        self.assertFalse(d2x.short)
+        self.assertEqual(sink.data(), tuple(data[::2]))
+
+    def test_default_forecast(self):
+        s4 = general_sum4()
+        ninput_items_required = [0]
+        s4.forecast(10, ninput_items_required)
+        self.assertEqual(ninput_items_required, [13])
+
+        tb = gr.top_block()
+        data = range(10000)
+        src = blocks.vector_source_f(data, False)
+        s4 = general_sum4()
+        sink = blocks.vector_sink_f()
+        tb.connect(src, s4, sink)
+        tb.run()
+        self.assertFalse(s4.short)
+        padded = [0, 0, 0] + data
+        expected = [sum(padded[i:i + 4]) for i in range(len(data))]
+        self.assertEqual(sink.data(), tuple(expected))
+
+    def test_ndarray_cache(self):
+        buf = numpy.arange(16, dtype=numpy.float32)
+        addr = buf.ctypes.data
+        cache = gateway.ndarray_cache(numpy.dtype(numpy.float32))
+        view = cache(addr, 16)
+        self.assertTrue(cache(addr, 16) is view)
+        self.assertEqual(list(cache(addr, 8)), range(8))
+        self.assertEqual(list(cache(addr + 4*4, 4)), [4, 5, 6, 7])
+        vcache = gateway.ndarray_cache(numpy.dtype((numpy.float32, 2)))
+        self.assertEqual(vcache(addr, 8).shape, (8, 2))
+
 if __name__ == '__main__':
     gr_unittest.run(test_block_gateway, "test_block_gateway.xml")
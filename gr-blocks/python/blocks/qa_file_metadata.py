@@ -202,5 +202,87 @@ class test_file_metadata(gr_unittest.TestCase):
 	os.remove(outfile)
 	os.remove(outfile_hdr)
 
+    def test_003_reader(self):
+        N = 1000
+        samp_rate = 200000
+        data = sig_source_c(samp_rate, 1000, 1, N)
+
+        for detached in (False, True):
+            outfile = "test_out.dat"
+            src  = blocks.vector_source_c(data)
+            fsnk = blocks.file_meta_sink(gr.sizeof_gr_complex, outfile,
+                                         samp_rate, 1,
+                                         blocks.GR_FILE_FLOAT, True,
+                                         300, "", detached)
+            fsnk.set_unbuffered(True)
+            tb = gr.top_block()
+            tb.connect(src, fsnk)
+            tb.run()
+            fsnk.close()
+
+            # build the index, then read it back from the cache
+            for i in range(2):
+                reader = parse_file_metadata.file_metadata_reader(outfile, detached)
+                self.assertEqual(reader.nsegments(), 4)
+                self.assertEqual(len(reader), N)
+                self.assertEqual(list(reader.index["nitems"]), [300, 300, 300, 100])
+                self.assertComplexTuplesAlmostEqual(reader.segment(1), data[300:600], 5)
+                self.assertComplexTuplesAlmostEqual(reader[250:850], data[250:850], 5)
+                self.assertComplexTuplesAlmostEqual(reader[:], data, 5)
+                for key in (slice(None, None, -1), slice(850, 250, -7),
+                            slice(250, 850, 7), slice(250, 850, -1)):
+                    self.assertComplexTuplesAlmostEqual(reader[key], data[key], 5)
+                self.assertComplexAlmostEqual(reader[-1], data[-1], 5)
+                self.assertTrue(abs(reader.time_to_index(450.0/samp_rate) - 450) <= 1)
+                self.assertEqual(reader.segment_info(2)["rx_rate"], samp_rate)
+            self.assertTrue(os.path.exists(reader.index_filename))
+            os.remove(reader.index_filename)
+            os.remove(reader.hdr_filename)
+            if(detached):
+                os.remove(outfile)
+
+    def test_004_extract(self):
+        N = 1000
+        samp_rate = 200000
+        data = sig_source_c(samp_rate, 1000, 1, N)
+        outfile = "test_out.dat"
+        extfile = "test_ext.dat"
+
+        src  = blocks.vector_source_c(data)
+        fsnk = blocks.file_meta_sink(gr.sizeof_gr_complex, outfile,
+                                     samp_rate, 1,
+                                     blocks.GR_FILE_FLOAT, True,
+                                     300, "", False)
+        fsnk.set_unbuffered(True)
+        tb = gr.top_block()
+        tb.connect(src, fsnk)
+        tb.run()
+        fsnk.close()
+
+        reader = parse_file_metadata.file_metadata_reader(outfile, cache=False)
+        for headers in (True, False):
+            jobs = parse_file_metadata.plan_extraction(reader, 250, 850, extfile, headers)
+            self.assertEqual(len(jobs), 3)
+            for job in jobs:
+                parse_file_metadata.extract_piece(job)
+            if(headers):
+                ext = parse_file_metadata.file_metadata_reader(extfile, cache=False)
+                self.assertEqual(list(ext.index["nitems"]), [50, 300, 250])
+                self.assertAlmostEqual(ext.index["rx_time"][0], 250.0/samp_rate)
+                self.assertComplexTuplesAlmostEqual(ext[:], data[250:850], 5)
+            else:
+                self.assertEqual(os.path.getsize(extfile), 600*gr.sizeof_gr_complex)
+            os.remove(extfile)
+        os.remove(outfile)
+
+    def test_005_errors(self):
+        outfile = "test_out.dat"
+        handle = open(outfile, "wb")
+        handle.write(pmt.serialize_str(pmt.make_dict()).ljust(parse_file_metadata.HEADER_LENGTH, "\0"))
+        handle.close()
+        self.assertRaises(parse_file_metadata.metadata_error,
+                          parse_file_metadata.file_metadata_reader, outfile, False, None, False)
+        os.remove(outfile)
+
 if __name__ == '__main__':
     gr_unittest.run(test_file_metadata, "test_file_metadata.xml")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Throughput of the OFDM synchronizers with FIR moving sums and with
+running sums (moving_average=True), across FFT lengths.
+
+Each sync runs on noise from a null source through a head block; the
+ML and PNAC syncs get a random known symbol.
+"""
+
+import sys
+import time
+import random
+from optparse import OptionParser
+from gnuradio import gr, blocks, analog, digital
+from gnuradio.eng_option import eng_option
+
+def make_sync(name, fft_length, cp_length, moving_average):
+    kstime = [complex(random.gauss(0, 1), random.gauss(0, 1)) for i in range(fft_length)]
+    if name == "pn":
+        return digital.ofdm_sync_pn(fft_length, cp_length, False, moving_average)
+    if name == "ml":
+        return digital.ofdm_sync_ml(fft_length, cp_length, 20, kstime, False, moving_average)
+    return digital.ofdm_sync_pnac(fft_length, cp_length, kstime, False, moving_average)
+
+def time_sync(name, fft_length, cp_length, moving_average, nsamples):
+    tb = gr.top_block()
+    src = analog.noise_source_c(analog.GR_GAUSSIAN, 1.0)
+    head = blocks.head(gr.sizeof_gr_complex, int(nsamples))
+    sync = make_sync(name, fft_length, cp_length, moving_average)
+    tb.connect(src, head, sync)
+    tb.connect((sync, 0), blocks.null_sink(gr.sizeof_float))
+    tb.connect((sync, 1), blocks.null_sink(gr.sizeof_char))
+    start = time.time()
+    tb.run()
+    return nsamples/(time.time() - start)
+
+def main():
+    parser = OptionParser(option_class=eng_option)
+    parser.add_option("-N", "--nsamples", type="eng_float", default=2e6,
+                      help="samples per measurement [default=%default]")
+    parser.add_option("-s", "--sync", type="choice", choices=["pn", "ml", "pnac"], default="pn",
+                      help="synchronizer: pn, ml, or pnac [default=%default]")
+    parser.add_option("-c", "--cp-ratio", type="int", default=4,
+                      help="fft_length/cp_length [default=%default]")
+    (options, args) = parser.parse_args()
+    if len(args) != 0:
+        parser.print_help()
+        sys.exit(1)
+
+    print "ofdm_sync_%s, %g samples" % (options.sync, options.nsamples)
+    print "%10s %16s %16s %8s" % ("fft_length", "FIR (S/s)", "running (S/s)", "speedup")
+    fft_length = 64
+    while fft_length <= 4096:
+        cp_length = fft_length/options.cp_ratio
+        fir = time_sync(options.sync, fft_length, cp_length, False, options.nsamples)
+        running = time_sync(options.sync, fft_length, cp_length, True, options.nsamples)
+        print "%10d %16.4g %16.4g %7.1fx" % (fft_length, fir, running, running/fir)
+        sys.stdout.flush()
+        fft_length *= 2
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
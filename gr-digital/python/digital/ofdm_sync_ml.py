@@ -34,11 +34,14 @@ except ImportError:
     import blocks_swig as blocks
 
 class ofdm_sync_ml(gr.hier_block2):
-    def __init__(self, fft_length, cp_length, snr, kstime, logging):
+    def __init__(self, fft_length, cp_length, snr, kstime, logging, moving_average=False):
         ''' Maximum Likelihood OFDM synchronizer:
         J. van de Beek, M. Sandell, and P. O. Borjesson, "ML Estimation
         of Time and Frequency Offset in OFDM Systems," IEEE Trans.
         Signal Processing, vol. 45, no. 7, pp. 1800-1805, 1997.
+
+        With moving_average, the moving sums over the cyclic prefix are
+        running sums (blocks.moving_average) instead of FIR filters.
         '''
 
 	gr.hier_block2.__init__(self, "ofdm_sync_ml",
@@ -66,8 +69,11 @@ class ofdm_sync_ml(gr.hier_block2):
         self.magsqrd2 = blocks.complex_to_mag_squared()
         self.adder = blocks.add_ff()
 
-        moving_sum_taps = [rho/2 for i in range(cp_length)]
-        self.moving_sum_filter = filter.fir_filter_fff(1,moving_sum_taps)
+        if moving_average:
+            self.moving_sum_filter = blocks.moving_average_ff(cp_length, rho/2)
+        else:
+            moving_sum_taps = [rho/2 for i in range(cp_length)]
+            self.moving_sum_filter = filter.fir_filter_fff(1,moving_sum_taps)
         
         self.connect(self.input,self.magsqrd1)
         self.connect(self.delay,self.magsqrd2)
@@ -80,8 +86,11 @@ class ofdm_sync_ml(gr.hier_block2):
         self.conjg = blocks.conjugate_cc();
         self.mixer = blocks.multiply_cc();
 
-        movingsum2_taps = [1.0 for i in range(cp_length)]
-        self.movingsum2 = filter.fir_filter_ccf(1,movingsum2_taps)
+        if moving_average:
+            self.movingsum2 = blocks.moving_average_cc(cp_length, 1.0)
+        else:
+            movingsum2_taps = [1.0 for i in range(cp_length)]
+            self.movingsum2 = filter.fir_filter_ccf(1,movingsum2_taps)
         
         # Correlator data handler
         self.c2mag = blocks.complex_to_mag()
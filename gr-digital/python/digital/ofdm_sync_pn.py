@@ -35,12 +35,16 @@ except ImportError:
     import blocks_swig as blocks
 
 class ofdm_sync_pn(gr.hier_block2):
-    def __init__(self, fft_length, cp_length, logging=False):
+    def __init__(self, fft_length, cp_length, logging=False, moving_average=False):
         """
         OFDM synchronization using PN Correlation:
         T. M. Schmidl and D. C. Cox, "Robust Frequency and Timing
         Synchonization for OFDM," IEEE Trans. Communications, vol. 45,
         no. 12, 1997.
+
+        With moving_average, the moving sums are running sums
+        (blocks.moving_average) instead of FIR filters with all-ones
+        taps, so their cost does not grow with fft_length.
         """
         
 	gr.hier_block2.__init__(self, "ofdm_sync_pn",
@@ -59,7 +63,9 @@ class ofdm_sync_pn(gr.hier_block2):
         self.corr = blocks.multiply_cc();
 
         # Create a moving sum filter for the corr output
-        if 1:
+        if moving_average:
+            self.moving_sum_filter = blocks.moving_average_cc(fft_length//2, 1.0)
+        elif 1:
             moving_sum_taps = [1.0 for i in range(fft_length//2)]
             self.moving_sum_filter = filter.fir_filter_ccf(1,moving_sum_taps)
         else:
@@ -70,7 +76,9 @@ class ofdm_sync_pn(gr.hier_block2):
         self.inputmag2 = blocks.complex_to_mag_squared()
         movingsum2_taps = [1.0 for i in range(fft_length//2)]
 
-        if 1:
+        if moving_average:
+            self.inputmovingsum = blocks.moving_average_ff(fft_length//2, 1.0)
+        elif 1:
             self.inputmovingsum = filter.fir_filter_fff(1,movingsum2_taps)
         else:
             self.inputmovingsum = filter.fft_filter_fff(1,movingsum2_taps)
@@ -109,8 +117,11 @@ class ofdm_sync_pn(gr.hier_block2):
         self.connect(self.c2mag, (self.normalize,0))
 
         # Create a moving sum filter for the corr output
-        matched_filter_taps = [1.0/cp_length for i in range(cp_length)]
-        self.matched_filter = filter.fir_filter_fff(1,matched_filter_taps)
+        if moving_average:
+            self.matched_filter = blocks.moving_average_ff(cp_length, 1.0/cp_length)
+        else:
+            matched_filter_taps = [1.0/cp_length for i in range(cp_length)]
+            self.matched_filter = filter.fir_filter_fff(1,matched_filter_taps)
         self.connect(self.normalize, self.matched_filter)
         
         self.connect(self.matched_filter, self.sub1, self.pk_detect)
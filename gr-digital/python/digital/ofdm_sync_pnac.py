@@ -35,7 +35,7 @@ except ImportError:
     import blocks_swig as blocks
 
 class ofdm_sync_pnac(gr.hier_block2):
-    def __init__(self, fft_length, cp_length, kstime, logging=False):
+    def __init__(self, fft_length, cp_length, kstime, logging=False, moving_average=False):
         """
         OFDM synchronization using PN Correlation and initial cross-correlation:
         F. Tufvesson, O. Edfors, and M. Faulkner, "Time and Frequency Synchronization for OFDM using
@@ -53,6 +53,9 @@ class ofdm_sync_pnac(gr.hier_block2):
 
         Also, the cross-correlation falls apart as the frequency offset gets larger and completely fails
         when an integer offset is introduced. Another thing to look at.
+
+        With moving_average, the input power is a running sum (blocks.moving_average) instead of
+        an FIR filter with fft_length all-ones taps.
         """
 
 	gr.hier_block2.__init__(self, "ofdm_sync_pnac",
@@ -80,8 +83,11 @@ class ofdm_sync_pnac(gr.hier_block2):
 
         # Create a moving sum filter for the input
         self.mag = blocks.complex_to_mag_squared()
-        movingsum_taps = (fft_length//1)*[1.0,]
-        self.power = filter.fir_filter_fff(1,movingsum_taps)
+        if moving_average:
+            self.power = blocks.moving_average_ff(fft_length, 1.0)
+        else:
+            movingsum_taps = (fft_length//1)*[1.0,]
+            self.power = filter.fir_filter_fff(1,movingsum_taps)
      
         # Get magnitude (peaks) and angle (phase/freq error)
         self.c2mag = blocks.complex_to_mag_squared()
@@ -92,7 +98,7 @@ class ofdm_sync_pnac(gr.hier_block2):
 
         #ML measurements input to sampler block and detect
         self.threshold = blocks.threshold_ff(0,0,0)      # threshold detection might need to be tweaked
-        self.peaks = blocksx.float_to_char()
+        self.peaks = blocks.float_to_char()
 
         self.connect(self, self.input)
 
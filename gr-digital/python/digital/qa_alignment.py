@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+# 
+# This file is part of GNU Radio
+# 
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+# 
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+# 
+
+
+import random
+
+from gnuradio import gr, gr_unittest
+from gnuradio.digital.utils import alignment
+
+# the offset at a time version, as the reference
+def ref_compare_sequences(d1, d2, offset, sample_indices=None):
+    max_index = min(len(d1), len(d2)+offset)
+    if sample_indices is None:
+        sample_indices = range(0, max_index)
+    correct = 0
+    total = 0
+    for i in sample_indices:
+        if i >= max_index:
+            break
+        if d1[i] == d2[i-offset]:
+            correct += 1
+        total += 1
+    return (correct, total)
+
+def ref_align_sequences(d1, d2, num_samples, max_offset, correct_cutoff, seed):
+    indices = alignment.random_sample(max(len(d1), len(d2)), num_samples, seed)
+    max_frac_correct = 0
+    best_offset = None
+    best_compared = None
+    pos_range = range(0, min(len(d1), max_offset))
+    neg_range = range(-1, -min(len(d2), max_offset), -1)
+    int_range = [item for items in zip(pos_range, neg_range) for item in items]
+    for offset in int_range:
+        correct, compared = ref_compare_sequences(d1, d2, offset, indices)
+        frac_correct = 1.0*correct/compared
+        if frac_correct > max_frac_correct:
+            max_frac_correct = frac_correct
+            best_offset = offset
+            best_compared = compared
+            if frac_correct > correct_cutoff:
+                break
+    return max_frac_correct, best_compared, best_offset, indices
+
+class test_alignment(gr_unittest.TestCase):
+
+    def setUp(self):
+        rndm = random.Random(1234)
+        self.seq = [rndm.randint(0, 1) for i in range(3000)]
+        # shifted both ways, with errors
+        self.cases = []
+        for shift in (0, 17, -250, 1000):
+            if shift >= 0:
+                d2 = [0]*shift + self.seq
+            else:
+                d2 = self.seq[-shift:]
+            d2 = [b if rndm.random() < 0.8 else 1-b for b in d2]
+            self.cases.append((self.seq, d2))
+
+    def test_001_compare(self):
+        for (d1, d2) in self.cases:
+            for offset in (0, 5, -5, -17, 250, -1000):
+                self.assertEqual(alignment.compare_sequences(d1, d2, offset),
+                                 ref_compare_sequences(d1, d2, offset))
+
+    def test_002_align(self):
+        for (d1, d2) in self.cases:
+            for cutoff in (0.7, 0.9):
+                for chunk_size in (1000, alignment.def_chunk_size):
+                    expected = ref_align_sequences(d1, d2, 1000, 1500, cutoff, 5)
+                    result = alignment.align_sequences(d1, d2, max_offset=1500,
+                                                       correct_cutoff=cutoff, seed=5,
+                                                       chunk_size=chunk_size)
+                    self.assertEqual(result, expected)
+
+    def test_003_no_match(self):
+        (frac, compared, offset, indices) = alignment.align_sequences([0]*100, [1]*100)
+        self.assertEqual((frac, compared, offset), (0, None, None))
+
+if __name__ == '__main__':
+    gr_unittest.run(test_alignment, "test_alignment.xml")
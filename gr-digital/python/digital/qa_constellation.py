@@ -266,6 +266,22 @@ class test_constellation(gr_unittest.TestCase):
         self.assertFloatTuplesAlmostEqual(y_python_raw_calc, y_python_table, 4)
         self.assertFloatTuplesAlmostEqual(y_cpp_raw_calc, y_cpp_table, 4)
 
+    def test_soft_dec_batch(self):
+        prec = 4
+        constel, code = digital.qam_16_0()
+        Es = max([abs(constel_i) for constel_i in constel])
+        table = digital.soft_dec_table(constel, code, prec)
+
+        samples = [complex(random.uniform(-Es, Es), random.uniform(-Es, Es))
+                   for i in range(50)]
+
+        y_table = []
+        for sample in samples:
+            y_table += digital.calc_soft_dec_from_table(sample, table, prec, Es)
+
+        y_table_batch = digital.calc_soft_dec_from_table_batch(samples, table, prec, Es)
+        self.assertFloatTuplesAlmostEqual(y_table, y_table_batch.ravel(), 5)
+
 class mod_demod(gr.hier_block2):
     def __init__(self, constellation, differential, rotation):
         if constellation.arity() > 256:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+# 
+# This file is part of GNU Radio
+# 
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+# 
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+# 
+
+import random
+
+from gnuradio import gr, gr_unittest
+from gnuradio.digital import packet_utils, packing_utils, crc
+
+def ref_packed_to_1_0(s):
+    return ''.join(str((ord(ch) >> i) & 1) for ch in s for i in range(7, -1, -1))
+
+class test_packing_utils(gr_unittest.TestCase):
+
+    def test_001_unpack(self):
+        self.assertEqual(packing_utils.conv_packed_binary_string_to_1_0_string('\xAF'), '10101111')
+        data = ''.join(chr(random.randint(0, 255)) for i in range(100))
+        self.assertEqual(packing_utils.conv_packed_binary_string_to_1_0_string(data),
+                         ref_packed_to_1_0(data))
+
+    def test_002_pack(self):
+        self.assertEqual(packing_utils.conv_1_0_string_to_packed_binary_string('10101111'),
+                         ('\xAF', False))
+        self.assertEqual(packing_utils.conv_1_0_string_to_packed_binary_string('101'),
+                         ('\x05', True))
+        data = ''.join(chr(random.randint(0, 255)) for i in range(100))
+        bits = ref_packed_to_1_0(data)
+        self.assertEqual(packing_utils.conv_1_0_string_to_packed_binary_string(bits),
+                         (data, False))
+        self.assertRaises(ValueError,
+                          packing_utils.conv_1_0_string_to_packed_binary_string, '1021')
+
+    def test_003_is_1_0_string(self):
+        self.assertTrue(packing_utils.is_1_0_string('0110'))
+        self.assertTrue(packing_utils.is_1_0_string(''))
+        self.assertFalse(packing_utils.is_1_0_string('01a0'))
+        self.assertFalse(packing_utils.is_1_0_string([0, 1]))
+
+    def test_004_make_packets(self):
+        payloads = [''.join(chr(random.randint(0, 255)) for i in range(n))
+                    for n in (0, 1, 17, 200, 1500)]
+        offsets = [0, 3, 7, 15, 1]
+        expected = [packet_utils.make_packet(p, 2, 1, whitener_offset=o)
+                    for p, o in zip(payloads, offsets)]
+        self.assertEqual(packet_utils.make_packets(payloads, 2, 1, whitener_offset=offsets),
+                         expected)
+        expected = [packet_utils.make_packet(p, 2, 1, whitener_offset=5, whitening=False)
+                    for p in payloads]
+        self.assertEqual(packet_utils.make_packets(payloads, 2, 1, whitener_offset=5,
+                                                   whitening=False),
+                         expected)
+
+    def test_005_unmake_packets(self):
+        payloads = ['hello', '', 'x'*300]
+        offsets = [2, 9, 14]
+        white = [packet_utils.whiten(crc.gen_and_append_crc32(p), o)
+                 for p, o in zip(payloads, offsets)]
+        result = packet_utils.unmake_packets(white, offsets)
+        self.assertEqual(result, [(True, p) for p in payloads])
+        self.assertEqual(result, [packet_utils.unmake_packet(w, o)
+                                  for w, o in zip(white, offsets)])
+
+if __name__ == '__main__':
+    gr_unittest.run(test_packing_utils, "test_packing_utils.xml")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import os
+import random
+import shutil
+import tempfile
+import numpy
+
+from gnuradio import gr, gr_unittest, digital
+
+# the point at a time version, as the reference
+def ref_calc_soft_dec(sample, constel, symbols, npwr=1):
+    M = len(constel)
+    k = int(numpy.log2(M))
+    tmp = 2*k*[0,]
+    s = k*[0,]
+
+    constel = numpy.array(constel)
+    scale = min(min(abs(constel.real)), min(abs(constel.imag)))
+
+    for i in range(M):
+        dist = abs(sample - constel[i])**2
+        d = numpy.exp(-dist/(2*npwr*scale**2))
+        for j in range(k):
+            mask = 1<<j
+            bit = (symbols[i] & mask) >> j
+            if(bit == 0):
+                tmp[2*j+0] += d
+            else:
+                tmp[2*j+1] += d
+
+    for i in range(k):
+        s[k-1-i] = (numpy.log(tmp[2*i+1]) - numpy.log(tmp[2*i+0])) * scale**2
+
+    return s
+
+def ref_soft_dec_table(constel, symbols, prec, npwr=1):
+    re_min = min(numpy.array(constel).real)
+    im_min = min(numpy.array(constel).imag)
+    re_max = max(numpy.array(constel).real)
+    im_max = max(numpy.array(constel).imag)
+
+    npts = 2**prec
+    yrng = numpy.linspace(im_min, im_max, npts)
+    xrng = numpy.linspace(re_min, re_max, npts)
+
+    table = []
+    for y in yrng:
+        for x in xrng:
+            table.append(ref_calc_soft_dec(complex(x, y), constel, symbols, npwr))
+    return table
+
+def flatten(rows):
+    return [x for row in rows for x in row]
+
+class test_soft_decisions(gr_unittest.TestCase):
+
+    def setUp(self):
+        rndm = random.Random(1234)
+        self.constellations = [digital.psk_4_0(), digital.psk_4_0x1_1_0(),
+                               digital.qam_16_0()]
+        self.samples = [complex(rndm.uniform(-1.5, 1.5), rndm.uniform(-1.5, 1.5))
+                        for i in range(100)]
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_001_calc_soft_dec(self):
+        for (constel, code) in self.constellations:
+            for npwr in (1, 0.25):
+                expected = [ref_calc_soft_dec(sample, constel, code, npwr)
+                            for sample in self.samples]
+                single = [digital.calc_soft_dec(sample, constel, code, npwr)
+                          for sample in self.samples]
+                array = digital.calc_soft_dec_array(self.samples, constel, code,
+                                                    npwr, chunk_size=7)
+                self.assertFloatTuplesAlmostEqual(flatten(expected), flatten(single), 5)
+                self.assertFloatTuplesAlmostEqual(flatten(expected), array.ravel(), 5)
+
+    def test_002_table(self):
+        for (constel, code) in self.constellations:
+            expected = ref_soft_dec_table(constel, code, 4, 0.5)
+            table = digital.soft_dec_table(constel, code, 4, 0.5)
+            self.assertEqual(len(table), len(expected))
+            self.assertFloatTuplesAlmostEqual(flatten(expected), flatten(table), 5)
+
+    def test_003_table_cache(self):
+        constel, code = digital.qam_16_0()
+        def cached(prec, npwr):
+            return digital.soft_dec_table(constel, code, prec, npwr,
+                                          cache=True, cache_dir=self.cache_dir)
+        def cache_files():
+            return sorted(os.listdir(self.cache_dir))
+
+        # written on the first call
+        table = cached(4, 1)
+        files = cache_files()
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith('.npy'))
+        self.assertFloatTuplesAlmostEqual(flatten(table),
+                                          flatten(ref_soft_dec_table(constel, code, 4, 1)), 5)
+
+        # reused: a marked file is what comes back
+        marked = 7*numpy.ones((2**8, 4))
+        numpy.save(os.path.join(self.cache_dir, files[0]), marked)
+        self.assertEqual(cached(4, 1), marked.tolist())
+
+        # not used for other parameters
+        for (prec, npwr) in ((4, 0.5), (3, 1)):
+            table = cached(prec, npwr)
+            self.assertFloatTuplesAlmostEqual(flatten(table),
+                                              flatten(ref_soft_dec_table(constel, code, prec, npwr)), 5)
+        self.assertEqual(len(cache_files()), 3)
+        self.assertEqual(cached(4, 1), marked.tolist())
+
+if __name__ == '__main__':
+    gr_unittest.run(test_soft_decisions, "test_soft_decisions.xml")
@@ -20,8 +20,20 @@
 # Boston, MA 02110-1301, USA.
 # 
 
+import os
+import hashlib
 import numpy
 
+def _lut_grid(re_min, re_max, im_min, im_max, prec):
+    '''
+    All sample points of a LUT, in table index order: x moves left to
+    right along a row, then y moves up a row.
+    '''
+    npts = int(2**prec)
+    yrng = numpy.linspace(im_min, im_max, npts)
+    xrng = numpy.linspace(re_min, re_max, npts)
+    return (xrng[numpy.newaxis,:] + 1j*yrng[:,numpy.newaxis]).ravel()
+
 def soft_dec_table_generator(soft_dec_gen, prec, Es=1):
     '''
     Builds a LUT that is a list of tuples. The tuple represents the
@@ -80,20 +92,24 @@ def soft_dec_table_generator(soft_dec_gen, prec, Es=1):
     constellation.
     '''
 
-    npts = 2.0**prec
     maxd = Es*numpy.sqrt(2)/2
-    yrng = numpy.linspace(-maxd, maxd, npts)
-    xrng = numpy.linspace(-maxd, maxd, npts)
+    pts = _lut_grid(-maxd, maxd, -maxd, maxd, prec)
+    return [soft_dec_gen(pt, Es) for pt in pts]
 
-    table = []
-    for y in yrng:
-        for x in xrng:
-            pt = complex(x, y)
-            decs = soft_dec_gen(pt, Es)
-            table.append(decs)
-    return table
+def default_lut_cache_dir():
+    '''
+    Directory used by soft_dec_table to cache generated LUTs.
+    '''
+    return os.path.join(os.path.expanduser('~'), '.gnuradio', 'soft_dec_lut')
 
-def soft_dec_table(constel, symbols, prec, npwr=1):
+def _lut_cache_file(constel, symbols, prec, npwr, cache_dir):
+    key = hashlib.sha1()
+    key.update(numpy.asarray(constel, numpy.complex128).tostring())
+    key.update(numpy.asarray(symbols, numpy.int64).tostring())
+    key.update(repr((int(prec), float(npwr))))
+    return os.path.join(cache_dir, key.hexdigest() + '.npy')
+
+def soft_dec_table(constel, symbols, prec, npwr=1, cache=False, cache_dir=None):
     '''
     Similar in nature to soft_dec_table_generator above. Instead, this
     takes in the constellation and symbol points along with the noise
@@ -107,27 +123,39 @@ def soft_dec_table(constel, symbols, prec, npwr=1):
     samples and the constellations must be working on the same
     magnitudes.
 
-    Because this uses the calc_soft_dec function, it can be quite
-    a bit more expensive to generate the LUT, though it should be
-    one-time work.
+    The whole (2^prec)^2 grid is evaluated with array operations. If
+    'cache' is True, the table is also stored on disk under
+    'cache_dir' (default_lut_cache_dir() if None), keyed by the
+    constellation, symbols, precision and noise power, and later
+    calls with the same arguments load it from there.
     '''
 
-    re_min = min(numpy.array(constel).real)
-    im_min = min(numpy.array(constel).imag)
-    re_max = max(numpy.array(constel).real)
-    im_max = max(numpy.array(constel).imag)
-
-    npts = 2.0**prec
-    yrng = numpy.linspace(im_min, im_max, npts)
-    xrng = numpy.linspace(re_min, re_max, npts)
-
-    table = []
-    for y in yrng:
-        for x in xrng:
-            pt = complex(x, y)
-            decs = calc_soft_dec(pt, constel, symbols, npwr)
-            table.append(decs)
-    return table
+    if cache:
+        if cache_dir is None:
+            cache_dir = default_lut_cache_dir()
+        cache_file = _lut_cache_file(constel, symbols, prec, npwr, cache_dir)
+        try:
+            return numpy.load(cache_file).tolist()
+        except (IOError, ValueError):
+            pass
+
+    c = numpy.asarray(constel)
+    pts = _lut_grid(c.real.min(), c.real.max(), c.imag.min(), c.imag.max(), prec)
+    table = calc_soft_dec_array(pts, constel, symbols, npwr)
+
+    if cache:
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            #write under a temporary name so readers never see a partial file
+            tmp_file = '%s.%d.tmp' % (cache_file, os.getpid())
+            with open(tmp_file, 'wb') as f:
+                numpy.save(f, table)
+            os.rename(tmp_file, cache_file)
+        except (IOError, OSError):
+            pass
+
+    return table.tolist()
 
 def calc_soft_dec_from_table(sample, table, prec, Es=1):
     '''
@@ -172,6 +200,63 @@ def calc_soft_dec_from_table(sample, table, prec, Es=1):
 
     return table[index]
 
+def calc_soft_dec_from_table_batch(samples, table, prec, Es=1):
+    '''
+    Array version of calc_soft_dec_from_table: maps every sample in
+    'samples' to its LUT entry in one call.
+
+    Returns an ndarray with one row of soft decisions per sample.
+    '''
+    table = numpy.asarray(table)
+    samples = numpy.asarray(samples)
+    lut_scale = 2**prec
+    maxd = Es*numpy.sqrt(2)/2
+    step = 2*maxd / lut_scale
+    scale = (lut_scale) / (2*maxd) - step
+
+    xre = ((maxd + numpy.clip(samples.real, -maxd, maxd)) * scale).astype(numpy.int64)
+    xim = ((maxd + numpy.clip(samples.imag, -maxd, maxd)) * scale).astype(numpy.int64)
+    index = xre + lut_scale*xim
+
+    max_index = lut_scale**2
+    index = numpy.where(index > max_index, 0, index)
+
+    return table[index]
+
+def calc_soft_dec_array(samples, constel, symbols, npwr=1, chunk_size=4096):
+    '''
+    Array version of calc_soft_dec: returns an ndarray with one row of
+    k soft decisions per sample in 'samples'.
+
+    The distances from every sample to every constellation point are
+    evaluated at once, 'chunk_size' samples at a time to bound the
+    memory used by the distance matrix.
+    '''
+
+    constel = numpy.asarray(constel)
+    samples = numpy.atleast_1d(numpy.asarray(samples, numpy.complex128))
+    M = len(constel)
+    k = int(numpy.log2(M))
+
+    # Find a scaling factor for the constellation, however it was normalized.
+    scale = min(min(abs(constel.real)), min(abs(constel.imag)))
+
+    # bits[i,j] is the jth bit of the symbol at constel[i]
+    syms = numpy.asarray(symbols, numpy.int64)[:M]
+    bits = ((syms[:,numpy.newaxis] >> numpy.arange(k)) & 1).astype(numpy.float64)
+
+    s = numpy.empty((len(samples), k), numpy.float64)
+    for start in xrange(0, len(samples), chunk_size):
+        chunk = samples[start:start+chunk_size]
+        dist = abs(chunk[:,numpy.newaxis] - constel[numpy.newaxis,:])**2
+        d = numpy.exp(-dist/(2*npwr*scale**2))
+        # Probability of a one and of a zero for every bit.
+        p1 = numpy.dot(d, bits)
+        p0 = numpy.dot(d, 1 - bits)
+        # Log-likelihood ratio, most significant bit first.
+        s[start:start+chunk_size] = ((numpy.log(p1) - numpy.log(p0)) * scale**2)[:,::-1]
+    return s
+
 def calc_soft_dec(sample, constel, symbols, npwr=1):
     '''
     This function takes in any consteallation and symbol symbol set
@@ -186,47 +271,12 @@ def calc_soft_dec(sample, constel, symbols, npwr=1):
     the Euclidean distance between the sample and all points in the
     constellation to build up its probability
     calculations. Conversely, it should work for any given
-    constellation/symbol map.
+    constellation/symbol map. Use calc_soft_dec_array to process many
+    samples at once.
 
     The function returns a vector of k soft decisions. Decisions less
     than 0 are more likely to indicate a '0' bit and decisions greater
     than 0 are more likely to indicate a '1' bit.
     '''
-    
-    M = len(constel)
-    k = int(numpy.log2(M))
-    tmp = 2*k*[0,]
-    s = k*[0,]
-
-    # Find a scaling factor for the constellation, however it was normalized.
-    constel = numpy.array(constel)
-    scale = min(min(abs(constel.real)), min(abs(constel.imag)))
-
-    for i in range(M):
-        # Calculate the distance between the sample and the current
-        # constellation point.
-        dist = abs(sample - constel[i])**2
 
-        # Calculate the probability factor from the distance and the
-        # scaled noise power.
-        d = numpy.exp(-dist/(2*npwr*scale**2))
-        
-        for j in range(k):
-            # Get the bit at the jth index
-            mask = 1<<j
-            bit = (symbols[i] & mask) >> j
-
-            # If the bit is a 0, add to the probability of a zero
-            if(bit == 0):
-                tmp[2*j+0] += d
-            # else, add to the probability of a one
-            else:
-                tmp[2*j+1] += d
-                
-    # Calculate the log-likelihood ratio for all bits based on the
-    # probability of ones (tmp[2*i+1]) over the probability of a zero
-    # (tmp[2*i+0]).
-    for i in range(k):
-        s[k-1-i] = (numpy.log(tmp[2*i+1]) - numpy.log(tmp[2*i+0])) * scale**2
-
-    return s
+    return calc_soft_dec_array([sample], constel, symbols, npwr)[0].tolist()
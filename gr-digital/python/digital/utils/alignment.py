@@ -27,7 +27,7 @@ This module contains functions for aligning sequences.
 >>> rndm.seed(1234)
 >>> ran_seq = [rndm.randint(0,1) for i in range(0, 100)]
 >>> offset_seq = [0] * 20 + ran_seq
->>> correct, overlap, offset = align_sequences(ran_seq, offset_seq)
+>>> correct, overlap, offset, indices = align_sequences(ran_seq, offset_seq)
 >>> print(correct, overlap, offset)
 (1.0, 100, -20)
 >>> offset_err_seq = []
@@ -36,13 +36,14 @@ This module contains functions for aligning sequences.
 ...         offset_err_seq.append(rndm.randint(0,1))
 ...     else:
 ...         offset_err_seq.append(bit)
->>> correct, overlap, offset = align_sequences(ran_seq, offset_err_seq)
+>>> correct, overlap, offset, indices = align_sequences(ran_seq, offset_err_seq)
 >>> print(overlap, offset)
 (100, -20)
 
 """
 
 import random
+import numpy
 
 # DEFAULT PARAMETERS
 # If the fraction of matching bits between two sequences is greater than
@@ -52,6 +53,27 @@ def_correct_cutoff = 0.9
 def_max_offset = 500
 # The maximum number of samples to take from two sequences to check alignment.
 def_num_samples = 1000
+# The maximum number of (offset, index) pairs compared at once.
+def_chunk_size = 1 << 20
+
+def compare_offsets(d1, d2, offsets, indices):
+    """
+    Compares two sequences at many offsets at once; like
+    compare_sequences for each offset, but returns arrays of the number
+    of matching and of compared entries.
+    d1 & d2 -- sequences (numpy arrays)
+    offsets -- array of offsets of d2 relative to d1
+    indices -- array of the indices to use for the comparison
+    """
+    offsets = numpy.asarray(offsets, int)
+    max_index = numpy.minimum(len(d1), len(d2) + offsets)
+    # the indices up to the first one past the end
+    valid = numpy.logical_and.accumulate(indices[numpy.newaxis, :] < max_index[:, numpy.newaxis],
+                                         axis=1)
+    # negative positions index from the end of d2, as for a list
+    pos = numpy.where(valid, indices[numpy.newaxis, :] - offsets[:, numpy.newaxis], 0)
+    match = (d1[numpy.where(valid, indices, 0)] == d2.take(pos, mode='raise')) & valid
+    return match.sum(axis=1), valid.sum(axis=1)
 
 def compare_sequences(d1, d2, offset, sample_indices=None):
     """
@@ -61,18 +83,16 @@ def compare_sequences(d1, d2, offset, sample_indices=None):
     offset -- offset of d2 relative to d1
     sample_indices -- a list of indices to use for the comparison
     """
+    d1 = numpy.asarray(d1)
+    d2 = numpy.asarray(d2)
     max_index = min(len(d1), len(d2)+offset)
     if sample_indices is None:
         sample_indices = range(0, max_index)
-    correct = 0
-    total = 0
-    for i in sample_indices:
-        if i >= max_index:
-            break
-        if d1[i] == d2[i-offset]:
-            correct += 1
-        total += 1
-    return (correct, total)
+    if not len(sample_indices) or not len(d1) or not len(d2):
+        return (0, 0)
+    (correct, total) = compare_offsets(d1, d2, [offset],
+                                       numpy.asarray(sample_indices, int))
+    return (int(correct[0]), int(total[0]))
 
 def random_sample(size, num_samples=def_num_samples, seed=None):
     """
@@ -99,7 +119,8 @@ def align_sequences(d1, d2,
                     max_offset=def_max_offset,
                     correct_cutoff=def_correct_cutoff,
                     seed=None,
-                    indices=None):
+                    indices=None,
+                    chunk_size=def_chunk_size):
     """
     Takes two sequences and finds the offset and which the two sequences best
     match.  It returns the fraction correct, the number of entries compared,
@@ -111,6 +132,8 @@ def align_sequences(d1, d2,
                       the offset is assumed to optimum.
     seed -- a random number seed
     indices -- an explicit list of the indices used to compare the two sequences
+    chunk_size -- the maximum number of comparisons made at once; the offsets
+                  are checked in chunks of this size over the number of indices
     """
     max_overlap = max(len(d1), len(d2))
     if indices is None:
@@ -123,16 +146,28 @@ def align_sequences(d1, d2,
     neg_range = range(-1, -min(len(d2), max_offset), -1)
     # Interleave the positive and negative offsets.
     int_range = [item for items in zip(pos_range, neg_range) for item in items]
-    for offset in int_range:
-        correct, compared = compare_sequences(d1, d2, offset, indices)
-        frac_correct = 1.0*correct/compared
-        if frac_correct > max_frac_correct:
-            max_frac_correct = frac_correct
-            best_offset = offset
-            best_compared = compared
-            best_correct = correct
-            if frac_correct > correct_cutoff:
-                break
+    if not int_range or not len(indices):
+        return max_frac_correct, best_compared, best_offset, indices
+
+    d1a = numpy.asarray(d1)
+    d2a = numpy.asarray(d2)
+    ind = numpy.asarray(indices, int)
+    step = max(1, chunk_size // len(ind))
+    for start in range(0, len(int_range), step):
+        offsets = numpy.array(int_range[start:start+step])
+        correct, compared = compare_offsets(d1a, d2a, offsets, ind)
+        frac_correct = correct / numpy.maximum(compared, 1).astype(float)
+        # the first offset past the cutoff ends the search
+        past = numpy.flatnonzero(frac_correct > correct_cutoff)
+        last = past[0] + 1 if len(past) else len(offsets)
+        best = numpy.argmax(frac_correct[:last])
+        if frac_correct[best] > max_frac_correct:
+            max_frac_correct = float(frac_correct[best])
+            best_offset = int(offsets[best])
+            best_compared = int(compared[best])
+            best_correct = int(correct[best])
+        if len(past):
+            break
     return max_frac_correct, best_compared, best_offset, indices
     
 if __name__ == "__main__":
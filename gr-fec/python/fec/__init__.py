@@ -38,6 +38,8 @@ from threaded_encoder import threaded_encoder
 from threaded_decoder import threaded_decoder
 from capillary_threaded_decoder import capillary_threaded_decoder
 from capillary_threaded_encoder import capillary_threaded_encoder
+from balanced_threaded_decoder import balanced_threaded_decoder
+from balanced_threaded_encoder import balanced_threaded_encoder
 from extended_async_encoder import extended_async_encoder
 from extended_tagged_encoder import extended_tagged_encoder
 from extended_tagged_decoder import extended_tagged_decoder
@@ -45,3 +47,4 @@ from extended_tagged_decoder import extended_tagged_decoder
 
 from fec_test import fec_test
 from bercurve_generator import bercurve_generator
+from ber_sweep import ber_sweep, run_ber_point, format_ber_table, write_ber_csv
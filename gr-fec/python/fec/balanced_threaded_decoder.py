@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr
+import fec_swig as fec
+import multiprocessing
+import numpy
+
+from frame_scheduler import frame_scheduler, frame_collector
+
+class balanced_threaded_decoder(gr.hier_block2):
+    '''
+    Decodes frames on any number of worker threads, each frame on the
+    first worker that is free, and puts the frames back in order.
+
+    Float soft bits in, unpacked bits out, like fec.decoder with a
+    float input; the input conversion (and shift) of the decoder is
+    done by the workers.
+
+    Args:
+        decoder_list: decoder objects, one per worker, or a function
+            returning a new decoder object
+        nworkers: workers when given a function, the number of CPUs
+            by default
+        depth: frames queued at a worker at most
+    '''
+    def __init__(self, decoder_list, nworkers=None, depth=2):
+        gr.hier_block2.__init__(
+            self, "Balanced Threaded Decoder",
+            gr.io_signature(1, 1, gr.sizeof_float),
+            gr.io_signature(1, 1, gr.sizeof_char))
+
+        if callable(decoder_list):
+            if nworkers is None:
+                nworkers = multiprocessing.cpu_count()
+            decoder_list = [decoder_list() for i in range(nworkers)]
+        self.decoder_list = decoder_list
+
+        if fec.get_history(decoder_list[0]) != 0:
+            gr.log.info("fec.balanced_threaded_decoder: Cannot use a decoder with history.")
+            raise AttributeError
+        if fec.get_decoder_input_conversion(decoder_list[0]) not in ("none", "uchar"):
+            gr.log.info("fec.balanced_threaded_decoder: Input conversion must be none or uchar.")
+            raise AttributeError
+
+        self.workers = [fec.async_decoder(d) for d in decoder_list]
+        self.scheduler = frame_scheduler(len(decoder_list), numpy.float32, numpy.uint8,
+                                         fec.get_decoder_input_size(decoder_list[0]),
+                                         fec.get_decoder_output_size(decoder_list[0]),
+                                         depth)
+        self.collector = frame_collector(self.scheduler)
+
+        for i in range(len(self.workers)):
+            self.msg_connect(self.scheduler, "w%d" % i, self.workers[i], "in")
+            self.msg_connect(self.workers[i], "out", self.collector, "in")
+
+        self.connect((self, 0), (self.scheduler, 0))
+        self.connect((self.scheduler, 0), (self, 0))
+
+    def utilization(self):
+        '''Frames and busy time of each worker, see frame_scheduler.'''
+        return self.scheduler.utilization()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+from gnuradio import gr
+import fec_swig as fec
+import multiprocessing
+import numpy
+
+from frame_scheduler import frame_scheduler, frame_collector
+
+class balanced_threaded_encoder(gr.hier_block2):
+    '''
+    Encodes frames on any number of worker threads, each frame on the
+    first worker that is free, and puts the frames back in order.
+
+    Unpacked bits in, unpacked bits out; an input conversion to packed
+    bits is done by the workers.
+
+    Args:
+        encoder_list: encoder objects, one per worker, or a function
+            returning a new encoder object
+        nworkers: workers when given a function, the number of CPUs
+            by default
+        depth: frames queued at a worker at most
+    '''
+    def __init__(self, encoder_list, nworkers=None, depth=2):
+        gr.hier_block2.__init__(
+            self, "Balanced Threaded Encoder",
+            gr.io_signature(1, 1, gr.sizeof_char),
+            gr.io_signature(1, 1, gr.sizeof_char))
+
+        if callable(encoder_list):
+            if nworkers is None:
+                nworkers = multiprocessing.cpu_count()
+            encoder_list = [encoder_list() for i in range(nworkers)]
+        self.encoder_list = encoder_list
+
+        # the workers take frames of unpacked bits
+        frame = fec.get_encoder_input_size(encoder_list[0])
+        if fec.get_encoder_input_conversion(encoder_list[0]) == "pack":
+            frame *= 8
+
+        self.workers = [fec.async_encoder(e) for e in encoder_list]
+        self.scheduler = frame_scheduler(len(encoder_list), numpy.uint8, numpy.uint8,
+                                         frame, fec.get_encoder_output_size(encoder_list[0]),
+                                         depth)
+        self.collector = frame_collector(self.scheduler)
+
+        for i in range(len(self.workers)):
+            self.msg_connect(self.scheduler, "w%d" % i, self.workers[i], "in")
+            self.msg_connect(self.workers[i], "out", self.collector, "in")
+
+        self.connect((self, 0), (self.scheduler, 0))
+        self.connect((self.scheduler, 0), (self, 0))
+
+    def utilization(self):
+        '''Frames and busy time of each worker, see frame_scheduler.'''
+        return self.scheduler.utilization()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+'''
+BER curves measured point by point over a pool of processes.
+
+Every (variant, Es/N0) point runs its own fec_test flowgraph in a
+worker process, in chunks of growing size, until it has seen enough
+bit errors for the requested precision, its BER is shown to be below
+ber_limit, or max_bits have been tested. Once a point of a variant is
+below ber_limit, the higher Es/N0 points of that variant are skipped.
+
+Encoders and decoders are made in the workers, so a variant gives them
+as Python expressions (evaluated with fec and numpy imported) or as
+picklable callables returning the coder object, e.g.:
+
+  variants = [('cc k=7', 'fec.cc_encoder_make(2048, 7, 2, [79, -109])',
+                         'fec.cc_decoder.make(2048, 7, 2, [79, -109])')]
+  rows = ber_sweep(variants, numpy.arange(0, 6, .5), processes=4)
+  print format_ber_table(rows)
+'''
+
+from gnuradio import gr, blocks
+import multiprocessing
+import traceback
+import collections
+import Queue
+import numpy
+import math
+import time
+
+import fec_swig as fec
+from fec_test import fec_test
+
+class ber_variant(collections.namedtuple('ber_variant', 'name encoder decoder')):
+    '''
+    A code to measure: a name for the result table and the encoder and
+    decoder, each a Python expression or a callable returning the coder.
+    '''
+    pass
+
+ber_columns = ('variant', 'esno', 'bits', 'errors', 'ber', 'ber_low', 'ber_high',
+               'stopped', 'seconds')
+
+def normal_quantile(p):
+    '''Inverse of the standard normal CDF, by bisection.'''
+    lo, hi = -10.0, 10.0
+    for i in range(60):
+        mid = (lo + hi) / 2
+        if 0.5 * (1 + math.erf(mid / math.sqrt(2))) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+def wilson_interval(errors, bits, confidence=0.95):
+    '''
+    Wilson score interval of a BER measured as errors in bits. Unlike
+    the normal approximation, it stays sensible with few or no errors.
+    '''
+    if bits == 0:
+        return (0.0, 1.0)
+    z = normal_quantile(0.5 + confidence / 2)
+    p = float(errors) / bits
+    denom = 1 + z*z/bits
+    center = (p + z*z/(2*bits)) / denom
+    half = z * math.sqrt(p*(1-p)/bits + z*z/(4.0*bits*bits)) / denom
+    return (max(0.0, center - half), min(1.0, center + half))
+
+def stop_reason(errors, bits, min_errors=100, precision=None,
+                confidence=0.95, ber_limit=-7.0, max_bits=None):
+    '''
+    Returns why a point measured so far should stop, or None to go on:
+      'errors':    min_errors seen and, with a precision, the interval
+                   half width is within precision of the BER
+      'ber_limit': the upper bound of the BER is below 10**ber_limit
+      'max_bits':  max_bits tested
+    '''
+    (low, high) = wilson_interval(errors, bits, confidence)
+    if errors >= min_errors:
+        ber = float(errors) / bits
+        if precision is None or (high - low) / 2 <= precision * ber:
+            return 'errors'
+    if ber_limit is not None and bits > 0 and high < 10.0**ber_limit:
+        return 'ber_limit'
+    if max_bits is not None and bits >= max_bits:
+        return 'max_bits'
+    return None
+
+def _make_coder(spec):
+    if callable(spec):
+        return spec()
+    return eval(spec, {'fec': fec, 'numpy': numpy})
+
+def _count_bit_errors(a, b):
+    n = min(len(a), len(b))
+    diff = numpy.bitwise_xor(numpy.asarray(a[:n], numpy.uint8),
+                             numpy.asarray(b[:n], numpy.uint8))
+    return int(numpy.unpackbits(diff).sum()), 8*n
+
+def run_ber_point(variant, esno, seed=0, threading=None, puncpat='11',
+                  min_chunk=10000, max_chunk=1000000, **stop_args):
+    '''
+    Measures the BER of one variant at one Es/N0 in this process.
+
+    Each chunk of random bytes runs through a new fec_test flowgraph
+    with its own noise seed, so a point is reproducible for a given
+    seed. The chunk size (in bytes, rounded to whole frames) follows
+    the bits still needed for min_errors at the BER seen so far.
+
+    Returns a result row, a dictionary with the ber_columns keys.
+    '''
+    variant = ber_variant(*variant)
+    start = time.time()
+    encoder = _make_coder(variant.encoder)
+    decoder = _make_coder(variant.decoder)
+    frame = max(1, fec.get_encoder_input_size(encoder))
+    # errors needed for min_errors and, if given, the precision
+    target = stop_args.get('min_errors', 100)
+    if stop_args.get('precision'):
+        z = normal_quantile(0.5 + stop_args.get('confidence', 0.95) / 2)
+        target = max(target, (z / stop_args['precision'])**2)
+    rng = numpy.random.RandomState(seed)
+
+    errors = bits = nchunks = 0
+    while True:
+        if errors:
+            need = (target - errors) * bits / errors / 8
+        else:
+            need = min_chunk * 2**nchunks
+        chunk = int(min(max(need, min_chunk), max_chunk))
+        chunk = -(-chunk // frame) * frame
+
+        tb = gr.top_block()
+        src = blocks.vector_source_b(map(int, rng.randint(0, 256, chunk)), False)
+        test = fec_test(generic_encoder=encoder, generic_decoder=decoder,
+                        esno=esno, threading=threading, puncpat=puncpat,
+                        seed=int(rng.randint(1, 2**31 - 1)))
+        snk_dec = blocks.vector_sink_b()
+        snk_ref = blocks.vector_sink_b()
+        tb.connect(src, test)
+        tb.connect((test, 0), snk_dec)
+        tb.connect((test, 1), snk_ref)
+        tb.run()
+
+        (e, n) = _count_bit_errors(snk_dec.data(), snk_ref.data())
+        errors += e
+        bits += n
+        nchunks += 1
+        stopped = stop_reason(errors, bits, **stop_args)
+        if stopped or n == 0:
+            break
+
+    (low, high) = wilson_interval(errors, bits, stop_args.get('confidence', 0.95))
+    return {'variant': variant.name,
+            'esno': esno,
+            'bits': bits,
+            'errors': errors,
+            'ber': float(errors) / bits if bits else None,
+            'ber_low': low,
+            'ber_high': high,
+            'stopped': stopped or 'no_output',
+            'seconds': time.time() - start}
+
+def _ber_point_job(job):
+    # runs in a worker; failures are returned, so the scheduler is
+    # never left waiting for a result that does not come
+    (args, kwargs) = job
+    try:
+        return run_ber_point(*args, **kwargs)
+    except Exception:
+        return {'variant': ber_variant(*args[0]).name, 'esno': args[1],
+                'stopped': 'error', 'error': traceback.format_exc()}
+
+def ber_sweep(variants, esno, processes=None, seed=0, threading=None,
+              puncpat='11', min_errors=100, precision=None, confidence=0.95,
+              ber_limit=-7.0, max_bits=1e9, min_chunk=10000,
+              max_chunk=1000000, progress=None):
+    '''
+    Measures the BER curves of the variants at the esno points.
+
+    Args:
+        variants: a list of (name, encoder, decoder), see ber_variant
+        esno: the Es/N0 points in dB
+        processes: worker processes, the number of CPUs by default;
+            with 1 the points are measured in this process
+        seed: base of the per point seeds; a measured point does not
+            depend on the number of processes, but with more than one,
+            points above a ber_limit floor may be measured rather than
+            skipped when they started before the floor was found
+        threading: threading of the encoder and decoder in fec_test
+        puncpat: puncture pattern
+        min_errors, precision, confidence, ber_limit, max_bits: the
+            stopping rule of each point, see stop_reason
+        min_chunk, max_chunk: bytes per flowgraph run of a point
+        progress: called with each result row as it arrives
+
+    Returns:
+        a list of result rows (dictionaries with the ber_columns keys),
+        ordered by variant then Es/N0. Skipped points have no bits.
+    '''
+    variants = [ber_variant(*v) for v in variants]
+    esno = sorted(float(x) for x in esno)
+    stop_args = {'min_errors': min_errors, 'precision': precision,
+                 'confidence': confidence, 'ber_limit': ber_limit,
+                 'max_bits': max_bits}
+
+    # low Es/N0 first, so floors are found before higher points start
+    jobs = collections.deque()
+    for (i, x) in enumerate(esno):
+        for (j, v) in enumerate(variants):
+            kwargs = dict(stop_args, seed=seed + 1000003*j + i, threading=threading,
+                          puncpat=puncpat, min_chunk=min_chunk, max_chunk=max_chunk)
+            jobs.append((j, x, ((tuple(v), x), kwargs)))
+
+    rows = {}
+    floor = {}
+    def record(j, row):
+        rows[(j, row['esno'])] = row
+        if row['stopped'] == 'error':
+            raise RuntimeError("BER point %s at %g dB failed:\n%s" % (
+                row['variant'], row['esno'], row['error']))
+        if row['stopped'] == 'ber_limit':
+            floor[j] = min(floor.get(j, row['esno']), row['esno'])
+        if progress is not None:
+            progress(row)
+
+    def skip(j, x):
+        if j in floor and x > floor[j]:
+            record(j, {'variant': variants[j].name, 'esno': x, 'bits': 0,
+                       'errors': 0, 'ber': None, 'ber_low': None, 'ber_high': None,
+                       'stopped': 'skipped', 'seconds': 0.0})
+            return True
+        return False
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes <= 1:
+        for (j, x, job) in jobs:
+            if not skip(j, x):
+                record(j, _ber_point_job(job))
+    else:
+        pool = multiprocessing.Pool(processes)
+        done = Queue.Queue()
+        in_flight = 0
+        try:
+            while jobs or in_flight:
+                while jobs and in_flight < processes:
+                    (j, x, job) = jobs.popleft()
+                    if skip(j, x):
+                        continue
+                    pool.apply_async(_ber_point_job, (job,),
+                                     callback=lambda row, j=j: done.put((j, row)))
+                    in_flight += 1
+                if in_flight:
+                    # a timeout keeps the wait interruptible
+                    while True:
+                        try:
+                            (j, row) = done.get(timeout=1.0)
+                            break
+                        except Queue.Empty:
+                            pass
+                    in_flight -= 1
+                    record(j, row)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    return [rows[(j, x)] for j in range(len(variants)) for x in esno]
+
+def format_ber_table(rows):
+    '''Formats result rows as a text table.'''
+    lines = ["%-20s %8s %12s %10s %10s %10s %10s %-10s %8s" % (
+        'variant', 'esno', 'bits', 'errors', 'ber', 'ber_low', 'ber_high',
+        'stopped', 'seconds')]
+    for r in rows:
+        if r['ber'] is None:
+            ber = ("-", "-", "-")
+        else:
+            ber = tuple("%10.3e" % r[k] for k in ('ber', 'ber_low', 'ber_high'))
+        lines.append("%-20s %8.2f %12d %10d %10s %10s %10s %-10s %8.1f" % (
+            (r['variant'], r['esno'], r['bits'], r['errors']) + ber +
+            (r['stopped'], r['seconds'])))
+    return "\n".join(lines)
+
+def write_ber_csv(rows, f):
+    '''Writes result rows to the open file f as CSV.'''
+    import csv
+    w = csv.DictWriter(f, ber_columns, extrasaction='ignore')
+    w.writeheader()
+    w.writerows(rows)
@@ -65,31 +65,37 @@ class bercurve_generator(gr.hier_block2):
 
     def set_esno(self, esno):
         self.esno = esno
-        self.ber_generator_0.set_esno(self.esno)
+        for (ber_generator, x) in zip(self.ber_generators, self.esno):
+            ber_generator.set_esno(x)
 
     def get_samp_rate(self):
         return self.samp_rate
 
     def set_samp_rate(self, samp_rate):
         self.samp_rate = samp_rate
-        self.ber_generator_0.set_samp_rate(self.samp_rate)
+        for ber_generator in self.ber_generators:
+            ber_generator.set_samp_rate(self.samp_rate)
 
     def get_encoder_list(self):
         return self.encoder_list
 
     def set_encoder_list(self, encoder_list):
         self.encoder_list = encoder_list
-        self.ber_generator_0.set_generic_encoder(self.encoder_list)
+        for (ber_generator, encoder) in zip(self.ber_generators, self.encoder_list):
+            ber_generator.set_generic_encoder(encoder)
 
     def get_decoder_list(self):
         return self.decoder_list
 
     def set_decoder_list(self, decoder_list):
         self.decoder_list = decoder_list
-        self.ber_generator_0.set_generic_decoder(self.decoder_list)
+        for (ber_generator, decoder) in zip(self.ber_generators, self.decoder_list):
+            ber_generator.set_generic_decoder(decoder)
 
     def get_puncpat(self):
         return self.puncpat
 
     def set_puncpat(self, puncpat):
         self.puncpat = puncpat
+        for ber_generator in self.ber_generators:
+            ber_generator.set_puncpat(self.puncpat)
@@ -20,51 +20,137 @@
 # Boston, MA 02110-1301, USA.
 #
 
+import binascii
+import numpy
+
+__all__ = ['bitreverse', 'const_lut', 'specinvert_lut', 'bitflip',
+           'read_bitlist', 'read_big_bitlist', 'generate_symmetries']
+
+# The functions below take a single value (returning a Python int) or
+# a numpy array of up to 64 bit values (returning a uint64 array), so a
+# whole stream of codewords is converted in one call.
+
+def _bytes_lut(f):
+    return numpy.array([f(b) for b in range(256)], numpy.uint8)
+
+# reverse the bits of each byte
+_byte_reverse = _bytes_lut(lambda b: int(bin(b)[:1:-1].ljust(8, '0'), 2))
+
+def _bit_length(a):
+    # number of bits up to the highest set bit, elementwise
+    n = numpy.zeros(a.shape, numpy.uint64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = (a >> numpy.uint64(shift)) != 0
+        n[big] += numpy.uint64(shift)
+        a = numpy.where(big, a >> numpy.uint64(shift), a)
+    return n + (a != 0)
+
 def bitreverse(mint):
-    res = 0;
-    while mint != 0:
-        res = res << 1;
-        res += mint & 1;
-        mint = mint >> 1;
-    return res;
+    """
+    Reverses the bits of mint up to its highest set bit, so that
+    bitreverse(0b110) == 0b011.
+    """
+    if not isinstance(mint, numpy.ndarray):
+        mint = int(mint)
+        return int(bin(mint)[:1:-1], 2) if mint else 0
+    a = numpy.ascontiguousarray(mint, numpy.uint64)
+    # the bits of each byte and then the bytes reversed is all 64 bits
+    # reversed; then drop the zeros from above the highest bit
+    res = _byte_reverse[a.view(numpy.uint8)].view(numpy.uint64).byteswap()
+    res = res.reshape(a.shape)
+    width = _bit_length(a)
+    res >>= numpy.uint64(64) - numpy.maximum(width, 1)
+    res[width == 0] = 0
+    return res
 
 const_lut = [2];
 specinvert_lut = [[0, 2, 1, 3]];
 
+# byte tables of bitflip_lut applied to each group of bits, keyed by
+# (lut, bits per group); the specinvert tables are made up front
+_flip_tables = {}
+
+def _flip_table(bitflip_lut, nbits):
+    key = (tuple(bitflip_lut), nbits)
+    table = _flip_tables.get(key)
+    if table is None:
+        mask = (1 << nbits) - 1
+        def flip(b):
+            return sum(bitflip_lut[(b >> cnt) & mask] << cnt
+                       for cnt in range(0, 8, nbits))
+        table = _flip_tables[key] = _bytes_lut(flip)
+    return table
+
+for (_i, _lut) in enumerate(specinvert_lut):
+    _flip_table(_lut, const_lut[_i])
+
 def bitflip(mint, bitflip_lut, index, csize):
-    res = 0;
-    cnt = 0;
-    mask = (1 << const_lut[index]) - 1;
-    while (cnt < csize):
-        res += (bitflip_lut[(mint >> cnt) & (mask)]) << cnt;
-        cnt += const_lut[index];
-    return res;
+    """
+    Maps each group of const_lut[index] bits of the csize bit codeword
+    mint through bitflip_lut. Given an array of codewords, all of them
+    are mapped.
+    """
+    nbits = const_lut[index]
+    mask = (1 << nbits) - 1
+    # the groups that start below csize are kept, whole
+    width = -(-csize // nbits) * nbits
+    if 8 % nbits or width > 64 or max(bitflip_lut) > mask:
+        if isinstance(mint, numpy.ndarray):
+            mint = numpy.asarray(mint, numpy.uint64)
+            lut = numpy.asarray(bitflip_lut, numpy.uint64)
+            res = numpy.zeros(mint.shape, numpy.uint64)
+            # groups from bit 64 up do not fit in the result
+            for cnt in range(0, min(csize, 64), nbits):
+                res += lut[(mint >> numpy.uint64(cnt)) & numpy.uint64(mask)] << numpy.uint64(cnt)
+            return res
+        mint = int(mint)
+        res = 0
+        for cnt in range(0, csize, nbits):
+            res += bitflip_lut[(mint >> cnt) & mask] << cnt
+        return res
 
+    # a byte at a time, the groups of a byte in one lookup
+    table = _flip_table(bitflip_lut, nbits)
+    if not isinstance(mint, numpy.ndarray):
+        mint = int(mint)
+        res = 0
+        for cnt in range(0, width, 8):
+            res += int(table[(mint >> cnt) & 0xff]) << cnt
+        return res & ((1 << width) - 1)
+    a = numpy.ascontiguousarray(mint, numpy.uint64)
+    res = table[a.view(numpy.uint8)].view(numpy.uint64)
+    res = res.reshape(a.shape)
+    if width < 64:
+        res &= numpy.uint64((1 << width) - 1)
+    return res
 
-def read_bitlist(bitlist):
-    res = 0;
-    for i in range(len(bitlist)):
-        if int(bitlist[i]) == 1:
-            res += 1 << (len(bitlist) - i - 1);
-    return res;
+def _bits(bitlist):
+    # the set bits of a bit list or string, as a bool array
+    if isinstance(bitlist, basestring):
+        return numpy.frombuffer(str(bitlist), numpy.uint8) == ord('1')
+    return numpy.asarray(bitlist).astype(int) == 1
 
+def read_bitlist(bitlist):
+    """
+    The integer given by a list or string of bits, MSB first, e.g.
+    read_bitlist('110') == 6.
+    """
+    bits = _bits(bitlist)
+    if not len(bits):
+        return 0
+    packed = numpy.packbits(bits)
+    return int(binascii.hexlify(packed.tostring()), 16) >> (8*len(packed) - len(bits))
 
 def read_big_bitlist(bitlist):
-    ret = []
-    for j in range(0, len(bitlist)/64):
-        res = 0;
-        for i in range(0, 64):
-            if int(bitlist[j*64+i]) == 1:
-                res += 1 << (64 - i - 1);
-        ret.append(res);
-    res = 0;
-    j = 0;
-    for i in range(len(bitlist)%64):
-        if int(bitlist[len(ret)*64+i]) == 1:
-            res += 1 << (64 - j - 1);
-        j += 1;
-    ret.append(res);
-    return ret;
+    """
+    Splits a list or string of bits into 64 bit words, MSB first; the
+    last word holds the bits left over (none when the length is a
+    multiple of 64) from its top bit down.
+    """
+    bits = _bits(bitlist)
+    words = numpy.zeros(64*(len(bits)//64 + 1), bool)
+    words[:len(bits)] = bits
+    return numpy.packbits(words).view('>u8').tolist()
 
 def generate_symmetries(symlist):
     retlist = []
@@ -32,6 +32,7 @@ else:
 
 from threaded_decoder import threaded_decoder
 from capillary_threaded_decoder import capillary_threaded_decoder
+from balanced_threaded_decoder import balanced_threaded_decoder
 
 class extended_decoder(gr.hier_block2):
 
@@ -101,18 +102,31 @@ class extended_decoder(gr.hier_block2):
 
         message_collector_connected=False
 
+        # the balanced workers take the float input and do the input
+        # conversion themselves
+        if threading == 'balanced':
+            if fec.get_decoder_input_conversion(decoder_obj_list[0]) not in ("none", "uchar"):
+                gr.log.info("fec.extended_decoder: Balanced threading needs an input conversion of none or uchar.")
+                raise AttributeError
+            if self.ann or self.puncpat != '11':
+                gr.log.info("fec.extended_decoder: Balanced threading cannot be used with ann or puncpat.")
+                raise AttributeError
+
         ##anything going through the annihilator needs shifted, uchar vals
-        if fec.get_decoder_input_conversion(decoder_obj_list[0]) == "uchar" or \
-           fec.get_decoder_input_conversion(decoder_obj_list[0]) == "packed_bits":
+        elif fec.get_decoder_input_conversion(decoder_obj_list[0]) == "uchar" or \
+             fec.get_decoder_input_conversion(decoder_obj_list[0]) == "packed_bits":
             self.blocks.append(blocks.multiply_const_ff(48.0))
 
-        if fec.get_shift(decoder_obj_list[0]) != 0.0:
+        if threading == 'balanced':
+            pass
+        elif fec.get_shift(decoder_obj_list[0]) != 0.0:
             self.blocks.append(blocks.add_const_ff(fec.get_shift(decoder_obj_list[0])))
         elif fec.get_decoder_input_conversion(decoder_obj_list[0]) == "packed_bits":
             self.blocks.append(blocks.add_const_ff(128.0))
 
-        if fec.get_decoder_input_conversion(decoder_obj_list[0]) == "uchar" or \
-           fec.get_decoder_input_conversion(decoder_obj_list[0]) == "packed_bits":
+        if threading != 'balanced' and \
+           (fec.get_decoder_input_conversion(decoder_obj_list[0]) == "uchar" or \
+            fec.get_decoder_input_conversion(decoder_obj_list[0]) == "packed_bits"):
             self.blocks.append(blocks.float_to_uchar());
 
         const_index = 0; #index that corresponds to mod order for specinvert purposes
@@ -123,7 +137,7 @@ class extended_decoder(gr.hier_block2):
             flush = self.flush;
         if self.ann: #ann and puncpat are strings of 0s and 1s
             cat = fec.ULLVector();
-            for i in fec.read_big_bitlist(ann):
+            for i in read_big_bitlist(ann):
                 cat.append(i);
 
             synd_garble = .49
@@ -156,6 +170,9 @@ class extended_decoder(gr.hier_block2):
                                                           fec.get_decoder_input_item_size(decoder_obj_list[0]),
                                                           fec.get_decoder_output_item_size(decoder_obj_list[0])))
 
+        elif threading == 'balanced':
+            self.blocks.append(balanced_threaded_decoder(decoder_obj_list))
+
         elif threading == 'ordinary':
             self.blocks.append(threaded_decoder(decoder_obj_list,
                                                 fec.get_decoder_input_item_size(decoder_obj_list[0]),
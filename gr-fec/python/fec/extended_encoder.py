@@ -25,6 +25,7 @@ from gnuradio import gr, blocks
 import fec_swig as fec
 from threaded_encoder import threaded_encoder
 from capillary_threaded_encoder import capillary_threaded_encoder
+from balanced_threaded_encoder import balanced_threaded_encoder
 from bitflip import read_bitlist
 
 class extended_encoder(gr.hier_block2):
@@ -44,13 +45,17 @@ class extended_encoder(gr.hier_block2):
             # If it has parallelism of 0, force it into a list of 1
             encoder_obj_list = [encoder_obj_list,]
 
-        if fec.get_encoder_input_conversion(encoder_obj_list[0]) == "pack":
+        # the balanced workers pack the input themselves
+        if fec.get_encoder_input_conversion(encoder_obj_list[0]) == "pack" and \
+           threading != 'balanced':
             self.blocks.append(blocks.pack_k_bits_bb(8))
 
         if threading == 'capillary':
             self.blocks.append(capillary_threaded_encoder(encoder_obj_list,
                                                           gr.sizeof_char,
                                                           gr.sizeof_char))
+        elif threading == 'balanced':
+            self.blocks.append(balanced_threaded_encoder(encoder_obj_list))
         elif threading == 'ordinary':
             self.blocks.append(threaded_encoder(encoder_obj_list,
                                                 gr.sizeof_char,
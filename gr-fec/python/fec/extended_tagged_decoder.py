@@ -131,7 +131,7 @@ class extended_tagged_decoder(gr.hier_block2):
             flush = self.flush;
         if self.ann: #ann and puncpat are strings of 0s and 1s
             cat = fec.ULLVector();
-            for i in fec.read_big_bitlist(ann):
+            for i in read_big_bitlist(ann):
                 cat.append(i);
 
             synd_garble = .49
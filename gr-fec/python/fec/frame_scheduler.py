@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+'''
+Frame dispatch for the balanced threaded encoder and decoder.
+
+The frame_scheduler cuts its input stream into frames and sends each
+one as a PDU to the least loaded of N message based workers (async
+encoders or decoders, each running in its own thread). The workers
+send their results to a frame_collector, which hands them back to the
+scheduler, and the scheduler writes them out in the order the frames
+came in. The PDU metadata carries the sequence number of the frame.
+'''
+
+from gnuradio import gr
+import threading
+import time
+import pmt
+
+class frame_scheduler(gr.basic_block):
+    '''
+    Stream in, stream out; sends frames out of the message ports
+    w0 ... w<nworkers-1> and gets the results through a frame_collector.
+
+    Args:
+        nworkers: number of workers
+        in_type, out_type: numpy types of the input and output items
+        in_frame, out_frame: items per frame in and out
+        depth: frames queued at a worker at most; more than one keeps
+            the workers busy while the results are collected
+    '''
+    def __init__(self, nworkers, in_type, out_type, in_frame, out_frame, depth=2):
+        gr.basic_block.__init__(self, "frame_scheduler", [in_type], [out_type])
+        self.nworkers = nworkers
+        self.in_frame = in_frame
+        self.out_frame = out_frame
+        self.depth = depth
+        self.set_relative_rate(float(out_frame) / in_frame)
+        self.ports = [pmt.intern("w%d" % i) for i in range(nworkers)]
+        for port in self.ports:
+            self.message_port_register_out(port)
+
+        self.cond = threading.Condition()
+        self.next_seq = 0        # sequence number of the next frame sent
+        self.next_out = 0        # sequence number of the next frame out
+        self.out_offset = 0      # items of that frame already written
+        self.results = {}        # sequence number: result
+        self.worker_of = {}      # sequence number: worker
+        self.outstanding = [0]*nworkers
+        self.frames = [0]*nworkers
+        self.busy = [0.0]*nworkers
+        self.busy_since = [None]*nworkers
+        self.first_sent = None
+        self.last_done = None
+
+    def pending(self):
+        '''Frames sent but not completely written out.'''
+        return self.next_seq - self.next_out
+
+    def deliver(self, msg):
+        '''Called by the collector with a result PDU of a worker.'''
+        seq = pmt.to_uint64(pmt.car(msg))
+        data = pmt.to_python(pmt.cdr(msg))
+        now = time.time()
+        with self.cond:
+            w = self.worker_of.pop(seq)
+            self.outstanding[w] -= 1
+            if self.outstanding[w] == 0:
+                self.busy[w] += now - self.busy_since[w]
+                self.busy_since[w] = None
+            self.last_done = now
+            self.results[seq] = data
+            self.cond.notify()
+
+    def utilization(self):
+        '''
+        Returns the frames and busy time (seconds with a frame queued or
+        being coded) of each worker, and the busy time as a fraction of
+        the time from the first frame sent to the last frame done.
+        '''
+        with self.cond:
+            now = time.time()
+            if self.first_sent is None:
+                elapsed = 0.0
+            elif max(self.outstanding):
+                elapsed = now - self.first_sent
+            else:
+                elapsed = self.last_done - self.first_sent
+            stats = []
+            for w in range(self.nworkers):
+                busy = self.busy[w]
+                if self.busy_since[w] is not None:
+                    busy += now - self.busy_since[w]
+                stats.append({'frames': self.frames[w],
+                              'busy': busy,
+                              'utilization': elapsed and busy / elapsed or 0.0})
+            return stats
+
+    def forecast(self, noutput_items, ninput_items_required):
+        # with frames in flight there may be output without input, and
+        # the scheduler must not finish before they are written out
+        for i in range(len(ninput_items_required)):
+            if self.pending():
+                ninput_items_required[i] = 0
+            else:
+                ninput_items_required[i] = self.in_frame
+
+    def send(self, frame):
+        # to the worker with the fewest frames queued, the one that
+        # did the fewest frames so far among equals
+        w = min(range(self.nworkers), key=lambda i: (self.outstanding[i], self.frames[i]))
+        if self.outstanding[w] >= self.depth:
+            return False
+        seq = self.next_seq
+        self.next_seq += 1
+        self.worker_of[seq] = w
+        self.outstanding[w] += 1
+        self.frames[w] += 1
+        now = time.time()
+        if self.busy_since[w] is None:
+            self.busy_since[w] = now
+        if self.first_sent is None:
+            self.first_sent = now
+        self.message_port_pub(self.ports[w],
+                              pmt.cons(pmt.from_uint64(seq), pmt.to_pmt(frame)))
+        return True
+
+    def general_work(self, input_items, output_items):
+        inp = input_items[0]
+        out = output_items[0]
+        nin = nout = 0
+        waited = False
+        with self.cond:
+            while True:
+                while len(inp) - nin >= self.in_frame:
+                    # copied, the input buffer is reused once consumed
+                    if not self.send(inp[nin:nin+self.in_frame].copy()):
+                        break
+                    nin += self.in_frame
+
+                # write the results that are next in order
+                while nout < len(out) and self.next_out in self.results:
+                    data = self.results[self.next_out]
+                    n = min(len(data) - self.out_offset, len(out) - nout)
+                    out[nout:nout+n] = data[self.out_offset:self.out_offset+n]
+                    nout += n
+                    self.out_offset += n
+                    if self.out_offset == len(data):
+                        del self.results[self.next_out]
+                        self.next_out += 1
+                        self.out_offset = 0
+
+                if nin or nout or waited or not self.pending():
+                    break
+                # nothing to do until a worker is done; the timeout
+                # keeps the flowgraph stoppable
+                self.cond.wait(0.1)
+                waited = True
+
+        self.consume(0, nin)
+        return nout
+
+class frame_collector(gr.basic_block):
+    '''
+    Message sink of the worker results; hands them to the scheduler.
+    '''
+    def __init__(self, scheduler):
+        gr.basic_block.__init__(self, "frame_collector", None, None)
+        self.scheduler = scheduler
+        self.message_port_register_in(pmt.intern("in"))
+        self.set_msg_handler(pmt.intern("in"), self.scheduler.deliver)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest
+import fec_swig as fec
+
+import ber_sweep
+
+frame_size = 30
+
+def make_encoder():
+    return fec.dummy_encoder_make(frame_size*8)
+
+def make_decoder():
+    return fec.dummy_decoder.make(frame_size*8)
+
+variants = [('dummy', make_encoder, make_decoder)]
+
+class test_ber_sweep(gr_unittest.TestCase):
+
+    def test_wilson_interval(self):
+        (low, high) = ber_sweep.wilson_interval(100, 10000)
+        self.assertTrue(low < 0.01 < high)
+        self.assertAlmostEqual(high - low, 2*1.96*(0.01*0.99/10000)**0.5, 3)
+        (low, high) = ber_sweep.wilson_interval(0, 10**6)
+        self.assertEqual(low, 0)
+        self.assertTrue(0 < high < 1e-5)
+
+    def test_stop_reason(self):
+        self.assertEqual(ber_sweep.stop_reason(99, 10000), None)
+        self.assertEqual(ber_sweep.stop_reason(100, 10000), 'errors')
+        # 100 errors only give about +-20% at 95%
+        self.assertEqual(ber_sweep.stop_reason(100, 10000, precision=0.1), None)
+        self.assertEqual(ber_sweep.stop_reason(400, 40000, precision=0.1), 'errors')
+        self.assertEqual(ber_sweep.stop_reason(0, 10**8, ber_limit=-7), 'ber_limit')
+        self.assertEqual(ber_sweep.stop_reason(0, 10**8, ber_limit=None), None)
+        self.assertEqual(ber_sweep.stop_reason(0, 10**8, ber_limit=None, max_bits=10**8),
+                         'max_bits')
+
+    def test_point(self):
+        row = ber_sweep.run_ber_point(variants[0], -3.0, seed=1,
+                                      min_errors=50, min_chunk=1000)
+        self.assertEqual(row['stopped'], 'errors')
+        self.assertTrue(row['errors'] >= 50)
+        self.assertTrue(row['bits'] % (8*frame_size) == 0)
+        self.assertTrue(row['ber_low'] <= row['ber'] <= row['ber_high'])
+
+        # the same seed measures the same point
+        again = ber_sweep.run_ber_point(variants[0], -3.0, seed=1,
+                                        min_errors=50, min_chunk=1000)
+        self.assertEqual((again['bits'], again['errors']), (row['bits'], row['errors']))
+
+    def test_sweep(self):
+        esno = [-3.0, -2.0]
+        args = dict(seed=5, min_errors=20, min_chunk=1000, max_bits=1e6)
+        rows = ber_sweep.ber_sweep(variants, esno, processes=1, **args)
+        self.assertEqual([(r['variant'], r['esno']) for r in rows],
+                         [('dummy', -3.0), ('dummy', -2.0)])
+
+        # the points do not depend on the number of processes
+        prows = ber_sweep.ber_sweep(variants, esno, processes=2, **args)
+        self.assertEqual([(r['bits'], r['errors']) for r in prows],
+                         [(r['bits'], r['errors']) for r in rows])
+
+    def test_sweep_floor(self):
+        # nothing is measured above the first point below ber_limit
+        rows = ber_sweep.ber_sweep(variants, [-3.0, -2.0], processes=1,
+                                   min_errors=10**9, min_chunk=1000, ber_limit=0)
+        self.assertEqual([r['stopped'] for r in rows], ['ber_limit', 'skipped'])
+        self.assertEqual(rows[1]['bits'], 0)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_ber_sweep, "test_ber_sweep.xml")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+import random
+import numpy
+
+import bitflip
+
+# the bit at a time versions, as the reference
+def ref_bitreverse(mint):
+    res = 0
+    while mint != 0:
+        res = res << 1
+        res += mint & 1
+        mint = mint >> 1
+    return res
+
+def ref_bitflip(mint, bitflip_lut, index, csize):
+    res = 0
+    cnt = 0
+    mask = (1 << bitflip.const_lut[index]) - 1
+    while (cnt < csize):
+        res += (bitflip_lut[(mint >> cnt) & (mask)]) << cnt
+        cnt += bitflip.const_lut[index]
+    return res
+
+def ref_read_bitlist(bitlist):
+    res = 0
+    for i in range(len(bitlist)):
+        if int(bitlist[i]) == 1:
+            res += 1 << (len(bitlist) - i - 1)
+    return res
+
+def ref_read_big_bitlist(bitlist):
+    ret = []
+    for j in range(0, len(bitlist)/64):
+        res = 0
+        for i in range(0, 64):
+            if int(bitlist[j*64+i]) == 1:
+                res += 1 << (64 - i - 1)
+        ret.append(res)
+    res = 0
+    j = 0
+    for i in range(len(bitlist)%64):
+        if int(bitlist[len(ret)*64+i]) == 1:
+            res += 1 << (64 - j - 1)
+        j += 1
+    ret.append(res)
+    return ret
+
+class test_bitflip(gr_unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.values = [0, 1, 2, 3, 2**63, 2**64 - 1] + \
+                      [rng.getrandbits(rng.randint(1, 64)) for i in range(500)]
+        self.array = numpy.array(self.values, numpy.uint64)
+        self.bitlists = [[rng.randint(0, 1) for i in range(n)]
+                         for n in (0, 1, 7, 63, 64, 65, 128, 300)]
+
+    def test_bitreverse(self):
+        expected = [ref_bitreverse(v) for v in self.values]
+        self.assertEqual([bitflip.bitreverse(v) for v in self.values], expected)
+        self.assertEqual(bitflip.bitreverse(self.array).tolist(), expected)
+        self.assertEqual(bitflip.bitreverse(2**100 + 5), ref_bitreverse(2**100 + 5))
+
+    def test_bitflip(self):
+        for lut in (bitflip.specinvert_lut[0], [3, 2, 1, 0], [1, 1, 1, 1], [0, 5, 1, 3]):
+            for csize in (1, 3, 8, 9, 32, 63, 64, 65):
+                expected = [ref_bitflip(v, lut, 0, csize) for v in self.values]
+                self.assertEqual([bitflip.bitflip(v, lut, 0, csize) for v in self.values],
+                                 expected)
+                # an array of codewords keeps the low 64 bits
+                self.assertEqual(bitflip.bitflip(self.array, lut, 0, csize).tolist(),
+                                 [x & (2**64 - 1) for x in expected])
+
+    def test_bitflip_groups(self):
+        # group sizes that do not divide a byte
+        bitflip.const_lut.append(3)
+        try:
+            lut = range(8)[::-1]
+            for csize in (5, 30, 64):
+                expected = [ref_bitflip(v, lut, 1, csize) for v in self.values]
+                self.assertEqual([bitflip.bitflip(v, lut, 1, csize) for v in self.values],
+                                 expected)
+                self.assertEqual(bitflip.bitflip(self.array, lut, 1, csize).tolist(),
+                                 [x & (2**64 - 1) for x in expected])
+        finally:
+            bitflip.const_lut.pop()
+
+    def test_read_bitlist(self):
+        for bits in self.bitlists:
+            s = ''.join(map(str, bits))
+            for bitlist in (bits, s, list(s), numpy.array(bits)):
+                self.assertEqual(bitflip.read_bitlist(bitlist), ref_read_bitlist(bitlist))
+                self.assertEqual(bitflip.read_big_bitlist(bitlist),
+                                 ref_read_big_bitlist(bitlist))
+
+if __name__ == '__main__':
+    gr_unittest.run(test_bitflip, "test_bitflip.xml")
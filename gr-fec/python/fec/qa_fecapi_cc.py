@@ -191,5 +191,23 @@ class test_fecapi_cc(gr_unittest.TestCase):
 
         self.assertEqual(data_in, data_out)
 
+    def test_parallelism1_06(self):
+        frame_size = 30
+        k = 7
+        rate = 2
+        polys = [109,79]
+        mode = fec.CC_TERMINATED
+        enc = map((lambda a: fec.cc_encoder_make(frame_size*8, k, rate, polys, mode=mode)), range(0,3))
+        dec = map((lambda a: fec.cc_decoder.make(frame_size*8, k, rate, polys, mode=mode)), range(0,3))
+        threading = 'balanced'
+        self.test = _qa_helper(4*frame_size, enc, dec, threading)
+        self.tb.connect(self.test)
+        self.tb.run()
+
+        data_out = self.test.snk_output.data()
+        data_in  = self.test.snk_input.data()[0:len(data_out)]
+
+        self.assertEqual(data_in, data_out)
+
 if __name__ == '__main__':
     gr_unittest.run(test_fecapi_cc, "test_fecapi_cc.xml")
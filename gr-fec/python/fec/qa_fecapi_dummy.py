@@ -77,6 +77,20 @@ class test_fecapi_dummy(gr_unittest.TestCase):
 
         self.assertEqual(data_in, data_out)
 
+    def test_parallelism0_03(self):
+        frame_size = 30
+        enc = fec.dummy_encoder_make(frame_size*8)
+        dec = fec.dummy_decoder.make(frame_size*8)
+        threading = 'balanced'
+        self.test = _qa_helper(10*frame_size, enc, dec, threading)
+        self.tb.connect(self.test)
+        self.tb.run()
+
+        data_in = self.test.snk_input.data()
+        data_out =self.test.snk_output.data()
+
+        self.assertEqual(data_in, data_out)
+
     def test_parallelism1_00(self):
         frame_size = 30
         enc = map((lambda a: fec.dummy_encoder_make(frame_size*8)), range(0,1))
@@ -167,6 +181,34 @@ class test_fecapi_dummy(gr_unittest.TestCase):
 
         self.assertRaises(AttributeError, lambda: extended_decoder(dec, threading=threading, puncpat="11"))
 
+    def test_parallelism1_07(self):
+        frame_size = 30
+        dims = 5
+        enc = map((lambda a: fec.dummy_encoder_make(frame_size*8)), range(0,dims))
+        dec = map((lambda a: fec.dummy_decoder.make(frame_size*8)), range(0,dims))
+        threading = 'balanced'
+        self.test = _qa_helper(dims*frame_size, enc, dec, threading)
+        self.tb.connect(self.test)
+        self.tb.run()
+
+        data_in = self.test.snk_input.data()
+        data_out =self.test.snk_output.data()
+
+        self.assertEqual(data_in, data_out)
+
+        # every frame was coded once
+        util = self.test.ext_decoder.blocks[-1].utilization()
+        self.assertEqual(len(util), dims)
+        self.assertEqual(sum(u['frames'] for u in util), len(data_in) / (frame_size*8))
+
+    def test_parallelism1_08(self):
+        frame_size = 30
+        dims = 3
+        dec = map((lambda a: fec.dummy_decoder.make(frame_size*8)), range(0,dims))
+        threading = 'balanced'
+
+        self.assertRaises(AttributeError, lambda: extended_decoder(dec, threading=threading, puncpat="110"))
+
     def test_parallelism2_00(self):
         frame_size = 30
         dims1 = 16
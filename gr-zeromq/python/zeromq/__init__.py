@@ -34,3 +34,4 @@ except ImportError:
 
 from probe_manager import probe_manager
 from rpc_manager import rpc_manager
+from rpc_pool_manager import rpc_pool_manager, rpc_error, rpc_timeout
@@ -19,32 +19,132 @@
 # Boston, MA 02110-1301, USA.
 #
 
+"""
+Receive probe frames from ZeroMQ SUB sockets and pass them to callbacks.
+
+Frames are received without copying and decoded with numpy.frombuffer,
+so the arrays handed to callbacks are read only views of the frame.
+Every watcher pass drains all waiting frames, and only the latest one of
+each socket is delivered; with a max_rate, a socket's callback is called
+at most that many times per second, and frames arriving in between
+replace the one held back.
+
+The watcher can be driven by a GUI timer (call watcher() with the
+default zero timeout) or run in a background thread with start_watcher;
+in the latter case the callbacks run in that thread.
+"""
+
 import zmq
 import threading
 import numpy
+import time
+
+class _probe_interface():
+    def __init__(self, socket, data_type, callback_func, max_rate):
+        self.socket = socket
+        self.dtype = numpy.dtype(data_type)
+        self.callback_func = callback_func
+        self.min_interval = max_rate and 1.0/max_rate or 0.0
+        self.last_delivery = 0.0
+        self.frame = None
+        self.received = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
 
 class probe_manager():
-    def __init__(self):
+    def __init__(self, max_rate=None):
+        """
+        Args:
+            max_rate: default maximum callbacks per second per socket,
+                None for no limit
+        """
         self.zmq_context = zmq.Context()
         self.poller = zmq.Poller()
         self.interfaces = []
+        self.max_rate = max_rate
+        self.keep_running = False
+        self.watcher_thread = None
 
-    def add_socket(self, address, data_type, callback_func):
+    def add_socket(self, address, data_type, callback_func, max_rate=None):
         socket = self.zmq_context.socket(zmq.SUB)
         socket.setsockopt(zmq.SUBSCRIBE, "")
         socket.connect(address)
-        # use a tuple to store interface elements
-        self.interfaces.append((socket, data_type, callback_func))
+        if max_rate is None: max_rate = self.max_rate
+        self.interfaces.append(_probe_interface(socket, data_type, callback_func, max_rate))
         self.poller.register(socket, zmq.POLLIN)
 
-    def watcher(self):
-        poll = dict(self.poller.poll(0))
+    def watcher(self, timeout=0):
+        """
+        Receive the waiting frames and deliver the latest ones.
+
+        Args:
+            timeout: milliseconds to wait for a frame
+        """
+        poll = dict(self.poller.poll(self._poll_timeout(timeout)))
+        now = time.time()
         for i in self.interfaces:
-            # i = (socket, data_type, callback_func)
-            if poll.get(i[0]) == zmq.POLLIN:
-                # receive data
-                msg_packed = i[0].recv()
-                # use numpy to unpack the data
-                msg_unpacked = numpy.fromstring(msg_packed, numpy.dtype(i[1]))
-                # invoke callback function
-                i[2](msg_unpacked)
+            if poll.get(i.socket) == zmq.POLLIN:
+                # drain the burst, keeping the latest frame only
+                while True:
+                    try:
+                        frame = i.socket.recv(zmq.NOBLOCK, copy=False)
+                    except zmq.Again:
+                        break
+                    i.received += 1
+                    if i.frame is not None:
+                        if now - i.last_delivery < i.min_interval: i.dropped += 1
+                        else: i.coalesced += 1
+                    i.frame = frame
+            if i.frame is None or now - i.last_delivery < i.min_interval:
+                continue
+            frame = i.frame
+            i.frame = None
+            i.last_delivery = now
+            i.delivered += 1
+            # use numpy to unpack the data, without copying it
+            msg_unpacked = numpy.frombuffer(frame, i.dtype, len(frame)/i.dtype.itemsize)
+            # invoke callback function
+            i.callback_func(msg_unpacked)
+
+    def _poll_timeout(self, timeout):
+        # do not sleep past a frame held back by the rate limit
+        held = [i.last_delivery + i.min_interval for i in self.interfaces if i.frame is not None]
+        if held:
+            timeout = min(timeout, max(0, int((min(held) - time.time())*1000)))
+        return timeout
+
+    def start_watcher(self, timeout=100):
+        """
+        Run the watcher in a background thread.
+
+        Args:
+            timeout: milliseconds between checks for stop_watcher
+        """
+        self.keep_running = True
+        self.watcher_thread = threading.Thread(target=self._run_watcher, args=(timeout,))
+        self.watcher_thread.daemon = True
+        self.watcher_thread.start()
+
+    def stop_watcher(self):
+        self.keep_running = False
+        if self.watcher_thread is not None:
+            self.watcher_thread.join()
+            self.watcher_thread = None
+
+    def _run_watcher(self, timeout):
+        while self.keep_running:
+            self.watcher(timeout)
+
+    def get_stats(self):
+        """
+        Get the frame counters of each socket, in the order they were added.
+        Coalesced frames were replaced by a newer one from the same burst,
+        dropped frames by a newer one while the rate limit held them back.
+
+        Returns:
+            a list of dicts
+        """
+        return [{'received': i.received, 'delivered': i.delivered,
+                 'coalesced': i.coalesced, 'dropped': i.dropped}
+                for i in self.interfaces]
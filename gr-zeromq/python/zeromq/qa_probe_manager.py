@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest
+from gnuradio import zeromq
+import numpy
+import time
+import zmq
+
+class qa_probe_manager (gr_unittest.TestCase):
+
+    def setUp (self):
+        self.context = zmq.Context()
+        self.pub = self.context.socket(zmq.PUB)
+        port = self.pub.bind_to_random_port("tcp://127.0.0.1")
+        self.address = "tcp://127.0.0.1:%d" % port
+        self.frames = []
+
+    def tearDown (self):
+        self.pub.close(linger=0)
+        self.context.term()
+
+    def publish (self, nframes):
+        # give the subscription time to propagate, then send a burst
+        time.sleep(0.25)
+        for k in range(nframes):
+            self.pub.send(numpy.arange(8, dtype=numpy.float32) + k)
+        time.sleep(0.1)
+
+    def test_001_coalesce (self):
+        probe = zeromq.probe_manager()
+        probe.add_socket(self.address, 'float32', self.frames.append)
+        self.publish(10)
+        probe.watcher(100)
+        self.assertEqual(len(self.frames), 1)
+        self.assertFloatTuplesAlmostEqual(self.frames[0], numpy.arange(8) + 9)
+        self.assertEqual(probe.get_stats(), [{'received': 10, 'delivered': 1, 'coalesced': 9, 'dropped': 0}])
+
+    def test_002_max_rate (self):
+        probe = zeromq.probe_manager(max_rate=2)
+        probe.add_socket(self.address, 'float32', self.frames.append)
+        probe.start_watcher(10)
+        self.publish(1)
+        self.publish(1)
+        probe.stop_watcher()
+        self.assertEqual(len(self.frames), 1)
+        self.assertEqual(probe.get_stats()[0]['received'], 2)
+        probe.start_watcher(10)
+        time.sleep(0.5)
+        probe.stop_watcher()
+        self.assertEqual(len(self.frames), 2)
+        self.assertFloatTuplesAlmostEqual(self.frames[1], numpy.arange(8) + 0)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_probe_manager)
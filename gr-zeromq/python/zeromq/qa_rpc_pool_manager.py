@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest
+from gnuradio import zeromq
+import threading
+import time
+
+class qa_rpc_pool_manager (gr_unittest.TestCase):
+
+    def setUp (self):
+        self.freq = None
+        self.server = zeromq.rpc_pool_manager(nworkers=2)
+        self.server.set_reply_socket("inproc://qa_rpc_pool_manager")
+        self.server.add_interface("set_freq", self.set_freq)
+        self.server.add_interface("get_freq", lambda: self.freq)
+        self.server.add_interface("sleep", time.sleep)
+        self.server.add_interface("fail", lambda: 1/0)
+        self.server.add_interface("unserializable", lambda: object())
+        self.server.start_watcher()
+        self.client = zeromq.rpc_pool_manager()
+        self.client.set_request_socket("inproc://qa_rpc_pool_manager")
+
+    def tearDown (self):
+        self.client.close_requests()
+        self.server.stop_watcher()
+
+    def set_freq(self, freq):
+        self.freq = freq
+        return freq
+
+    def test_001_request (self):
+        self.assertEqual(self.client.request("set_freq", (100e6,)), 100e6)
+        self.assertEqual(self.client.request("get_freq"), 100e6)
+
+    def test_002_errors (self):
+        self.assertRaises(zeromq.rpc_error, self.client.request, "fail")
+        self.assertRaises(zeromq.rpc_error, self.client.request, "no_such_call")
+        self.assertRaises(zeromq.rpc_timeout, self.client.request, "sleep", (0.5,), 0.05)
+        # the late reply must not be taken for the next one
+        self.assertEqual(self.client.request("set_freq", (1.0,)), 1.0)
+
+    def test_003_request_many (self):
+        results = self.client.request_many([("set_freq", (i,)) for i in range(10)] +
+                                           [("fail", None), ("get_freq", None)])
+        self.assertEqual(results[:10], [(True, i) for i in range(10)])
+        self.assertFalse(results[10][0])
+        self.assertEqual(results[11], (True, 9))
+
+    def test_004_in_flight (self):
+        corr_ids = [self.client.send_calls([("set_freq", (i,))]) for i in range(8)]
+        for i, corr_id in reversed(list(enumerate(corr_ids))):
+            self.assertEqual(self.client.wait_reply(corr_id), ((True, i),))
+
+    def test_005_threads (self):
+        errors = []
+        def run(offset):
+            for i in range(50):
+                if self.client.request("set_freq", (offset + i,)) != offset + i:
+                    errors.append(offset + i)
+        threads = [threading.Thread(target=run, args=(1000*n,)) for n in range(4)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(errors, [])
+
+    def test_006_unserializable (self):
+        # more calls than workers, a worker must survive each of them
+        for i in range(2*self.server.nworkers + 1):
+            [(ok, value)] = self.client.request_many([("unserializable", None)])
+            self.assertFalse(ok)
+            self.assertTrue(value.startswith("unserializable result"))
+        results = self.client.request_many([("set_freq", (5,)), ("unserializable", None)])
+        self.assertEqual(results[0], (True, 5))
+        self.assertFalse(results[1][0])
+        self.assertEqual(self.client.request("get_freq"), 5)
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_rpc_pool_manager)
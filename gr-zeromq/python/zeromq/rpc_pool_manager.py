@@ -0,0 +1,280 @@
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+RPC over ZeroMQ served by a pool of worker threads.
+
+The reply side binds a ROUTER socket and hands calls to worker threads
+over an inproc DEALER socket. The request side uses one DEALER socket
+per calling thread, so a thread can have several requests in flight;
+replies are matched to requests by a correlation id, and replies to
+requests that already timed out are dropped.
+
+Every message is a batch: the request carries a tuple of (id_str, args)
+calls, executed in order by one worker, and the reply a tuple of
+(ok, value) results, where value is the error message when ok is False.
+
+All managers share the process wide zmq context by default, so an
+inproc:// address can connect managers in the same process.
+"""
+
+import zmq
+import pmt
+import struct
+import threading
+import itertools
+import time
+
+class rpc_error(Exception):
+    """A call failed on the reply side, or could not be made at all."""
+    pass
+
+class rpc_timeout(rpc_error):
+    """No reply arrived in time."""
+    pass
+
+_corr_id = struct.Struct('!Q')
+_worker_ids = itertools.count()
+
+class rpc_pool_manager():
+    def __init__(self, nworkers=4, timeout=1.0, context=None):
+        """
+        Args:
+            nworkers: number of threads executing calls; with more than
+                one, callbacks must be safe to run concurrently
+            timeout: default seconds to wait for a reply
+            context: the zmq context, the process wide one by default
+        """
+        self.zmq_context = context or zmq.Context.instance()
+        self.nworkers = nworkers
+        self.timeout = timeout
+        self.interfaces = dict()
+        self.rep_socket = None
+        self.req_address = None
+        self.keep_running = False
+        self.threads = []
+        self.calls_served = 0
+        self._backend_address = 'inproc://rpc-pool-%d' % _worker_ids.next()
+        self._corr_ids = itertools.count(1)
+        self._local = threading.local()
+        self._req_sockets = []
+        self._lock = threading.Lock()
+
+    def __del__(self):
+        self.stop_watcher()
+
+    def set_reply_socket(self, address):
+        self.rep_socket = self.zmq_context.socket(zmq.ROUTER)
+        self.rep_socket.bind(address)
+
+    def set_request_socket(self, address):
+        self.req_address = address
+
+    def add_interface(self, id_str, callback_func):
+        if self.interfaces.has_key(id_str):
+            raise ValueError("duplicate id_str: %s" % id_str)
+        self.interfaces[id_str] = callback_func
+
+    ####################################################################
+    # reply side
+    ####################################################################
+    def start_watcher(self):
+        if self.rep_socket is None:
+            raise rpc_error("set_reply_socket must be called first")
+        self.keep_running = True
+        self.backend = self.zmq_context.socket(zmq.DEALER)
+        self.backend.bind(self._backend_address)
+        self.threads = [threading.Thread(target=self.worker) for i in range(self.nworkers)]
+        self.threads.append(threading.Thread(target=self.watcher))
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def stop_watcher(self):
+        self.keep_running = False
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def watcher(self):
+        # forward calls to the workers and replies back to the callers
+        poller = zmq.Poller()
+        poller.register(self.rep_socket, zmq.POLLIN)
+        poller.register(self.backend, zmq.POLLIN)
+        while self.keep_running:
+            socks = dict(poller.poll(100))
+            if socks.get(self.rep_socket) == zmq.POLLIN:
+                self.backend.send_multipart(self.rep_socket.recv_multipart())
+            if socks.get(self.backend) == zmq.POLLIN:
+                self.rep_socket.send_multipart(self.backend.recv_multipart())
+        self.backend.close(linger=0)
+        self.rep_socket.close(linger=0)
+        self.rep_socket = None
+
+    def worker(self):
+        socket = self.zmq_context.socket(zmq.REP)
+        socket.connect(self._backend_address)
+        poller = zmq.Poller()
+        poller.register(socket, zmq.POLLIN)
+        while self.keep_running:
+            if not poller.poll(100):
+                continue
+            frames = socket.recv_multipart()
+            corr_id = frames and frames[0] or ''
+            try:
+                (corr_id, msg) = frames
+                calls = pmt.to_python(pmt.deserialize_str(msg))
+                results = tuple(self.callback(id_str, args) for (id_str, args) in calls)
+                reply = self._serialize_results(results)
+            except Exception, e:
+                results = ((False, "malformed request: %s" % e),)
+                reply = pmt.serialize_str(pmt.to_pmt(results))
+            socket.send_multipart([corr_id, reply])
+            with self._lock:
+                self.calls_served += len(results)
+        socket.close(linger=0)
+
+    def _serialize_results(self, results):
+        """
+        Serialize a batch of results for the reply. A result whose value
+        cannot be converted to a pmt becomes an error result, so the
+        caller still gets a reply for every call.
+        """
+        try:
+            return pmt.serialize_str(pmt.to_pmt(results))
+        except Exception:
+            pass
+        checked = list()
+        for result in results:
+            try:
+                pmt.serialize_str(pmt.to_pmt(result))
+            except Exception, e:
+                result = (False, "unserializable result: %s" % e)
+            checked.append(result)
+        return pmt.serialize_str(pmt.to_pmt(tuple(checked)))
+
+    def callback(self, id_str, args):
+        """Run one call, returning an (ok, value or error message) pair."""
+        callback_func = self.interfaces.get(id_str)
+        if callback_func is None:
+            return (False, "id_str not found: %s" % id_str)
+        try:
+            if args is None:
+                return (True, callback_func())
+            # use unpacking or splat operator * to unpack argument list
+            return (True, callback_func(*args))
+        except Exception, e:
+            return (False, "%s: %s" % (type(e).__name__, e))
+
+    ####################################################################
+    # request side
+    ####################################################################
+    def _request_socket(self):
+        socket = getattr(self._local, 'socket', None)
+        if socket is None:
+            if self.req_address is None:
+                raise rpc_error("set_request_socket must be called first")
+            socket = self.zmq_context.socket(zmq.DEALER)
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.connect(self.req_address)
+            self._local.socket = socket
+            self._local.pending = set()
+            self._local.replies = dict()
+            with self._lock:
+                self._req_sockets.append(socket)
+        return socket
+
+    def send_calls(self, calls):
+        """
+        Send a batch of calls without waiting for the reply.
+
+        Args:
+            calls: a sequence of (id_str, args) pairs, args may be None
+
+        Returns:
+            the correlation id to pass to wait_reply
+        """
+        socket = self._request_socket()
+        corr_id = self._corr_ids.next()
+        calls = tuple((id_str, args is not None and tuple(args) or None) for (id_str, args) in calls)
+        socket.send_multipart(['', _corr_id.pack(corr_id), pmt.serialize_str(pmt.to_pmt(calls))])
+        self._local.pending.add(corr_id)
+        return corr_id
+
+    def wait_reply(self, corr_id, timeout=None):
+        """
+        Wait for the results of a batch sent from this thread.
+        Replies to other requests in flight are kept until asked for.
+
+        Returns:
+            a tuple of (ok, value or error message) pairs
+        @throws rpc_timeout no reply within timeout seconds
+        """
+        socket = self._request_socket()
+        pending = self._local.pending
+        replies = self._local.replies
+        if corr_id not in pending:
+            raise rpc_error("request %d was not sent from this thread" % corr_id)
+        if timeout is None: timeout = self.timeout
+        deadline = time.time() + timeout
+        while corr_id not in replies:
+            remaining = deadline - time.time()
+            if remaining <= 0 or not socket.poll(int(remaining*1000)):
+                # a late reply will be dropped
+                pending.discard(corr_id)
+                raise rpc_timeout("no reply to request %d within %g s" % (corr_id, timeout))
+            frames = socket.recv_multipart()
+            if len(frames) != 3 or len(frames[1]) != _corr_id.size:
+                continue
+            (reply_id,) = _corr_id.unpack(frames[1])
+            if reply_id in pending:
+                replies[reply_id] = pmt.to_python(pmt.deserialize_str(frames[2]))
+        pending.discard(corr_id)
+        return replies.pop(corr_id)
+
+    def request_many(self, calls, timeout=None):
+        """
+        Make a batch of calls in a single round trip.
+
+        Returns:
+            a list of (ok, value or error message) pairs, one per call
+        """
+        return list(self.wait_reply(self.send_calls(calls), timeout))
+
+    def request(self, id_str, args=None, timeout=None):
+        """
+        Make a single call and return its value.
+
+        @throws rpc_error the call failed on the reply side
+        @throws rpc_timeout no reply within timeout seconds
+        """
+        [(ok, value)] = self.request_many([(id_str, args)], timeout)
+        if not ok:
+            raise rpc_error(value)
+        return value
+
+    def close_requests(self):
+        """Close the request sockets of all threads."""
+        with self._lock:
+            for socket in self._req_sockets:
+                socket.close(linger=0)
+            self._req_sockets = []
+        self._local = threading.local()
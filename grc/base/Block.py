@@ -20,10 +20,12 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 from . import odict
 from . Constants import ADVANCED_PARAM_TAB, DEFAULT_PARAM_TAB
 from Element import Element
+from element_list import keyed_list
 
 from Cheetah.Template import Template
 from UserDict import UserDict
 from itertools import imap
+import re
 
 class TemplateArg(UserDict):
     """
@@ -46,10 +48,75 @@ class TemplateArg(UserDict):
     def __call__(self):
         return self._param.get_evaluated()
 
+class TemplateArgs(object):
+    """
+    The cheetah search list of a block's params.
+    The template args are made when a template asks for them.
+    """
+
+    def __init__(self, params):
+        self._params = params
+        self._args = dict()
+
+    def has_key(self, key): return key in self._params
+    __contains__ = has_key
+
+    def __getitem__(self, key):
+        try: return self._args[key]
+        except KeyError:
+            arg = self._args[key] = TemplateArg(self._params[key])
+            return arg
+
+#a $param or $param.opt placeholder, bare and not followed by more cheetah syntax,
+#or enclosed as in $(param.opt) and ${param.opt}
+_placeholder_matcher = re.compile(
+    r'\$(?:\((?P<paren>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)?)\)'
+    r'|\{(?P<brace>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)?)\}'
+    r'|(?P<bare>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)?)(?![\w.(\[]))')
+
+#compiled templates by template string, shared by all blocks
+_templates = dict()
+
+def _compile_template(tmpl):
+    """
+    Compile a template string.
+    A template of plain text and placeholders is split into a list,
+    alternating text and (param key, opt key or None) pairs,
+    anything else is compiled into a cheetah template class.
+    """
+    parts = list()
+    pos = 0
+    for match in _placeholder_matcher.finditer(tmpl):
+        parts.append(tmpl[pos:match.start()])
+        key, _, opt = filter(None, match.groups())[0].partition('.')
+        parts.append((key, opt or None))
+        pos = match.end()
+    parts.append(tmpl[pos:])
+    if not any(c in text for text in parts[::2] for c in '$#\\'): return parts
+    return Template.compile(source=tmpl)
+
+def _fill_template(parts, params):
+    """
+    Fill in a split template, like cheetah would with template args.
+
+    Returns:
+        the string or None when a placeholder is not a param (or enum option)
+    """
+    res = list(parts)
+    for i in range(1, len(parts), 2):
+        key, opt = parts[i]
+        param = params.get(key)
+        if param is None: return None
+        if opt is None: res[i] = str(param.to_code())
+        elif param.is_enum() and opt in param.get_opt_keys(): res[i] = str(param.get_opt(opt))
+        else: return None
+    return ''.join(res)
+
 def _get_keys(lst): return [elem.get_key() for elem in lst]
 def _get_elem(lst, key):
-    try: return lst[_get_keys(lst).index(key)]
-    except ValueError: raise ValueError, 'Key "%s" not found in %s.'%(key, _get_keys(lst))
+    elem = lst.find(key)
+    if elem is None: raise ValueError, 'Key "%s" not found in %s.'%(key, _get_keys(lst))
+    return elem
 
 class Block(Element):
 
@@ -84,7 +151,7 @@ class Block(Element):
         self._param_tab_labels = n_tabs.findall('tab') if n_tabs is not None else [DEFAULT_PARAM_TAB]
 
         #create the param objects
-        self._params = list()
+        self._params = keyed_list()
         #add the id param
         self.get_params().append(self.get_parent().get_parent().Param(
             block=self,
@@ -107,26 +174,26 @@ class Block(Element):
         for param in imap(lambda n: self.get_parent().get_parent().Param(block=self, n=n), params):
             key = param.get_key()
             #test against repeated keys
-            if key in self.get_param_keys():
+            if self.has_param(key):
                 raise Exception, 'Key "%s" already exists in params'%key
             #store the param
             self.get_params().append(param)
         #create the source objects
-        self._sources = list()
+        self._sources = keyed_list()
         for source in map(lambda n: self.get_parent().get_parent().Port(block=self, n=n, dir='source'), sources):
             key = source.get_key()
             #test against repeated keys
-            if key in self.get_source_keys():
+            if self._sources.find(key) is not None:
                 raise Exception, 'Key "%s" already exists in sources'%key
             #store the port
             self.get_sources().append(source)
         self.back_ofthe_bus(self.get_sources())
         #create the sink objects
-        self._sinks = list()
+        self._sinks = keyed_list()
         for sink in map(lambda n: self.get_parent().get_parent().Port(block=self, n=n, dir='sink'), sinks):
             key = sink.get_key()
             #test against repeated keys
-            if key in self.get_sink_keys():
+            if self._sinks.find(key) is not None:
                 raise Exception, 'Key "%s" already exists in sinks'%key
             #store the port
             self.get_sinks().append(sink)
@@ -237,12 +304,7 @@ class Block(Element):
     def get_param_keys(self): return _get_keys(self._params)
     def get_param(self, key): return _get_elem(self._params, key)
     def get_params(self): return self._params
-    def has_param(self, key):
-        try:
-            _get_elem(self._params, key);
-            return True;
-        except:
-            return False;
+    def has_param(self, key): return self._params.find(key) is not None
 
     ##############################################
     # Access Sinks
@@ -275,9 +337,16 @@ class Block(Element):
         """
         tmpl = str(tmpl)
         if '$' not in tmpl: return tmpl
-        n = dict((p.get_key(), TemplateArg(p)) for p in self.get_params())
+        params = self._params.get_index()
         try:
-            return str(Template(tmpl, n))
+            compiled = _templates.get(tmpl)
+            if compiled is None: compiled = _templates[tmpl] = _compile_template(tmpl)
+            if isinstance(compiled, list):
+                res = _fill_template(compiled, params)
+                if res is not None: return res
+                #let cheetah report the missing name
+                compiled = Template.compile(source=tmpl)
+            return str(compiled(searchList=[TemplateArgs(params)]))
         except Exception as err:
             return "Template error: %s\n    %s" % (tmpl, err)
 
@@ -431,7 +500,7 @@ class Block(Element):
                 key = param_n.find('key')
                 value = param_n.find('value')
                 #the key must exist in this block's params
-                if key in self.get_param_keys():
+                if self.has_param(key):
                     self.get_param(key).set_value(value)
             #store hash and call rewrite
             my_hash = get_hash()
@@ -19,6 +19,7 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
 from . import odict
 from Element import Element
+from element_list import element_list
 from .. gui import Messages
 
 class FlowGraph(Element):
@@ -35,6 +36,7 @@ class FlowGraph(Element):
         """
         #initialize
         Element.__init__(self, platform)
+        self._element_cache = dict()
         #inital blank import
         self.import_data()
 
@@ -49,11 +51,12 @@ class FlowGraph(Element):
             a unique id
         """
         index = 0
+        block_ids = self._get_block_ids()
         while True:
             id = '%s_%d'%(base_id, index)
             index = index + 1
             #make sure that the id is not used by another block
-            if not filter(lambda b: b.get_id() == id, self.get_blocks()): return id
+            if id not in block_ids: return id
 
     def __str__(self): return 'FlowGraph - %s(%s)'%(self.get_option('title'), self.get_option('id'))
     def rewrite(self):
@@ -116,17 +119,67 @@ class FlowGraph(Element):
     ##############################################
     ## Access Elements
     ##############################################
-    def get_block(self, id): return filter(lambda b: b.get_id() == id, self.get_blocks())[0]
-    def get_blocks_unordered(self): return filter(lambda e: e.is_block(), self.get_elements())
+    def _elements_changed(self):
+        """
+        Drop the lists and indexes made from the elements.
+        Called when an element is added or removed, and when a block id or enabled state changes.
+        """
+        self._element_cache.clear()
+
+    def _get_cached(self, name, make):
+        """
+        Get a list or index made from the elements, made again after they changed.
+        The result is shared, copy lists before handing them out.
+        """
+        try: return self._element_cache[name]
+        except KeyError:
+            value = make()
+            self._element_cache[name] = value
+            return value
+
+    def _get_block_ids(self):
+        def make():
+            block_ids = dict()
+            #the first block with an id wins
+            for block in reversed(self.get_blocks()): block_ids[block.get_id()] = block
+            return block_ids
+        return self._get_cached('block_ids', make)
+
+    def get_block(self, id):
+        try: return self._get_block_ids()[id]
+        except KeyError: raise IndexError, 'Block id "%s" not found'%id
+    def get_blocks_unordered(self):
+        return list(self._get_cached('blocks_unordered', lambda: filter(lambda e: e.is_block(), self.get_elements())))
     def get_blocks(self):
-        blocks = self.get_blocks_unordered();
-        for i in range(len(blocks)):
-            if blocks[i].get_key() == 'variable':
-                blk = blocks[i];
-                blocks.remove(blk);
-                blocks.insert(1, blk);
-        return blocks;
-    def get_connections(self): return filter(lambda e: e.is_connection(), self.get_elements())
+        def make():
+            blocks = self.get_blocks_unordered();
+            for i in range(len(blocks)):
+                if blocks[i].get_key() == 'variable':
+                    blk = blocks[i];
+                    blocks.remove(blk);
+                    blocks.insert(1, blk);
+            return blocks;
+        return list(self._get_cached('blocks', make))
+    def get_connections(self):
+        return list(self._get_cached('connections', lambda: filter(lambda e: e.is_connection(), self.get_elements())))
+    def get_port_connections(self, port):
+        """
+        Get all connections that use the port.
+
+        Args:
+            port: a port of a block in this flow graph
+
+        Returns:
+            a list of connections
+        """
+        def make():
+            port_connections = dict()
+            for connection in self.get_connections():
+                port_connections.setdefault(id(connection.get_source()), list()).append(connection)
+                if connection.get_sink() is not connection.get_source():
+                    port_connections.setdefault(id(connection.get_sink()), list()).append(connection)
+            return port_connections
+        return list(self._get_cached('port_connections', make).get(id(port), ()))
     def get_children(self): return self.get_elements()
     def get_elements(self):
         """
@@ -150,7 +203,7 @@ class FlowGraph(Element):
         Returns:
             a list of blocks
         """
-        return filter(lambda b: b.get_enabled(), self.get_blocks())
+        return list(self._get_cached('enabled_blocks', lambda: filter(lambda b: b.get_enabled(), self.get_blocks())))
 
     def get_enabled_connections(self):
         """
@@ -159,7 +212,7 @@ class FlowGraph(Element):
         Returns:
             a list of connections
         """
-        return filter(lambda c: c.get_enabled(), self.get_connections())
+        return list(self._get_cached('enabled_connections', lambda: filter(lambda c: c.get_enabled(), self.get_connections())))
 
     def get_new_block(self, key):
         """
@@ -258,7 +311,8 @@ class FlowGraph(Element):
             n: the nested data odict
         """
         #remove previous elements
-        self._elements = list()
+        self._elements = element_list(on_change=self._elements_changed)
+        self._elements_changed()
         #use blank data if none provided
         fg_n = n and n.find('flow_graph') or odict()
         blocks_n = fg_n.findall('block')
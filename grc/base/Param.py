@@ -19,11 +19,13 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
 from . import odict
 from Element import Element
+from element_list import keyed_list
 
 def _get_keys(lst): return [elem.get_key() for elem in lst]
 def _get_elem(lst, key):
-    try: return lst[_get_keys(lst).index(key)]
-    except ValueError: raise ValueError, 'Key "%s" not found in %s.'%(key, _get_keys(lst))
+    elem = lst.find(key)
+    if elem is None: raise ValueError, 'Key "%s" not found in %s.'%(key, _get_keys(lst))
+    return elem
 
 class Option(Element):
 
@@ -88,7 +90,7 @@ class Param(Element):
         #build the param
         Element.__init__(self, block)
         #create the Option objects from the n data
-        self._options = list()
+        self._options = keyed_list()
         for option in map(lambda o: Option(param=self, n=o), n.findall('option')):
             key = option.get_key()
             #test against repeated keys
@@ -146,12 +148,18 @@ class Param(Element):
 
     def get_value(self):
         value = self._value
-        if self.is_enum() and value not in self.get_option_keys():
+        if self.is_enum() and self._options.find(value) is None:
             value = self.get_option_keys()[0]
             self.set_value(value)
         return value
 
-    def set_value(self, value): self._value = str(value) #must be a string
+    def set_value(self, value):
+        value = str(value) #must be a string
+        if value != self._value and self._key in ('id', '_enabled'):
+            #the flow graph keeps its blocks by id and the enabled ones
+            flow_graph = self.get_parent().get_parent()
+            if flow_graph.is_flow_graph(): flow_graph._elements_changed()
+        self._value = value
 
     def get_type(self): return self.get_parent().resolve_dependencies(self._type)
     def get_tab_label(self): return self._tab_label
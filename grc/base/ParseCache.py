@@ -0,0 +1,124 @@
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+import os
+import hashlib
+import cPickle as pickle
+
+import ParseXML
+
+#bump when the format of the cached data changes
+CACHE_VERSION = 1
+
+
+def _file_digest(path):
+    return hashlib.sha1(open(path, 'rb').read()).hexdigest()
+
+
+def _dtd_stamp(dtd_file):
+    if not dtd_file: return None
+    st = os.stat(dtd_file)
+    return dtd_file, st.st_mtime, st.st_size
+
+
+class ParseCache(object):
+    """
+    On-disk cache of validated and parsed xml files.
+
+    Entries are keyed by the xml file and the dtd it was validated
+    against. A file whose mtime and size are unchanged is served from
+    the cache; otherwise its content hash decides whether the cached
+    nested data is still good. Files that fail validation are not cached.
+    """
+
+    def __init__(self, cache_file):
+        self._cache_file = cache_file
+        self._entries = dict()
+        self._dirty = False
+        self._used = set()
+        self.hits = 0
+        self.misses = 0
+        try:
+            version, entries = pickle.load(open(cache_file, 'rb'))
+            if version == CACHE_VERSION: self._entries = entries
+        except Exception:
+            pass
+
+    def from_file(self, xml_file, dtd_file=None):
+        """
+        Validate and parse an xml file, using the cache when possible.
+
+        Args:
+            xml_file: the xml file path
+            dtd_file: the optional dtd file
+
+        Returns:
+            the nested data
+        @throws Exception validation fails
+        """
+        key = (xml_file, dtd_file)
+        self._used.add(key)
+        st = os.stat(xml_file)
+        dtd_stamp = _dtd_stamp(dtd_file)
+        entry = self._entries.get(key)
+        if entry is not None and entry[3] == dtd_stamp:
+            mtime, size, digest, _, data = entry
+            fresh = (mtime, size) == (st.st_mtime, st.st_size)
+            if not fresh and digest == _file_digest(xml_file):
+                self._entries[key] = (st.st_mtime, st.st_size, digest, dtd_stamp, data)
+                self._dirty = True
+                fresh = True
+            if fresh:
+                #an entry written under the other import path of grc, or a
+                #corrupt one, may not load: parse the file again and replace it
+                try: nested_data = pickle.loads(data)
+                except Exception: nested_data = None
+                if nested_data is not None:
+                    self.hits += 1
+                    return nested_data
+        self.misses += 1
+        ParseXML.validate_dtd(xml_file, dtd_file)
+        nested_data = ParseXML.from_file(xml_file)
+        #store a pickled copy, callers are free to modify what they get
+        self._entries[key] = (st.st_mtime, st.st_size, _file_digest(xml_file), dtd_stamp,
+                              pickle.dumps(nested_data, pickle.HIGHEST_PROTOCOL))
+        self._dirty = True
+        return nested_data
+
+    def save(self):
+        """Write the cache file if anything changed, dropping unused entries."""
+        if set(self._entries) - self._used:
+            for key in set(self._entries) - self._used: del self._entries[key]
+            self._dirty = True
+        if not self._dirty: return
+        tmp_file = '%s.%d.tmp' % (self._cache_file, os.getpid())
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((CACHE_VERSION, self._entries), f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_file, self._cache_file)
+            self._dirty = False
+        except (IOError, OSError):
+            pass
+
+    def clear(self):
+        """Drop all entries and remove the cache file."""
+        self._entries = dict()
+        self._dirty = False
+        if os.path.exists(self._cache_file):
+            os.remove(self._cache_file)
@@ -20,6 +20,7 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 import os
 import sys
 from .. base import ParseXML, odict
+from ParseCache import ParseCache
 from Element import Element as _Element
 from FlowGraph import FlowGraph as _FlowGraph
 from Connection import Connection as _Connection
@@ -32,7 +33,7 @@ from Constants import BLOCK_TREE_DTD, FLOW_GRAPH_DTD
 class Platform(_Element):
     def __init__(self, name, version, key,
                  block_paths, block_dtd, default_flow_graph, generator,
-                 license='', website=None, colors=None):
+                 license='', website=None, colors=None, block_cache_file=None):
         """
         Make a platform from the arguments.
 
@@ -47,6 +48,7 @@ class Platform(_Element):
             colors: a list of title, color_spec tuples
             license: a multi-line license (first line is copyright)
             website: the website url for this platform
+            block_cache_file: optional file caching the parsed block xml
 
         Returns:
             a platform object
@@ -62,11 +64,13 @@ class Platform(_Element):
         self._default_flow_graph = default_flow_graph
         self._generator = generator
         self._colors = colors or []
+        self._block_cache_file = block_cache_file
         #create a dummy flow graph for the blocks
         self._flow_graph = _Element(self)
 
         self._blocks = None
         self._blocks_n = None
+        self._parse_cache = None
         self._category_trees_n = None
         self.load_blocks()
 
@@ -77,6 +81,7 @@ class Platform(_Element):
         self._blocks_n = odict()
         self._category_trees_n = list()
         ParseXML.xml_failures.clear()
+        self._parse_cache = self._block_cache_file and ParseCache(self._block_cache_file)
         # try to parse and load blocks
         for xml_file in self.iter_xml_files():
             try:
@@ -89,6 +94,18 @@ class Platform(_Element):
                 pass
             except Exception as e:
                 print >> sys.stderr, 'Warning: Block loading failed:\n\t%s\n\tIgnoring: %s' % (e, xml_file)
+        if self._parse_cache: self._parse_cache.save()
+        self._parse_cache = None
+
+    def clear_block_cache(self):
+        """Remove the parsed block xml cache, the next load re-parses every file"""
+        if self._block_cache_file: ParseCache(self._block_cache_file).clear()
+
+    def _parse_xml(self, xml_file, dtd_file):
+        """Validate and parse an xml file, through the cache while loading blocks"""
+        if self._parse_cache: return self._parse_cache.from_file(xml_file, dtd_file)
+        ParseXML.validate_dtd(xml_file, dtd_file)
+        return ParseXML.from_file(xml_file)
 
     def iter_xml_files(self):
         """Iterator for block descriptions and category trees"""
@@ -104,8 +121,7 @@ class Platform(_Element):
     def load_block_xml(self, xml_file):
         """Load block description from xml file"""
         # validate and import
-        ParseXML.validate_dtd(xml_file, self._block_dtd)
-        n = ParseXML.from_file(xml_file).find('block')
+        n = self._parse_xml(xml_file, self._block_dtd).find('block')
         n['block_wrapper_path'] = xml_file  # inject block wrapper path
         # get block instance and add it to the list of blocks
         block = self.Block(self._flow_graph, n)
@@ -118,8 +134,7 @@ class Platform(_Element):
 
     def load_category_tree_xml(self, xml_file):
         """Validate and parse category tree file and add it to list"""
-        ParseXML.validate_dtd(xml_file, BLOCK_TREE_DTD)
-        n = ParseXML.from_file(xml_file).find('cat')
+        n = self._parse_xml(xml_file, BLOCK_TREE_DTD).find('cat')
         self._category_trees_n.append(n)
 
     def parse_flow_graph(self, flow_graph_file):
@@ -85,9 +85,7 @@ class Port(Element):
         Returns:
             a list of connection objects
         """
-        connections = self.get_parent().get_parent().get_connections()
-        connections = filter(lambda c: c.get_source() is self or c.get_sink() is self, connections)
-        return connections
+        return self.get_parent().get_parent().get_port_connections(self)
 
     def get_enabled_connections(self):
         """
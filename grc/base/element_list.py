@@ -0,0 +1,88 @@
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+def _changing(name):
+    method = getattr(list, name)
+    def changing(self, *args, **kwargs):
+        self._changed()
+        return method(self, *args, **kwargs)
+    changing.__name__ = name
+    return changing
+
+class element_list(list):
+    """
+    A list of elements that calls on_change whenever it is modified,
+    so the owner can drop what it made from the elements.
+    """
+
+    def __init__(self, elements=(), on_change=None):
+        list.__init__(self, elements)
+        self._on_change = on_change
+
+    def _changed(self):
+        if self._on_change is not None: self._on_change()
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__setslice__', '__delslice__',
+              '__iadd__', '__imul__'):
+    setattr(element_list, _name, _changing(_name))
+
+class keyed_list(element_list):
+    """
+    A list of elements with a lookup by key (params, ports).
+    The index of keys is made on the first lookup after the list was modified.
+    Call reindex after changing keys in place.
+    """
+
+    def __init__(self, elements=()):
+        element_list.__init__(self, elements)
+        self._index = None
+
+    def _changed(self): self._index = None
+
+    def reindex(self):
+        """
+        Make the index again on the next lookup.
+        """
+        self._index = None
+
+    def get_index(self):
+        """
+        Get the index of keys, do not modify it.
+
+        Returns:
+            a dict of key to the first element with the key
+        """
+        if self._index is None:
+            #the first element with a key wins, as with list.index
+            self._index = dict()
+            for elem in reversed(self): self._index[elem.get_key()] = elem
+        return self._index
+
+    def find(self, key):
+        """
+        Get the first element with the key.
+
+        Args:
+            key: the element key
+
+        Returns:
+            the element or None
+        """
+        return self.get_index().get(key)
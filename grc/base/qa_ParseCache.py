@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    from grc.base.ParseCache import ParseCache
+except ImportError:
+    from gnuradio.grc.base.ParseCache import ParseCache
+
+DTD = """\
+<!ELEMENT block (name, key)>
+<!ELEMENT name (#PCDATA)>
+<!ELEMENT key (#PCDATA)>
+"""
+
+BLOCK_XML = """\
+<?xml version="1.0"?>
+<block>
+  <name>%s</name>
+  <key>test_block</key>
+</block>
+"""
+
+class test_parse_cache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmp_dir, 'cache')
+        self.dtd_file = os.path.join(self.tmp_dir, 'block.dtd')
+        self.xml_file = os.path.join(self.tmp_dir, 'block.xml')
+        open(self.dtd_file, 'w').write(DTD)
+        self.write_xml('Test Block', 1000000000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_xml(self, name, mtime):
+        open(self.xml_file, 'w').write(BLOCK_XML % name)
+        os.utime(self.xml_file, (mtime, mtime))
+
+    def load(self):
+        """Load the block through a new cache from the cache file, then save it."""
+        cache = ParseCache(self.cache_file)
+        n = cache.from_file(self.xml_file, self.dtd_file)
+        cache.save()
+        return cache, n['block']['name']
+
+    def test_001_hit(self):
+        cache, name = self.load()
+        self.assertEqual((cache.hits, cache.misses, name), (0, 1, 'Test Block'))
+        cache, name = self.load()
+        self.assertEqual((cache.hits, cache.misses, name), (1, 0, 'Test Block'))
+
+    def test_002_changed_file(self):
+        self.load()
+        #same content, other mtime: the content hash still matches
+        os.utime(self.xml_file, (1000000100, 1000000100))
+        cache, name = self.load()
+        self.assertEqual((cache.hits, cache.misses, name), (1, 0, 'Test Block'))
+        #new content and mtime
+        self.write_xml('Other Name', 1000000200)
+        cache, name = self.load()
+        self.assertEqual((cache.hits, cache.misses, name), (0, 1, 'Other Name'))
+        cache, name = self.load()
+        self.assertEqual((cache.hits, cache.misses, name), (1, 0, 'Other Name'))
+
+    def test_003_unloadable_entry(self):
+        self.load()
+        for data in ('corrupt', 'cno_such_module\nodict\n(tRp0\n.'):
+            cache = ParseCache(self.cache_file)
+            cache.from_file(self.xml_file, self.dtd_file)
+            key = (self.xml_file, self.dtd_file)
+            cache._entries[key] = cache._entries[key][:4] + (data,)
+            cache._dirty = True
+            cache.save()
+            #a miss that parses the file again and rewrites the entry
+            cache, name = self.load()
+            self.assertEqual((cache.hits, cache.misses, name), (0, 1, 'Test Block'))
+            cache, name = self.load()
+            self.assertEqual((cache.hits, cache.misses, name), (1, 0, 'Test Block'))
+
+if __name__ == '__main__':
+    unittest.main()
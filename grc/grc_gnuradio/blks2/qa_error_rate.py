@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import random
+import numpy
+
+from gnuradio import gr, gr_unittest, blocks
+from grc_gnuradio.blks2.error_rate import error_rate
+
+# the sample at a time version, as the reference
+def ref_error_rate(type, win_size, bits_per_symbol, ref, res):
+    err_array = [0]*win_size
+    err_index = 0
+    num_errs = 0
+    num_samps = 0
+    out = []
+    for i in range(len(ref)):
+        old_err = err_array[err_index]
+        if type == 'BER':
+            err_array[err_index] = bin(ref[i] ^ res[i]).count('1')
+            norm = bits_per_symbol
+        else:
+            err_array[err_index] = int(ref[i] != res[i])
+            norm = 1
+        num_errs = num_errs + err_array[err_index] - old_err
+        err_index = (err_index + 1)%win_size
+        num_samps = min(num_samps + 1, win_size)
+        out.append(float(num_errs)/float(num_samps*norm))
+    return out
+
+class test_error_rate(gr_unittest.TestCase):
+
+    def setUp(self):
+        rndm = random.Random(1234)
+        self.ref = [rndm.randint(0, 3) for i in range(1000)]
+        # about one symbol in five in error
+        self.res = [r if rndm.random() < 0.8 else rndm.randint(0, 3) for r in self.ref]
+
+    def test_001_flow_graph(self):
+        for type in ('BER', 'SER'):
+            for win_size in (1, 37, 250):
+                tb = gr.top_block()
+                src0 = blocks.vector_source_b(self.ref, False)
+                src1 = blocks.vector_source_b(self.res, False)
+                er = error_rate(type, win_size, 2)
+                sink = blocks.vector_sink_f()
+                tb.connect(src0, (er, 0))
+                tb.connect(src1, (er, 1))
+                tb.connect(er, sink)
+                tb.run()
+                expected = ref_error_rate(type, win_size, 2, self.ref, self.res)
+                self.assertFloatTuplesAlmostEqual(sink.data(), expected, 5)
+
+    def test_002_work_calls(self):
+        # calls shorter and longer than the window
+        ref = numpy.array(self.ref, numpy.uint8)
+        res = numpy.array(self.res, numpy.uint8)
+        for type in ('BER', 'SER'):
+            er = error_rate(type, 50, 2)
+            out = []
+            start = 0
+            for num in (1, 10, 49, 50, 51, 200, 3, 636):
+                stop = start + num
+                output = numpy.zeros(num, numpy.float32)
+                self.assertEqual(er.work([ref[start:stop], res[start:stop]], [output]), num)
+                out.extend(output)
+                start = stop
+            self.assertEqual(start, len(ref))
+            expected = ref_error_rate(type, 50, 2, self.ref, self.res)
+            self.assertFloatTuplesAlmostEqual(out, expected, 5)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_error_rate, "test_error_rate.xml")
@@ -18,6 +18,7 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
 from Element import Element
+from ElementIndex import get_union
 import Utils
 import Colors
 from .. base import odict
@@ -46,6 +47,7 @@ class Block(Element):
         """
         self.W = 0
         self.H = 0
+        self._label_key = None
         #add the position param
         self.get_params().append(self.get_parent().get_parent().Param(
             block=self,
@@ -142,17 +144,52 @@ class Block(Element):
         Element.create_labels(self)
         self._bg_color = self.is_dummy_block() and Colors.MISSING_BLOCK_BACKGROUND_COLOR or \
                          self.get_enabled() and Colors.BLOCK_ENABLED_COLOR or Colors.BLOCK_DISABLED_COLOR
-        layouts = list()
-        #create the main layout
-        layout = gtk.DrawingArea().create_pango_layout('')
-        layouts.append(layout)
-        layout.set_markup(Utils.parse_template(BLOCK_MARKUP_TMPL, block=self))
-        self.label_width, self.label_height = layout.get_pixel_size()
+        markup = Utils.parse_template(BLOCK_MARKUP_TMPL, block=self)
         #display the params
         if self.is_dummy_block():
             markups = ['<span foreground="black" font_desc="Sans 7.5"><b>key: </b>{}</span>'.format(self._key)]
         else:
             markups = [param.get_markup() for param in self.get_params() if param.get_hide() not in ('all', 'part')]
+        #the label pixmaps are kept until the markup, color, or orientation changes
+        label_key = (markup, tuple(markups), self._bg_color, self.is_vertical())
+        if label_key != self._label_key:
+            self._label_key = label_key
+            self._create_label_pixmaps(markup, markups)
+        #calculate width and height needed
+        self.W = self.label_width + 2*BLOCK_LABEL_PADDING
+        def get_min_height_for_ports():
+            visible_ports = filter(lambda p: not p.get_hide(), ports)
+            H = 2*PORT_BORDER_SEPARATION + len(visible_ports) * PORT_SEPARATION
+            if visible_ports: H -= ports[0].H
+            return H
+        self.H = max(*(
+            [  # labels
+                self.label_height + 2 * BLOCK_LABEL_PADDING
+            ] +
+            [  # ports
+                get_min_height_for_ports() for ports in (self.get_sources_gui(), self.get_sinks_gui())
+            ] +
+            [  # bus ports only
+                4 * PORT_BORDER_SEPARATION +
+                sum([port.H + PORT_SEPARATION for port in ports if port.get_type() == 'bus']) - PORT_SEPARATION
+                for ports in (self.get_sources_gui(), self.get_sinks_gui())
+            ]
+        ))
+
+    def _create_label_pixmaps(self, markup, markups):
+        """
+        Render the block name and the param markups into the label pixmaps.
+
+        Args:
+            markup: the markup of the block name
+            markups: the markups of the shown params
+        """
+        layouts = list()
+        #create the main layout
+        layout = gtk.DrawingArea().create_pango_layout('')
+        layouts.append(layout)
+        layout.set_markup(markup)
+        self.label_width, self.label_height = layout.get_pixel_size()
         if markups:
             layout = gtk.DrawingArea().create_pango_layout('')
             layout.set_spacing(LABEL_SEPARATION*pango.SCALE)
@@ -181,26 +218,6 @@ class Block(Element):
         if self.is_vertical():
             self.vertical_label = self.get_parent().new_pixmap(height, width)
             Utils.rotate_pixmap(gc, self.horizontal_label, self.vertical_label)
-        #calculate width and height needed
-        self.W = self.label_width + 2*BLOCK_LABEL_PADDING
-        def get_min_height_for_ports():
-            visible_ports = filter(lambda p: not p.get_hide(), ports)
-            H = 2*PORT_BORDER_SEPARATION + len(visible_ports) * PORT_SEPARATION
-            if visible_ports: H -= ports[0].H
-            return H
-        self.H = max(*(
-            [  # labels
-                self.label_height + 2 * BLOCK_LABEL_PADDING
-            ] +
-            [  # ports
-                get_min_height_for_ports() for ports in (self.get_sources_gui(), self.get_sinks_gui())
-            ] +
-            [  # bus ports only
-                4 * PORT_BORDER_SEPARATION +
-                sum([port.H + PORT_SEPARATION for port in ports if port.get_type() == 'bus']) - PORT_SEPARATION
-                for ports in (self.get_sources_gui(), self.get_sinks_gui())
-            ]
-        ))
 
     def draw(self, gc, window):
         """
@@ -227,6 +244,15 @@ class Block(Element):
             if not port.get_hide():
                 port.draw(gc, window)
 
+    def get_extent(self):
+        """
+        Get the rectangle that holds the block and its ports.
+
+        Returns:
+            the (x1, y1, x2, y2) tuple or None
+        """
+        return get_union([Element.get_extent(self)] + [port.get_extent() for port in self.get_ports_gui()])
+
     def what_is_selected(self, coor, coor_m=None):
         """
         Get the element that is selected.
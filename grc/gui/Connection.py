@@ -19,6 +19,7 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
 import Utils
 from Element import Element
+from ElementIndex import get_union
 import Colors
 from Constants import CONNECTOR_ARROW_BASE, CONNECTOR_ARROW_HEIGHT
 import gtk
@@ -33,7 +34,13 @@ class Connection(Element):
     The arrow coloring exposes the enabled and valid states.
     """
 
-    def __init__(self): Element.__init__(self)
+    def __init__(self):
+        Element.__init__(self)
+        self._sink_rot = None
+        self._source_rot = None
+        self._sink_coor = None
+        self._source_coor = None
+        self._arrow = list()
 
     def get_coordinate(self):
         """
@@ -125,13 +132,12 @@ class Connection(Element):
             self.add_line((x1, y1), points[0])
             self.add_line((x2, y2), points[0])
 
-    def draw(self, gc, window):
+    def update_shapes(self):
         """
-        Draw the connection.
+        Update the shapes when the ports moved or rotated since the last time.
 
-        Args:
-            gc: the graphics context
-            window: the gtk window to draw on
+        Returns:
+            false if the shapes could not be updated
         """
         sink = self.get_sink()
         source = self.get_source()
@@ -141,12 +147,38 @@ class Connection(Element):
             try:
                 self._update_after_move()
             except:
-                return
+                return False
         #cache values
         self._sink_rot = sink.get_rotation()
         self._source_rot = source.get_rotation()
         self._sink_coor = sink.get_coordinate()
         self._source_coor = source.get_coordinate()
+        return True
+
+    def get_extent(self):
+        """
+        Get the rectangle that holds the lines and the arrow, updated to the ports.
+
+        Returns:
+            the (x1, y1, x2, y2) tuple or None
+        """
+        if not self.update_shapes(): return None
+        extent = Element.get_extent(self)
+        if extent is None: return None
+        xs, ys = zip(*self._arrow)
+        return get_union([extent, (min(xs), min(ys), max(xs)+1, max(ys)+1)])
+
+    def draw(self, gc, window):
+        """
+        Draw the connection.
+
+        Args:
+            gc: the graphics context
+            window: the gtk window to draw on
+        """
+        if not self.update_shapes(): return
+        sink = self.get_sink()
+        source = self.get_source()
         #draw
         if self.is_highlighted(): border_color = Colors.HIGHLIGHT_COLOR
         elif self.get_enabled(): border_color = Colors.CONNECTION_ENABLED_COLOR
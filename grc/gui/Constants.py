@@ -42,7 +42,9 @@ DEFAULT_BLOCKS_WINDOW_WIDTH = 100
 DEFAULT_REPORTS_WINDOW_WIDTH = 100
 
 ##The size of the state saving cache in the flow graph (for undo/redo functionality)
-STATE_CACHE_SIZE = 42
+STATE_CACHE_SIZE = 1000
+##The memory budget of the undo/redo history in bytes (an estimate)
+STATE_CACHE_MEMORY = 16*1024*1024
 
 ##Shared targets for drag and drop of blocks
 DND_TARGETS = [('STRING', gtk.TARGET_SAME_APP, 0)]
@@ -83,4 +85,7 @@ SCROLL_DISTANCE = 15
 LINE_SELECT_SENSITIVITY = 5
 
 # canvas grid size
-CANVAS_GRID_SIZE = 8
\ No newline at end of file
+CANVAS_GRID_SIZE = 8
+
+# size of the cells of the element index in pixels
+ELEMENT_INDEX_CELL_SIZE = 256
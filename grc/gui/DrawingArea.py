@@ -70,6 +70,8 @@ class DrawingArea(gtk.DrawingArea):
     def new_pixmap(self, width, height): return gtk.gdk.Pixmap(self.window, width, height, -1)
     def get_pixbuf(self):
         width, height = self._pixmap.get_size()
+        #only the exposed parts of the pixmap are up to date
+        self._flow_graph.draw(self.window.new_gc(), self._pixmap)
         pixbuf = gtk.gdk.Pixbuf(gtk.gdk.COLORSPACE_RGB, 0, 8, width, height)
         pixbuf.get_from_drawable(self._pixmap, self._pixmap.get_colormap(), 0, 0, 0, 0, width, height)
         return pixbuf
@@ -136,11 +138,13 @@ class DrawingArea(gtk.DrawingArea):
     def _handle_window_expose(self, widget, event):
         """
         Called when window is exposed, or queue_draw is called.
-        Double buffering: draw to pixmap, then draw pixmap to window.
+        Double buffering: draw the exposed area to pixmap, then draw that area of the pixmap to window.
         """
         gc = self.window.new_gc()
-        self._flow_graph.draw(gc, self._pixmap)
-        self.window.draw_drawable(gc, self._pixmap, 0, 0, 0, 0, -1, -1)
+        area = event.area.intersect(gtk.gdk.Rectangle(0, 0, *self._pixmap.get_size()))
+        gc.set_clip_rectangle(area)
+        self._flow_graph.draw(gc, self._pixmap, (area.x, area.y, area.width, area.height))
+        self.window.draw_drawable(gc, self._pixmap, area.x, area.y, area.x, area.y, area.width, area.height)
 
     def _handle_focus_lost_event(self, widget, event):
         # don't clear selection while context menu is active
@@ -198,6 +198,26 @@ class Element(object):
         """
         self._lines_list.append((rel_coor1, rel_coor2))
 
+    def get_extent(self):
+        """
+        Get the rectangle that holds the areas and lines of this element.
+        The right and bottom edges are just outside, so that lines on the border are inside.
+
+        Returns:
+            the (x1, y1, x2, y2) tuple or None if there are no areas and lines
+        """
+        xs = list()
+        ys = list()
+        for (x, y), (w, h) in self._areas_list:
+            xs.extend((x, x+w))
+            ys.extend((y, y+h))
+        for (x1, y1), (x2, y2) in self._lines_list:
+            xs.extend((x1, x2))
+            ys.extend((y1, y2))
+        if not xs: return None
+        X, Y = self.get_coordinate()
+        return (X+int(min(xs)), Y+int(min(ys)), X+int(max(xs))+1, Y+int(max(ys))+1)
+
     def what_is_selected(self, coor, coor_m=None):
         """
         One coordinate specified:
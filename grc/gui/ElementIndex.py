@@ -0,0 +1,131 @@
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+from Constants import ELEMENT_INDEX_CELL_SIZE
+
+def get_union(extents):
+    """
+    Get the extent that covers all of the given extents.
+
+    Args:
+        extents: a list of (x1, y1, x2, y2) tuples or None
+
+    Returns:
+        the union extent or None if there are none
+    """
+    extents = filter(None, extents)
+    if not extents: return None
+    x1s, y1s, x2s, y2s = zip(*extents)
+    return (min(x1s), min(y1s), max(x2s), max(y2s))
+
+def overlaps(extent_a, extent_b):
+    """
+    Do the extents overlap?
+
+    Args:
+        extent_a: an (x1, y1, x2, y2) tuple
+        extent_b: an (x1, y1, x2, y2) tuple
+
+    Returns:
+        true if they have a pixel in common
+    """
+    ax1, ay1, ax2, ay2 = extent_a
+    bx1, by1, bx2, by2 = extent_b
+    return ax1 < bx2 and bx1 < ax2 and ay1 < by2 and by1 < ay2
+
+class ElementIndex(object):
+    """
+    The element index keeps the extent of each element in the cells of a grid over the canvas,
+    so the elements in an area can be found without testing all of them.
+    An extent is the rectangle (x1, y1, x2, y2) with x2 and y2 just outside of it.
+    """
+
+    def __init__(self, cell_size=ELEMENT_INDEX_CELL_SIZE):
+        """
+        ElementIndex constructor.
+
+        Args:
+            cell_size: the width and height of the cells in pixels
+        """
+        self._cell_size = cell_size
+        self._cells = dict() #(column, row) to the set of elements in the cell
+        self._extents = dict() #element to extent or None
+
+    def __len__(self): return len(self._extents)
+
+    def _get_cells(self, extent):
+        x1, y1, x2, y2 = map(int, extent)
+        size = self._cell_size
+        return [(column, row)
+            for column in range(x1//size, (x2 - 1)//size + 1)
+            for row in range(y1//size, (y2 - 1)//size + 1)]
+
+    def update(self, element, extent):
+        """
+        Set the extent of the element.
+
+        Args:
+            element: the element
+            extent: the new extent or None for an element without shapes
+        """
+        self.remove(element)
+        self._extents[element] = extent
+        if extent is None: return
+        for cell in self._get_cells(extent): self._cells.setdefault(cell, set()).add(element)
+
+    def remove(self, element):
+        """
+        Remove the element from the index.
+
+        Args:
+            element: the element
+        """
+        if element not in self._extents: return
+        extent = self._extents.pop(element)
+        if extent is None: return
+        for cell in self._get_cells(extent):
+            elements = self._cells[cell]
+            elements.discard(element)
+            if not elements: del self._cells[cell]
+
+    def get_extent(self, element):
+        """
+        Get the extent of the element.
+
+        Args:
+            element: the element
+
+        Returns:
+            the extent or None if the element has no shapes or is not in the index
+        """
+        return self._extents.get(element)
+
+    def get_elements(self, extent):
+        """
+        Get the elements that overlap the extent.
+
+        Args:
+            extent: the (x1, y1, x2, y2) tuple
+
+        Returns:
+            a set of elements
+        """
+        found = set()
+        for cell in self._get_cells(extent): found.update(self._cells.get(cell, ()))
+        return set(element for element in found if overlaps(self._extents[element], extent))
@@ -17,11 +17,12 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
-from Constants import SCROLL_PROXIMITY_SENSITIVITY, SCROLL_DISTANCE
+from Constants import SCROLL_PROXIMITY_SENSITIVITY, SCROLL_DISTANCE, LINE_SELECT_SENSITIVITY
 import Actions
 import Colors
 import Utils
 from Element import Element
+from ElementIndex import ElementIndex, get_union
 import pygtk
 pygtk.require('2.0')
 import gtk
@@ -53,6 +54,8 @@ class FlowGraph(Element):
         self._new_selected_port = None
         # current mouse hover element
         self.element_under_mouse = None
+        #extents of the elements, made on first use
+        self._element_index = None
         #context menu
         self._context_menu = gtk.Menu()
         for action in [
@@ -81,7 +84,10 @@ class FlowGraph(Element):
     def get_drawing_area(self): return self.drawing_area
     def queue_draw(self): self.get_drawing_area().queue_draw()
     def get_size(self): return self.get_drawing_area().get_size_request()
-    def set_size(self, *args): self.get_drawing_area().set_size_request(*args)
+    def set_size(self, *args):
+        self.get_drawing_area().set_size_request(*args)
+        #blocks are kept inside the flow graph size, their extents may change
+        self._element_index = None
     def get_scroll_pane(self): return self.drawing_area.get_parent()
     def get_ctrl_mask(self): return self.drawing_area.ctrl_mask
     def get_mod1_mask(self): return self.drawing_area.mod1_mask
@@ -236,13 +242,17 @@ class FlowGraph(Element):
     def move_selected(self, delta_coordinate):
         """
         Move the element and by the change in coordinates.
+        Queue a draw of the area the moved blocks and their connections left and entered.
 
         Args:
             delta_coordinate: the change in coordinates
         """
+        elements = self._get_blocks_and_connections(self.get_selected_blocks())
+        extents = self._get_extents(elements)
         for selected_block in self.get_selected_blocks():
             selected_block.move(delta_coordinate)
             self.element_moved = True
+        self._update_extents(elements, extents)
 
     def rotate_selected(self, rotation):
         """
@@ -287,37 +297,56 @@ class FlowGraph(Element):
             changed = True
         return changed
 
-    def draw(self, gc, window):
+    def _get_select_rectangle(self):
+        """
+        Get the multi select rectangle while it is shown.
+
+        Returns:
+            the (x, y, w, h) tuple or None
+        """
+        if not (self.mouse_pressed and (not self.get_selected_elements() or self.get_ctrl_mask())): return None
+        #coordinates
+        x1, y1 = self.press_coor
+        x2, y2 = self.get_coordinate()
+        #calculate top-left coordinate and width/height
+        x, y = int(min(x1, x2)), int(min(y1, y2))
+        w, h = int(abs(x1 - x2)), int(abs(y1 - y2))
+        return x, y, w, h
+
+    def draw(self, gc, window, area=None):
         """
         Draw the background and grid if enabled.
-        Draw all of the elements in this flow graph onto the pixmap.
+        Draw the elements in this flow graph that are in the area onto the pixmap.
         Draw the pixmap to the drawable window of this flow graph.
+
+        Args:
+            gc: the graphics context
+            window: the pixmap to draw on
+            area: the (x, y, w, h) tuple to draw or None for all of it
         """
-        W,H = self.get_size()
+        if area is None: area = (0, 0) + tuple(self.get_size())
+        x, y, w, h = area
         #draw the background
         gc.set_foreground(Colors.FLOWGRAPH_BACKGROUND_COLOR)
-        window.draw_rectangle(gc, True, 0, 0, W, H)
+        window.draw_rectangle(gc, True, x, y, w, h)
         #draw multi select rectangle
-        if self.mouse_pressed and (not self.get_selected_elements() or self.get_ctrl_mask()):
-            #coordinates
-            x1, y1 = self.press_coor
-            x2, y2 = self.get_coordinate()
-            #calculate top-left coordinate and width/height
-            x, y = int(min(x1, x2)), int(min(y1, y2))
-            w, h = int(abs(x1 - x2)), int(abs(y1 - y2))
-            #draw
+        select_rectangle = self._get_select_rectangle()
+        if select_rectangle:
             gc.set_foreground(Colors.HIGHLIGHT_COLOR)
-            window.draw_rectangle(gc, True, x, y, w, h)
+            window.draw_rectangle(gc, True, *select_rectangle)
             gc.set_foreground(Colors.BORDER_COLOR)
-            window.draw_rectangle(gc, False, x, y, w, h)
+            window.draw_rectangle(gc, False, *select_rectangle)
+        #only the elements that overlap the area
+        in_area = self.get_element_index().get_elements((x, y, x+w, y+h))
         #draw blocks on top of connections
         for element in self.get_connections() + self.get_blocks():
+            if element not in in_area: continue
             if Actions.TOGGLE_HIDE_DISABLED_BLOCKS.get_active() and not element.get_enabled():
                 continue  # skip hidden disabled blocks and connections
             element.draw(gc, window)
         #draw selected blocks on top of selected connections
         for selected_element in self.get_selected_connections() + self.get_selected_blocks():
-            selected_element.draw(gc, window)
+            if selected_element in in_area: selected_element.draw(gc, window)
 
     def update_selected(self):
         """
@@ -348,6 +377,99 @@ class FlowGraph(Element):
         self.create_labels()
         self.create_shapes()
 
+    def create_shapes(self):
+        """
+        Create the shapes of all elements.
+        The element index is made again on the next use.
+        """
+        Element.create_shapes(self)
+        self._element_index = None
+
+    ##########################################################################
+    ## Element Index
+    ##########################################################################
+    def get_element_index(self):
+        """
+        Get the index of the element extents.
+        It is made again after the shapes were created or the number of elements changed.
+
+        Returns:
+            the element index
+        """
+        if self._element_index is None or len(self._element_index) != len(self.get_elements()):
+            self._element_index = ElementIndex()
+            for element in self.get_elements(): self._element_index.update(element, element.get_extent())
+        return self._element_index
+
+    def _get_blocks_and_connections(self, blocks):
+        """
+        Get the blocks followed by the connections of their ports, each once.
+        """
+        connections = list()
+        seen = set()
+        for block in blocks:
+            for connection in block.get_connections():
+                if connection in seen: continue
+                seen.add(connection)
+                connections.append(connection)
+        return list(blocks) + connections
+
+    def _get_extents(self, elements):
+        """
+        Get the extents of the elements in the element index.
+        """
+        element_index = self.get_element_index()
+        return [element_index.get_extent(element) for element in elements]
+
+    def _update_extents(self, elements, old_extents):
+        """
+        Update the extents of changed elements in the element index.
+        Queue a draw of the old and the new extents.
+
+        Args:
+            elements: the changed elements
+            old_extents: the extents before the change
+        """
+        element_index = self.get_element_index()
+        extents = list(old_extents)
+        for element in elements:
+            extent = element.get_extent()
+            element_index.update(element, extent)
+            extents.append(extent)
+        self.queue_draw_extent(get_union(extents))
+
+    def queue_draw_extent(self, extent):
+        """
+        Queue a draw of a part of the drawing area.
+
+        Args:
+            extent: the (x1, y1, x2, y2) tuple or None for nothing
+        """
+        if extent is None: return
+        x1, y1, x2, y2 = map(int, extent)
+        self.get_drawing_area().queue_draw_area(x1, y1, x2-x1, y2-y1)
+
+    def _get_elements_at(self, coor, coor_m=None):
+        """
+        Get the elements that may be selected at the coordinate or in the region.
+
+        Args:
+            coor: the selection coordinate
+            coor_m: an additional coordinate for multi select
+
+        Returns:
+            a set of elements
+        """
+        x, y = coor
+        if coor_m:
+            x_m, y_m = coor_m
+            extent = (min(x, x_m), min(y, y_m), max(x, x_m)+1, max(y, y_m)+1)
+        else:
+            #lines are selected near them
+            extent = (x-LINE_SELECT_SENSITIVITY, y-LINE_SELECT_SENSITIVITY,
+                      x+LINE_SELECT_SENSITIVITY+1, y+LINE_SELECT_SENSITIVITY+1)
+        return self.get_element_index().get_elements(extent)
+
     ##########################################################################
     ## Get Selected
     ##########################################################################
@@ -375,8 +497,10 @@ class FlowGraph(Element):
         """
         selected_port = None
         selected = set()
+        at_coor = self._get_elements_at(coor, coor_m)
         #check the elements
         for element in reversed(self.get_elements()):
+            if element not in at_coor: continue
             selected_element = element.what_is_selected(coor, coor_m)
             if not selected_element: continue
             # hidden disabled connections, blocks and their ports can not be selected
@@ -556,24 +680,30 @@ class FlowGraph(Element):
         if not self.mouse_pressed:
             # only continue if mouse-over stuff is enabled (just the auto-hide port label stuff for now)
             if not Actions.TOGGLE_AUTO_HIDE_PORT_LABELS.get_active(): return
-            redraw = False
+            redraw = list()
+            at_coor = self._get_elements_at(coordinate)
             for element in reversed(self.get_elements()):
+                if element not in at_coor: continue
                 over_element = element.what_is_selected(coordinate)
                 if not over_element: continue
                 if over_element != self.element_under_mouse:  # over sth new
-                    if self.element_under_mouse:
-                        redraw |= self.element_under_mouse.mouse_out() or False
+                    if self.element_under_mouse and self.element_under_mouse.mouse_out():
+                        redraw.append(self.element_under_mouse)
                     self.element_under_mouse = over_element
-                    redraw |= over_element.mouse_over() or False
+                    if over_element.mouse_over(): redraw.append(over_element)
                 break
             else:
                 if self.element_under_mouse:
-                    redraw |= self.element_under_mouse.mouse_out() or False
+                    if self.element_under_mouse.mouse_out(): redraw.append(self.element_under_mouse)
                     self.element_under_mouse = None
             if redraw:
                 #self.create_labels()
-                self.create_shapes()
-                self.queue_draw()
+                #only the blocks of the ports changed, and their connections
+                blocks = set(element.get_parent() if element.is_port() else element for element in redraw)
+                elements = self._get_blocks_and_connections(filter(lambda e: e.is_block(), blocks))
+                extents = self._get_extents(elements)
+                for element in elements: element.create_shapes()
+                self._update_extents(elements, extents)
         else:
             #perform auto-scrolling
             width, height = self.get_size()
@@ -594,6 +724,7 @@ class FlowGraph(Element):
             #remove the connection if selected in drag event
             if len(self.get_selected_elements()) == 1 and self.get_selected_element().is_connection():
                 Actions.ELEMENT_DELETE()
+            old_select_rectangle = self._get_select_rectangle()
             #move the selected elements and record the new coordinate
             if not self.get_ctrl_mask():
                 X, Y = self.get_coordinate()
@@ -602,5 +733,10 @@ class FlowGraph(Element):
                 if not active or abs(dX) >= Utils.CANVAS_GRID_SIZE or abs(dY) >= Utils.CANVAS_GRID_SIZE:
                     self.move_selected((dX, dY))
                     self.set_coordinate((x, y))
-            #queue draw for animation
-            self.queue_draw()
+            #queue draw for animation, the moved elements queue their own
+            extents = list()
+            for select_rectangle in (old_select_rectangle, self._get_select_rectangle()):
+                if not select_rectangle: continue
+                rect_x, rect_y, rect_w, rect_h = select_rectangle
+                extents.append((rect_x, rect_y, rect_x+rect_w+1, rect_y+rect_h+1))
+            self.queue_draw_extent(get_union(extents))
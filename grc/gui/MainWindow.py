@@ -50,6 +50,9 @@ $new_flowgraph_title#slurp
  - $platform_name#slurp
 """
 
+EVAL_STATUS_FORMAT = 'Evaluated %(evaluated)d of %(variables)d variables in %(ms).1f ms, ' \
+    'expression cache: %(cache_size)d entries, %(hit_rate)d%% hits'
+
 PAGE_TITLE_MARKUP_TMPL = """\
 #set $foreground = $saved and 'black' or 'red'
 <span foreground="$foreground">$encode($title or $new_flowgraph_title)</span>#slurp
@@ -81,6 +84,9 @@ class MainWindow(gtk.Window):
         vbox.pack_start(Bars.MenuBar(), False)
         vbox.pack_start(Bars.Toolbar(), False)
         vbox.pack_start(self.hpaned)
+        self.status_bar = gtk.Statusbar()
+        self.status_bar.set_has_resize_grip(False)
+        vbox.pack_start(self.status_bar, False)
         #create the notebook
         self.notebook = gtk.Notebook()
         self.page_to_be_closed = None
@@ -281,6 +287,19 @@ class MainWindow(gtk.Window):
         )
         #show/hide notebook tabs
         self.notebook.set_show_tabs(len(self._get_pages()) > 1)
+        self.update_eval_status()
+
+    def update_eval_status(self):
+        """
+        Show the timing of the last namespace evaluation in the status bar.
+        """
+        context = self.status_bar.get_context_id('eval')
+        self.status_bar.pop(context)
+        stats = self.get_flow_graph().get_eval_stats()
+        if not stats: return
+        stats['ms'] = stats['seconds']*1e3
+        stats['hit_rate'] = 100*stats['cache_hits']/max(1, stats['cache_hits'] + stats['cache_misses'])
+        self.status_bar.push(context, EVAL_STATUS_FORMAT%stats)
 
     def get_page(self):
         """
@@ -48,6 +48,7 @@ class Port(Element):
         self._connector_coordinate = (0,0)
         self._connector_length = 0
         self._label_hidden = True
+        self._label_key = None
 
     def create_shapes(self):
         """Create new areas and labels for the port."""
@@ -107,12 +108,26 @@ class Port(Element):
         """Create the labels for the socket."""
         Element.create_labels(self)
         self._bg_color = Colors.get_color(self.get_color())
+        markup = Utils.parse_template(PORT_MARKUP_TMPL, port=self)
+        #the label pixmaps are kept until the markup, color, or orientation changes
+        label_key = (markup, self.get_color(), self.is_vertical())
+        if label_key != self._label_key:
+            self._label_key = label_key
+            self._create_label_pixmaps(markup)
+        self.W, self.H = 2*PORT_LABEL_PADDING + self.w, 2*PORT_LABEL_PADDING+self.h
+        self.H = self.modify_height(self.H)
+
+    def _create_label_pixmaps(self, markup):
+        """
+        Render the port name into the label pixmaps.
+
+        Args:
+            markup: the markup of the port name
+        """
         #create the layout
         layout = gtk.DrawingArea().create_pango_layout('')
-        layout.set_markup(Utils.parse_template(PORT_MARKUP_TMPL, port=self))
+        layout.set_markup(markup)
         self.w, self.h = layout.get_pixel_size()
-        self.W, self.H = 2*PORT_LABEL_PADDING + self.w, 2*PORT_LABEL_PADDING+self.h
-        self.H = self.modify_height(self.H)
         #create the pixmap
         pixmap = self.get_parent().get_parent().new_pixmap(self.w, self.h)
         gc = pixmap.new_gc()
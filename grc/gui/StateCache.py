@@ -17,14 +17,187 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
+import sys
+
 import Actions
-from Constants import STATE_CACHE_SIZE
+from Constants import STATE_CACHE_SIZE, STATE_CACHE_MEMORY
+from .. base.odict import odict
+
+def _keyed(named_records):
+    """
+    Make a section from (name, record) pairs: a tuple of keys in order and a dict of key to record.
+    The key is the name and the number of earlier records with that name.
+    """
+    order = list()
+    records = dict()
+    counts = dict()
+    for name, record in named_records:
+        key = (name, counts.get(name, 0))
+        counts[name] = key[1] + 1
+        order.append(key)
+        records[key] = record
+    return tuple(order), records
+
+def _flatten(n):
+    """
+    Flatten the nested data of a flow graph.
+    The block records hold their items, with None in place of the params,
+    and the items of each param. Blocks are named by their id,
+    connections by their record.
+
+    Args:
+        n: the nested data odict
+
+    Returns:
+        a tuple of the header items, the block section, and the connection section
+    """
+    fg_n = n and n.find('flow_graph') or odict()
+    header = (
+        tuple((key, value) for key, value in (n and n.items() or ()) if key != 'flow_graph'),
+        tuple((key, value) for key, value in fg_n.items() if key not in ('block', 'connection')),
+    )
+    blocks = list()
+    for block_n in fg_n.findall('block'):
+        params = tuple(tuple(param_n.items()) for param_n in block_n.findall('param'))
+        items = tuple((key, None if key == 'param' else value) for key, value in block_n.items())
+        ids = [dict(param).get('value') for param in params if dict(param).get('key') == 'id']
+        blocks.append((ids and ids[0] or None, (items, params)))
+    connections = [(record, record) for record in map(lambda c: tuple(c.items()), fg_n.findall('connection'))]
+    return header, _keyed(blocks), _keyed(connections)
+
+def _to_odict(items):
+    n = odict()
+    for key, value in items: n[key] = value
+    return n
+
+def _unflatten(state):
+    """
+    Rebuild the nested data of a flow graph from the flattened state.
+    """
+    header, (block_order, blocks), (connection_order, connections) = state
+    fg_n = _to_odict(header[1])
+    fg_n['block'] = list()
+    for key in block_order:
+        items, params = blocks[key]
+        block_n = odict()
+        for item_key, value in items:
+            if item_key == 'param': value = map(_to_odict, params)
+            block_n[item_key] = value
+        fg_n['block'].append(block_n)
+    fg_n['connection'] = [_to_odict(connections[key]) for key in connection_order]
+    n = odict()
+    n['flow_graph'] = fg_n
+    for key, value in header[0]: n[key] = value
+    return n
+
+def _diff_params(old, new):
+    """
+    The params changed between two block records, or None if more than the params changed.
+    """
+    (old_items, old_params), (new_items, new_params) = old, new
+    if old_items != new_items or len(old_params) != len(new_params): return None
+    return tuple((i, a, b) for i, (a, b) in enumerate(zip(old_params, new_params)) if a != b)
+
+def _diff_section(old, new, diff_records):
+    """
+    Get the difference between two sections.
+    The records of new that equal the ones of old are replaced by them,
+    so unchanged records are shared between states.
+
+    Args:
+        old: the old section
+        new: the new section
+        diff_records: a function to get the changes between two records or None
+
+    Returns:
+        a tuple of the removed (index, key, record), the added (key, record),
+        the replaced (key, old record, new record), the changed (key, changes),
+        and the old and new key order if it does not follow from the rest
+    """
+    (old_order, old_records), (new_order, new_records) = old, new
+    removed = tuple((i, key, old_records[key]) for i, key in enumerate(old_order) if key not in new_records)
+    added = tuple((key, new_records[key]) for key in new_order if key not in old_records)
+    replaced = list()
+    changed = list()
+    for key in new_order:
+        if key not in old_records: continue
+        old_record, new_record = old_records[key], new_records[key]
+        if old_record == new_record:
+            new_records[key] = old_record
+            continue
+        changes = diff_records(old_record, new_record)
+        if changes is None: replaced.append((key, old_record, new_record))
+        else: changed.append((key, changes))
+    #removing and appending gives the new order in most cases
+    kept = tuple(key for key in old_order if key in new_records)
+    orders = None
+    if kept + tuple(key for key, record in added) != new_order: orders = (old_order, new_order)
+    return removed, added, tuple(replaced), tuple(changed), orders
+
+def _patch_section(section, diff, forward):
+    """
+    Apply a section difference forward or backward.
+    The records of the section are updated in place.
+
+    Returns:
+        the patched section
+    """
+    order, records = section
+    removed, added, replaced, changed, orders = diff
+    for key, old_record, new_record in replaced:
+        records[key] = new_record if forward else old_record
+    for key, changes in changed:
+        items, params = records[key]
+        params = list(params)
+        for i, old_param, new_param in changes: params[i] = new_param if forward else old_param
+        records[key] = (items, tuple(params))
+    if forward:
+        for i, key, record in removed: del records[key]
+        for key, record in added: records[key] = record
+        if orders: return orders[1], records
+        removed_keys = set(key for i, key, record in removed)
+        return tuple(key for key in order if key not in removed_keys) + tuple(key for key, record in added), records
+    for key, record in added: del records[key]
+    for i, key, record in removed: records[key] = record
+    if orders: return orders[0], records
+    #the added keys are at the end, the removed ones go back to their index
+    order = list(order[:len(order) - len(added)])
+    for i, key, record in removed: order.insert(i, key)
+    return tuple(order), records
+
+def _diff(old, new):
+    header = (old[0], new[0]) if old[0] != new[0] else None
+    return (
+        header,
+        _diff_section(old[1], new[1], _diff_params),
+        _diff_section(old[2], new[2], lambda old_record, new_record: None),
+    )
+
+def _patch(state, diff, forward):
+    header = diff[0][1 if forward else 0] if diff[0] else state[0]
+    return (
+        header,
+        _patch_section(state[1], diff[1], forward),
+        _patch_section(state[2], diff[2], forward),
+    )
+
+def _sizeof(obj):
+    """
+    Estimate the memory used by nested tuples of data.
+    Shared objects are counted every time.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)): size += sum(map(_sizeof, obj))
+    return size
 
 class StateCache(object):
     """
-    The state cache is an interface to a list to record data/states and to revert to previous states.
-    States are recorded into the list in a circular fassion by using an index for the current state,
-    and counters for the range where states are stored.
+    The state cache records the states of a flow graph to revert to previous states.
+    Only the current state is kept whole. The undo and redo history holds the
+    differences between successive states: the blocks and connections added
+    and removed, and the params changed, so a moved block takes one param.
+    The oldest differences are dropped when there are STATE_CACHE_SIZE states,
+    or the estimated size of the history exceeds STATE_CACHE_MEMORY bytes.
     """
 
     def __init__(self, initial_state):
@@ -34,63 +207,71 @@ class StateCache(object):
         Args:
             initial_state: the intial state (nested data)
         """
-        self.states = [None] * STATE_CACHE_SIZE #fill states
-        self.current_state_index = 0
-        self.num_prev_states = 0
-        self.num_next_states = 0
-        self.states[0] = initial_state
+        self.current_state = _flatten(initial_state)
+        self.prev_diffs = list() #(diff, size) up to the current state, oldest first
+        self.next_diffs = list() #(diff, size) from the current state, next last
+        self.history_size = 0
         self.update_actions()
 
+    num_prev_states = property(lambda self: len(self.prev_diffs))
+    num_next_states = property(lambda self: len(self.next_diffs))
+
     def save_new_state(self, state):
         """
         Save a new state.
-        Place the new state at the next index and add one to the number of previous states.
+        Record the difference to the current state and drop the next states.
 
         Args:
             state: the new state
         """
-        self.current_state_index = (self.current_state_index + 1)%STATE_CACHE_SIZE
-        self.states[self.current_state_index] = state
-        self.num_prev_states = self.num_prev_states + 1
-        if self.num_prev_states == STATE_CACHE_SIZE: self.num_prev_states = STATE_CACHE_SIZE - 1
-        self.num_next_states = 0
+        new_state = _flatten(state)
+        diff = _diff(self.current_state, new_state)
+        self.current_state = new_state
+        self.prev_diffs.append((diff, _sizeof(diff)))
+        self.next_diffs = list()
+        self.history_size = sum(size for diff, size in self.prev_diffs)
+        #drop the oldest, but keep the last difference in any case
+        while len(self.prev_diffs) > 1 and (len(self.prev_diffs) >= STATE_CACHE_SIZE or
+                                            self.history_size > STATE_CACHE_MEMORY):
+            diff, size = self.prev_diffs.pop(0)
+            self.history_size -= size
         self.update_actions()
 
     def get_current_state(self):
         """
-        Get the state at the current index.
+        Get the current state.
 
         Returns:
             the current state (nested data)
         """
         self.update_actions()
-        return self.states[self.current_state_index]
+        return _unflatten(self.current_state)
 
     def get_prev_state(self):
         """
-        Get the previous state and decrement the current index.
+        Revert the current state to the previous one.
 
         Returns:
             the previous state or None
         """
-        if self.num_prev_states > 0:
-            self.current_state_index = (self.current_state_index + STATE_CACHE_SIZE -1)%STATE_CACHE_SIZE
-            self.num_next_states = self.num_next_states + 1
-            self.num_prev_states = self.num_prev_states - 1
+        if self.prev_diffs:
+            diff = self.prev_diffs.pop()
+            self.current_state = _patch(self.current_state, diff[0], False)
+            self.next_diffs.append(diff)
             return self.get_current_state()
         return None
 
     def get_next_state(self):
         """
-        Get the nest state and increment the current index.
+        Advance the current state to the next one.
 
         Returns:
             the next state or None
         """
-        if self.num_next_states > 0:
-            self.current_state_index = (self.current_state_index + 1)%STATE_CACHE_SIZE
-            self.num_next_states = self.num_next_states - 1
-            self.num_prev_states = self.num_prev_states + 1
+        if self.next_diffs:
+            diff = self.next_diffs.pop()
+            self.current_state = _patch(self.current_state, diff[0], True)
+            self.prev_diffs.append(diff)
             return self.get_current_state()
         return None
 
@@ -129,6 +129,7 @@ class Block(_Block, _GUIBlock):
             # renumber non-message/-msg ports
             for i, port in enumerate(filter(lambda p: p.get_key().isdigit(), ports)):
                 port._key = str(i)
+            ports.reindex()
 
     def port_controller_modify(self, direction):
         """
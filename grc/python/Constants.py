@@ -29,6 +29,8 @@ HIER_BLOCKS_LIB_DIR = os.environ.get('GRC_HIER_PATH',
                                      os.path.expanduser('~/.grc_gnuradio'))
 PREFS_FILE = os.environ.get('GRC_PREFS_PATH',
                             os.path.join(os.path.expanduser('~/.grc')))
+BLOCK_CACHE_FILE = os.environ.get('GRC_BLOCK_CACHE_PATH',
+                                  os.path.expanduser('~/.grc_block_cache'))
 BLOCKS_DIRS = filter( #filter blank strings
     lambda x: x, PATH_SEP.join([
         os.environ.get('GRC_BLOCKS_PATH', ''),
@@ -39,6 +41,7 @@ BLOCKS_DIRS = filter( #filter blank strings
 
 #user settings
 XTERM_EXECUTABLE = _gr_prefs.get_string('grc', 'xterm_executable', 'xterm')
+EVAL_CACHE_SIZE = _gr_prefs.get_long('grc', 'eval_cache_size', 1000)
 
 #file creation modes
 TOP_BLOCK_FILE_MODE = stat.S_IRUSR | stat.S_IWUSR | stat.S_IXUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IXGRP | stat.S_IROTH
@@ -21,6 +21,9 @@ import expr_utils
 from .. base.FlowGraph import FlowGraph as _FlowGraph
 from .. gui.FlowGraph import FlowGraph as _GUIFlowGraph
 from .. base.odict import odict
+from Constants import EVAL_CACHE_SIZE
+import itertools
+import time
 import re
 
 _variable_matcher = re.compile('^(variable\w*)$')
@@ -31,12 +34,46 @@ _bussrc_searcher = re.compile('^(bus_source)$')
 _bus_struct_sink_searcher = re.compile('^(bus_structure_sink)$')
 _bus_struct_src_searcher = re.compile('^(bus_structure_source)$')
 
+_namespace_ids = itertools.count()
+
+class _eval_cache(object):
+    """
+    Bounded cache of evaluated expressions.
+    When full, the least recently used quarter of the entries is dropped.
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max(1, max_size)
+        self._entries = dict() #key -> [value, last use]
+        self._clock = itertools.count()
+        self.hits = self.misses = 0
+
+    def __len__(self): return len(self._entries)
+
+    def get(self, key, make_value):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            if len(self._entries) >= self._max_size: self._trim()
+            entry = self._entries[key] = [make_value(), None]
+        else: self.hits += 1
+        entry[1] = self._clock.next()
+        return entry[0]
+
+    def _trim(self):
+        by_age = sorted(self._entries.iteritems(), key=lambda item: item[1][1])
+        for key, entry in by_age[:max(1, len(by_age)/4)]: del self._entries[key]
+
 class FlowGraph(_FlowGraph, _GUIFlowGraph):
 
     def __init__(self, **kwargs):
         _FlowGraph.__init__(self, **kwargs)
         _GUIFlowGraph.__init__(self)
-        self._eval_cache = dict()
+        self._eval_cache = _eval_cache(EVAL_CACHE_SIZE)
+        self._eval_state = None
+        self._eval_stats = None
+        self.n = dict()
+        self.n_hash = _namespace_ids.next()
 
     def _eval(self, code, namespace, namespace_hash):
         """
@@ -51,12 +88,8 @@ class FlowGraph(_FlowGraph, _GUIFlowGraph):
             the resultant object
         """
         if not code: raise Exception, 'Cannot evaluate empty statement.'
-        my_hash = hash(code) ^ namespace_hash
-        #cache if does not exist
-        if not self._eval_cache.has_key(my_hash):
-            self._eval_cache[my_hash] = eval(code, namespace, namespace)
-        #return from cache
-        return self._eval_cache[my_hash]
+        return self._eval_cache.get((code, namespace_hash),
+                                    lambda: eval(code, namespace, namespace))
 
     def get_io_signaturev(self, direction):
         """
@@ -154,6 +187,25 @@ class FlowGraph(_FlowGraph, _GUIFlowGraph):
         variables = filter(lambda b: _variable_matcher.match(b.get_key()), self.get_enabled_blocks())
         return expr_utils.sort_objects(variables, lambda v: v.get_id(), lambda v: v.get_var_make())
 
+    def get_params_by_type(self):
+        """
+        Index the params of the enabled blocks by type.
+        Params with a templated type are kept apart,
+        since their type depends on the values of other params.
+
+        Returns:
+            a dict of type to a list of (position, param), and a list of (position, param)
+        """
+        def make():
+            by_type = dict()
+            templated = list()
+            params = sum([block.get_params() for block in self.get_enabled_blocks()], [])
+            for i, param in enumerate(params):
+                if '$' in param._type: templated.append((i, param))
+                else: by_type.setdefault(param._type, list()).append((i, param))
+            return by_type, templated
+        return self._get_cached('params_by_type', make)
+
     def get_parameters(self):
         """
         Get a list of all paramterized variables in this flow graph namespace.
@@ -232,42 +284,101 @@ class FlowGraph(_FlowGraph, _GUIFlowGraph):
         _FlowGraph.rewrite(self);
         reconnect_bus_blocks();
 
-    def evaluate(self, expr):
+    def _renew_namespace(self):
         """
-        Evaluate the expression.
-
-        Args:
-            expr: the string expression
-        @throw Exception bad expression
-
-        Returns:
-            the evaluated data
+        Bring the evaluation namespace up to date with the flow graph.
+
+        The imports, parameters, and variable expressions used for the last
+        namespace are remembered, along with the namespace of just the
+        imports and parameters. When only variables changed, just those
+        and the variables depending on them are reset to that namespace
+        and evaluated again, in dependency order. Otherwise the namespace
+        is rebuilt from scratch.
         """
-        if self._renew_eval_ns:
-            self._renew_eval_ns = False
+        start = time.time()
+        imports = self.get_imports()
+        params = [(p.get_id(), p.get_param('value').to_code()) for p in self.get_parameters()]
+        variables = [(v.get_id(), v.get_var_value()) for v in self.get_variables()]
+        var_exprs = dict(variables)
+        state = self._eval_state
+        if state is not None and state[0] == imports and state[1] == params:
+            #incremental: find changed, added, and removed variables
+            old_exprs, base = state[2], state[3]
+            changed = set(var for var, expr in variables if old_exprs.get(var) != expr)
+            changed.update(var for var in old_exprs if var not in var_exprs)
+            dirty = changed and expr_utils.get_dependents(var_exprs, changed)
+            n = self.n
+            for var in dirty:
+                #a variable may hide an import or parameter of the same name
+                if var in base: n[var] = base[var]
+                else: n.pop(var, None)
+            rebuilt = False
+        else:
             #reload namespace
+            dirty = set(var_exprs)
             n = dict()
+            rebuilt = True
             #load imports
-            for imp in self.get_imports():
+            for imp in imports:
                 try: exec imp in n
                 except: pass
             #load parameters
             np = dict()
-            for parameter in self.get_parameters():
+            for param_id, code in params:
                 try:
-                    e = eval(parameter.get_param('value').to_code(), n, n)
-                    np[parameter.get_id()] = e
+                    e = eval(code, n, n)
+                    np[param_id] = e
                 except: pass
             n.update(np) #merge param namespace
-            #load variables
-            for variable in self.get_variables():
-                try:
-                    e = eval(variable.get_var_value(), n, n)
-                    n[variable.get_id()] = e
-                except: pass
-            #make namespace public
+            base = dict(n)
+        #load variables
+        evaluated = 0
+        for var, expr in variables:
+            if var not in dirty: continue
+            evaluated += 1
+            try:
+                e = eval(expr, n, n)
+                n[var] = e
+            except: pass
+        #make namespace public
+        if dirty or rebuilt:
             self.n = n
-            self.n_hash = hash(str(n))
+            self.n_hash = _namespace_ids.next()
+        self._eval_state = (imports, params, var_exprs, base)
+        self._eval_stats = (evaluated, len(variables), time.time() - start)
+
+    def get_eval_stats(self):
+        """
+        Get statistics on the last namespace update and the expression cache.
+
+        Returns:
+            a dict, or None if the namespace was never evaluated
+        """
+        if self._eval_stats is None: return None
+        evaluated, variables, seconds = self._eval_stats
+        return {
+            'evaluated': evaluated,
+            'variables': variables,
+            'seconds': seconds,
+            'cache_size': len(self._eval_cache),
+            'cache_hits': self._eval_cache.hits,
+            'cache_misses': self._eval_cache.misses,
+        }
+
+    def evaluate(self, expr):
+        """
+        Evaluate the expression.
+
+        Args:
+            expr: the string expression
+        @throw Exception bad expression
+
+        Returns:
+            the evaluated data
+        """
+        if self._renew_eval_ns:
+            self._renew_eval_ns = False
+            self._renew_namespace()
         #evaluate
         e = self._eval(expr, self.n, self.n_hash)
         return e
@@ -136,10 +136,7 @@ Add a Misc->Throttle block to your flow graph to avoid CPU congestion.''')
             for cb in sum([block.get_callbacks() for block in self._flow_graph.get_enabled_blocks()], [])
         ]
         #map var id to callbacks
-        var_id2cbs = dict(
-            [(var_id, filter(lambda c: expr_utils.get_variable_dependencies(c, [var_id]), callbacks))
-            for var_id in var_ids]
-        )
+        var_id2cbs = expr_utils.get_dependency_index([(cb, cb) for cb in callbacks], var_ids)
         #load the namespace
         namespace = {
             'title': title,
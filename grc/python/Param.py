@@ -433,4 +433,6 @@ class Param(_Param, _GUIParam):
         Returns:
             a list of params
         """
-        return sum([filter(lambda p: p.get_type() == type, block.get_params()) for block in self.get_parent().get_parent().get_enabled_blocks()], [])
+        by_type, templated = self.get_parent().get_parent().get_params_by_type()
+        params = by_type.get(type, []) + [(i, p) for i, p in templated if p.get_type() == type]
+        return [p for i, p in sorted(params)]
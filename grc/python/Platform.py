@@ -29,7 +29,7 @@ from Param import Param as _Param
 from Generator import Generator
 from Constants import \
     HIER_BLOCKS_LIB_DIR, BLOCK_DTD, \
-    DEFAULT_FLOW_GRAPH, BLOCKS_DIRS, PREFS_FILE
+    DEFAULT_FLOW_GRAPH, BLOCKS_DIRS, PREFS_FILE, BLOCK_CACHE_FILE
 import Constants
 
 COLORS = [(name, color) for name, key, sizeof, color in Constants.CORE_TYPES]
@@ -54,6 +54,7 @@ class Platform(_Platform, _GUIPlatform):
             default_flow_graph=DEFAULT_FLOW_GRAPH,
             generator=Generator,
             colors=COLORS,
+            block_cache_file=BLOCK_CACHE_FILE,
         )
 
         _GUIPlatform.__init__(
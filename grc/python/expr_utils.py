@@ -17,38 +17,53 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
+import re
 import string
 VAR_CHARS = string.letters + string.digits + '_'
 
+#the tokens of expr_split: a name, a string with the name characters that
+#follow it (the string may be open to the end), or any other character
+_var_char = '[%s]' % re.escape(VAR_CHARS)
+_tokenizer = re.compile(r"""%s+|'[^']*(?:'%s*)?|"[^"]*(?:"%s*)?|.""" % ((_var_char,)*3), re.S)
+
 class graph(object):
     """
     Simple graph structure held in a dictionary.
+    The reverse edges are kept too, so nodes are removed in O(degree).
     """
 
-    def __init__(self): self._graph = dict()
+    def __init__(self):
+        self._graph = dict()
+        self._sources = dict()
 
     def __str__(self): return str(self._graph)
 
     def add_node(self, node_key):
         if self._graph.has_key(node_key): return
         self._graph[node_key] = set()
+        self._sources.setdefault(node_key, set())
 
     def remove_node(self, node_key):
         if not self._graph.has_key(node_key): return
-        for edges in self._graph.values():
-            if node_key in edges: edges.remove(node_key)
-        self._graph.pop(node_key)
+        for src in self._sources.pop(node_key, ()):
+            self._graph[src].discard(node_key)
+        for dest in self._graph.pop(node_key):
+            self._sources[dest].discard(node_key)
 
     def add_edge(self, src_node_key, dest_node_key):
         self._graph[src_node_key].add(dest_node_key)
+        self._sources.setdefault(dest_node_key, set()).add(src_node_key)
 
     def remove_edge(self, src_node_key, dest_node_key):
         self._graph[src_node_key].remove(dest_node_key)
+        self._sources[dest_node_key].discard(src_node_key)
 
     def get_nodes(self): return self._graph.keys()
 
     def get_edges(self, node_key): return self._graph[node_key]
 
+    def get_sources(self, node_key): return self._sources.get(node_key, set())
+
 def expr_split(expr):
     """
     Split up an expression by non alphanumeric characters, including underscore.
@@ -61,23 +76,20 @@ def expr_split(expr):
     Returns:
         a list of string tokens that form expr
     """
-    toks = list()
-    tok = ''
-    quote = ''
-    for char in expr:
-        if quote or char in VAR_CHARS:
-            if char == quote: quote = ''
-            tok += char
-        elif char in ("'", '"'):
-            toks.append(tok)
-            tok = char
-            quote = char
-        else:
-            toks.append(tok)
-            toks.append(char)
-            tok = ''
-    toks.append(tok)
-    return filter(lambda t: t, toks)
+    return _tokenizer.findall(expr)
+
+def get_names(expr):
+    """
+    Get the names used in an expression, that is,
+    the tokens of expr_split outside of strings.
+
+    Args:
+        expr: an expression string
+
+    Returns:
+        a set of names
+    """
+    return set(tok for tok in _tokenizer.findall(expr) if tok[0] in VAR_CHARS)
 
 def expr_replace(expr, replace_dict):
     """
@@ -107,8 +119,25 @@ def get_variable_dependencies(expr, vars):
     Returns:
         a subset of vars used in the expression
     """
-    expr_toks = expr_split(expr)
-    return set(filter(lambda v: v in expr_toks, vars))
+    return get_names(expr).intersection(vars)
+
+def get_dependency_index(items, vars):
+    """
+    Map each variable to the items with an expression using it.
+    Each expression is only tokenized once.
+
+    Args:
+        items: an iterable of (item, expression) pairs
+        vars: a list of variable names
+
+    Returns:
+        a dict of variable name to the list of items using it, in order
+    """
+    index = dict((var, list()) for var in vars)
+    for item, expr in items:
+        for name in get_names(expr):
+            if name in index: index[name].append(item)
+    return index
 
 def get_graph(exprs):
     """
@@ -120,15 +149,38 @@ def get_graph(exprs):
     Returns:
         a graph of variable deps
     """
-    vars = exprs.keys()
     #get dependencies for each expression, load into graph
     var_graph = graph()
-    for var in vars: var_graph.add_node(var)
-    for var, expr in exprs.iteritems():
-        for dep in get_variable_dependencies(expr, vars):
+    for var in exprs: var_graph.add_node(var)
+    for dep, vars in get_dependency_index(exprs.iteritems(), exprs).iteritems():
+        for var in vars:
             if dep != var: var_graph.add_edge(dep, var)
     return var_graph
 
+def get_dependents(exprs, changed):
+    """
+    Get the variables affected by a change to some other variables.
+    Changed variables that no longer exist in exprs are still followed.
+
+    Args:
+        exprs: a mapping of variable name to expression
+        changed: a set of changed, added, or removed variable names
+
+    Returns:
+        a set of variable names, including the changed ones
+    """
+    nodes = dict(exprs)
+    for var in changed: nodes.setdefault(var, '')
+    index = get_dependency_index(nodes.iteritems(), nodes)
+    dependents = set(changed)
+    stack = list(changed)
+    while stack:
+        for var in index[stack.pop()]:
+            if var in dependents: continue
+            dependents.add(var)
+            stack.append(var)
+    return dependents
+
 def sort_variables(exprs):
     """
     Get a list of variables in order of dependencies.
@@ -141,16 +193,22 @@ def sort_variables(exprs):
     @throws Exception circular dependencies
     """
     var_graph = get_graph(exprs)
+    #count the dependents left of each variable (kahn's algorithm on the reversed graph)
+    num_edges = dict((var, len(var_graph.get_edges(var))) for var in var_graph.get_nodes())
+    indep_vars = [var for var, n in num_edges.iteritems() if not n]
     sorted_vars = list()
     #determine dependency order
-    while var_graph.get_nodes():
-        #get a list of nodes with no edges
-        indep_vars = filter(lambda var: not var_graph.get_edges(var), var_graph.get_nodes())
-        if not indep_vars: raise Exception('circular dependency caught in sort_variables')
+    while indep_vars:
         #add the indep vars to the end of the list
         sorted_vars.extend(sorted(indep_vars))
-        #remove each edge-less node from the graph
-        for var in indep_vars: var_graph.remove_node(var)
+        #the vars whose last dependent was just added are next
+        next_vars = list()
+        for var in indep_vars:
+            for dep in var_graph.get_sources(var):
+                num_edges[dep] -= 1
+                if not num_edges[dep]: next_vars.append(dep)
+        indep_vars = next_vars
+    if len(sorted_vars) < len(num_edges): raise Exception('circular dependency caught in sort_variables')
     return reversed(sorted_vars)
 
 def sort_objects(objects, get_id, get_expr):
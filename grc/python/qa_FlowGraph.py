@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+import unittest
+
+try:
+    from grc.python.FlowGraph import FlowGraph, _eval_cache
+except ImportError:
+    from gnuradio.grc.python.FlowGraph import FlowGraph, _eval_cache
+
+class fake_element(object):
+    """A variable or parameter block with an id and a value."""
+
+    def __init__(self, id, value):
+        self._id = id
+        self._value = value
+
+    def get_id(self): return self._id
+    def get_var_value(self): return self._value
+    def get_param(self, key): return self
+    def to_code(self): return self._value
+
+class namespace_flow_graph(FlowGraph):
+    """
+    Just the evaluation namespace of a flow graph,
+    with the imports, parameters, and variables (in dependency order) given.
+    """
+
+    def __init__(self, imports, parameters, variables):
+        self.imports = imports
+        self.parameters = parameters
+        self.variables = variables
+        self._eval_cache = _eval_cache(100)
+        self._eval_state = None
+        self._eval_stats = None
+        self.n = dict()
+        self.n_hash = None
+
+    def get_imports(self): return list(self.imports)
+    def get_parameters(self): return list(self.parameters)
+    def get_variables(self): return list(self.variables)
+
+    def namespace(self):
+        return dict((k, v) for k, v in self.n.iteritems() if k != '__builtins__')
+
+class test_renew_namespace(unittest.TestCase):
+
+    def setUp(self):
+        self.fg = namespace_flow_graph(
+            ['import math'], [fake_element('samp_rate', '32000')], [
+                fake_element('a', '1'),
+                fake_element('b', 'a + 1'),
+                fake_element('math', '2'), #hides the import
+                fake_element('samp_rate', '8000'), #hides the parameter
+                fake_element('c', 'str(math) + str(b) + str(samp_rate)'),
+            ])
+        self.fg._renew_namespace()
+
+    def assertRenewed(self, evaluated):
+        """Renew the namespace, and compare it with one built from scratch."""
+        fg = self.fg
+        fg._renew_namespace()
+        self.assertEqual(fg.get_eval_stats()['evaluated'], evaluated)
+        full = namespace_flow_graph(fg.imports, fg.parameters, fg.variables)
+        full._renew_namespace()
+        self.assertEqual(fg.namespace(), full.namespace())
+
+    def find(self, id):
+        return [v.get_id() for v in self.fg.variables].index(id)
+
+    def test_001_change(self):
+        self.fg.variables[self.find('a')] = fake_element('a', '5')
+        self.assertRenewed(3)
+        self.assertEqual(self.fg.n['c'], '2' + '6' + '8000')
+        self.assertRenewed(0)
+
+    def test_002_add(self):
+        self.fg.variables.append(fake_element('d', 'c * 2'))
+        self.assertRenewed(1)
+        self.fg.variables.append(fake_element('e', 'samp_rate / 2'))
+        self.assertRenewed(1)
+
+    def test_003_remove(self):
+        del self.fg.variables[self.find('math')]
+        self.assertRenewed(1)
+        self.assertTrue(self.fg.n['c'].startswith("<module 'math'"))
+        del self.fg.variables[self.find('samp_rate')]
+        self.assertRenewed(1)
+        self.assertEqual(self.fg.n['samp_rate'], 32000)
+        del self.fg.variables[self.find('b')]
+        self.assertRenewed(1)
+        self.assertFalse('b' in self.fg.n or 'c' in self.fg.n)
+
+    def test_004_rename(self):
+        self.fg.variables[self.find('math')] = fake_element('m', '2')
+        self.assertRenewed(2)
+        self.assertEqual(self.fg.n['m'], 2)
+        self.fg.variables[self.find('m')] = fake_element('math', '3')
+        self.assertRenewed(2)
+        self.assertEqual(self.fg.n['math'], 3)
+
+class test_eval_cache(unittest.TestCase):
+
+    def test_001_hits(self):
+        cache = _eval_cache(10)
+        made = list()
+        def make(value):
+            made.append(value)
+            return value
+        self.assertEqual(cache.get('a', lambda: make(1)), 1)
+        self.assertEqual(cache.get('a', lambda: make(2)), 1)
+        self.assertEqual(cache.get('b', lambda: make(3)), 3)
+        self.assertEqual(made, [1, 3])
+        self.assertEqual((len(cache), cache.hits, cache.misses), (2, 1, 2))
+
+    def test_002_least_recently_used(self):
+        cache = _eval_cache(8)
+        for key in range(8): cache.get(key, lambda: key)
+        for key in (0, 2, 4, 6): cache.get(key, lambda: None)
+        #full: the quarter of the entries used least recently are dropped
+        cache.get(8, lambda: 8)
+        self.assertEqual(sorted(cache._entries), [0, 2, 4, 5, 6, 7, 8])
+        self.assertEqual(cache.get(1, lambda: 'new'), 'new')
+
+if __name__ == '__main__':
+    unittest.main()
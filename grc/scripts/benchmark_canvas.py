@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+"""
+Time the canvas of a generated flow graph the way the former implementation
+worked and the way it works now: a click that selects a block, a drag step
+of a block, and a mouse over a port with auto hidden port labels. Before,
+every element is tested for the click, and a drag or mouse over step creates
+the shapes of all elements and draws all of them. Now, the element index
+finds the elements at the click, and a step updates the touched elements and
+draws the area they left and entered. The update of all labels is timed with
+and without the kept label pixmaps. Needs a display.
+"""
+
+from optparse import OptionParser
+from benchmark_elements import make_flow_graph, best_time
+
+def drawing_area_of(flow_graph):
+    """
+    Put the flow graph on an offscreen drawing area and note the queued draws.
+    """
+    import gtk
+    from gnuradio.grc.gui.DrawingArea import DrawingArea
+    window = gtk.OffscreenWindow()
+    drawing_area = DrawingArea(flow_graph)
+    window.add(drawing_area)
+    window.show_all()
+    drawing_area.queued = list()
+    drawing_area.queue_draw_area = lambda *area: drawing_area.queued.append(area)
+    flow_graph.drawing_area = drawing_area
+    flow_graph.update()
+    return drawing_area
+
+if __name__ == "__main__":
+    parser = OptionParser(usage='usage: %prog [options]')
+    parser.add_option('-n', '--num-blocks', type='int', default=500,
+                      help='number of blocks in the chain [default=%default]')
+    parser.add_option('-v', '--num-variables', type='int', default=50,
+                      help='number of variables [default=%default]')
+    parser.add_option('-r', '--repeat', type='int', default=20,
+                      help='number of timed runs, the best is shown [default=%default]')
+    (options, args) = parser.parse_args()
+
+    from gnuradio.grc.python.Platform import Platform
+    from gnuradio.grc.gui import Actions
+    platform = Platform()
+    flow_graph = make_flow_graph(platform, options.num_blocks, options.num_variables)
+    drawing_area = drawing_area_of(flow_graph)
+    gc = drawing_area.window.new_gc()
+    pixmap = drawing_area.new_pixmap(*flow_graph.get_size())
+    block = flow_graph.get_blocks()[len(flow_graph.get_blocks())/2]
+    port = block.get_sinks_gui()[0]
+    (x, y), (w, h) = port._areas_list[0]
+    X, Y = block.get_coordinate()
+    port_coor = (X + x + w/2, Y + y + h/2)
+    click_coor = (X + block.W/2, Y + block.H/2)
+
+    def draw_queued():
+        for x, y, w, h in drawing_area.queued: flow_graph.draw(gc, pixmap, (x, y, w, h))
+        drawing_area.queued = list()
+
+    def select_before():
+        elements = set(flow_graph.get_elements())
+        flow_graph._get_elements_at = lambda coor, coor_m=None: elements
+        try: flow_graph.what_is_selected(click_coor)
+        finally: del flow_graph._get_elements_at
+    def select_after(): flow_graph.what_is_selected(click_coor)
+
+    def drag_before():
+        for delta in ((8, 8), (-8, -8)):
+            block.move(delta)
+            flow_graph.create_shapes()
+            flow_graph.draw(gc, pixmap)
+    def drag_after():
+        flow_graph._selected_elements = [block]
+        for delta in ((8, 8), (-8, -8)):
+            flow_graph.move_selected(delta)
+            draw_queued()
+        flow_graph.unselect()
+
+    def hover_before():
+        for coor in (port_coor, click_coor):
+            flow_graph.handle_mouse_motion(coor)
+            drawing_area.queued = list()
+            flow_graph.create_shapes()
+            flow_graph.draw(gc, pixmap)
+    def hover_after():
+        for coor in (port_coor, click_coor):
+            flow_graph.handle_mouse_motion(coor)
+            draw_queued()
+
+    def update_before():
+        for block in flow_graph.get_blocks():
+            block._label_key = None
+            for port in block.get_ports_gui(): port._label_key = None
+        flow_graph.update()
+    def update_after(): flow_graph.update()
+
+    #hide the port labels without saving it to the preferences
+    Actions.TOGGLE_AUTO_HIDE_PORT_LABELS.get_active = lambda: True
+    print '%-20s %7s %10s %10s %8s' % ('test', 'blocks', 'before (s)', 'after (s)', 'speedup')
+    for name, before, after in (
+        ('select', select_before, select_after),
+        ('drag', drag_before, drag_after),
+        ('mouse over port', hover_before, hover_after),
+        ('update', update_before, update_after),
+    ):
+        before()
+        before_time = best_time(before, options.repeat)
+        after()
+        after_time = best_time(after, options.repeat)
+        print '%-20s %7d %10.4f %10.4f %7.1fx' % (
+            name, len(flow_graph.get_blocks()), before_time, after_time, before_time/after_time)
+    del Actions.TOGGLE_AUTO_HIDE_PORT_LABELS.get_active
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+"""
+Time the rewrite and validate, and the draw when a display is available,
+of a generated flow graph with the indexed lookup of params, ports, and
+blocks, the cached block and connection lists, and the params indexed by
+type, and without them, as the former implementation did: a linear search
+per lookup and new lists on every call.
+"""
+
+import time
+from optparse import OptionParser
+
+def linear_find(self, key):
+    for elem in self:
+        if elem.get_key() == key: return elem
+    return None
+
+def fresh_index(self):
+    return dict((elem.get_key(), elem) for elem in reversed(self))
+
+def uncached(self, name, make): return make()
+
+def former_get_all_params(self, type):
+    return sum([filter(lambda p: p.get_type() == type, block.get_params()) for block in self.get_parent().get_parent().get_enabled_blocks()], [])
+
+def make_flow_graph(platform, num_blocks, num_variables):
+    """
+    A chain of multiply const blocks between a signal source and a null sink,
+    the constants given by variables.
+    """
+    flow_graph = platform.get_new_flow_graph()
+    flow_graph.import_data()
+    for i in range(num_variables):
+        block = flow_graph.get_new_block('variable')
+        block.get_param('id').set_value('k_%d'%i)
+        block.get_param('value').set_value('%d'%(i + 1))
+    chain = [flow_graph.get_new_block('analog_sig_source_x')]
+    for i in range(num_blocks - 2):
+        block = flow_graph.get_new_block('blocks_multiply_const_vxx')
+        block.get_param('id').set_value('mult_%d'%i)
+        block.get_param('const').set_value('k_%d'%(i % max(1, num_variables)))
+        chain.append(block)
+    chain.append(flow_graph.get_new_block('blocks_null_sink'))
+    for i, block in enumerate(chain):
+        block.get_param('_coordinate').set_value(str((20 + 200*(i % 20), 20 + 100*(i / 20))))
+    flow_graph.rewrite()
+    for source_block, sink_block in zip(chain, chain[1:]):
+        flow_graph.connect(source_block.get_sources()[0], sink_block.get_sinks()[0])
+    return flow_graph
+
+def make_drawable(flow_graph):
+    """
+    Put the flow graph on an offscreen drawing area.
+    Returns a function to draw it, or None without a display.
+    """
+    try:
+        import gtk
+        from gnuradio.grc.gui.DrawingArea import DrawingArea
+        window = gtk.OffscreenWindow()
+    except Exception: return None
+    drawing_area = DrawingArea(flow_graph)
+    window.add(drawing_area)
+    window.show_all()
+    flow_graph.drawing_area = drawing_area
+    flow_graph.update()
+    gc = drawing_area.window.new_gc()
+    pixmap = drawing_area.new_pixmap(*flow_graph.get_size())
+    return lambda: flow_graph.draw(gc, pixmap)
+
+def best_time(func, repeat):
+    """The best time of repeat calls."""
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+if __name__ == "__main__":
+    parser = OptionParser(usage='usage: %prog [options]')
+    parser.add_option('-n', '--num-blocks', type='int', default=500,
+                      help='number of blocks in the chain [default=%default]')
+    parser.add_option('-v', '--num-variables', type='int', default=50,
+                      help='number of variables [default=%default]')
+    parser.add_option('-r', '--repeat', type='int', default=5,
+                      help='number of timed runs, the best is shown [default=%default]')
+    (options, args) = parser.parse_args()
+
+    from gnuradio.grc.python.Platform import Platform
+    from gnuradio.grc.base.FlowGraph import FlowGraph
+    from gnuradio.grc.base.element_list import keyed_list
+    from gnuradio.grc.python.Param import Param
+    indexed = (keyed_list.find.im_func, keyed_list.get_index.im_func,
+               FlowGraph._get_cached.im_func, Param.get_all_params.im_func)
+    platform = Platform()
+    flow_graph = make_flow_graph(platform, options.num_blocks, options.num_variables)
+    draw = make_drawable(flow_graph)
+
+    def update():
+        flow_graph.rewrite()
+        flow_graph.validate()
+    tests = [('rewrite+validate', update)]
+    if draw is not None: tests.append(('draw', draw))
+    else: print 'no display, draw not timed'
+
+    print '%-20s %7s %10s %10s %8s' % ('test', 'blocks', 'before (s)', 'after (s)', 'speedup')
+    for name, func in tests:
+        func()
+        try:
+            (keyed_list.find, keyed_list.get_index, FlowGraph._get_cached, Param.get_all_params) = \
+                (linear_find, fresh_index, uncached, former_get_all_params)
+            before = best_time(func, options.repeat)
+        finally:
+            keyed_list.find, keyed_list.get_index, FlowGraph._get_cached, Param.get_all_params = indexed
+        after = best_time(func, options.repeat)
+        print '%-20s %7d %10.4f %10.4f %7.1fx' % (
+            name, len(flow_graph.get_blocks()), before, after, before/after)
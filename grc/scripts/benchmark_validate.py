@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Copyright 2014 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+"""
+Time the rewrite and validate of saved flow graphs, as done on every
+edit in the GUI, with the cached templates of Block.resolve_dependencies
+and with the former implementation that made a new cheetah template on
+every call.
+"""
+
+import time
+from optparse import OptionParser
+
+from Cheetah.Template import Template
+
+def uncached_resolve_dependencies(self, tmpl):
+    from gnuradio.grc.base.Block import TemplateArg
+    tmpl = str(tmpl)
+    if '$' not in tmpl: return tmpl
+    n = dict((p.get_key(), TemplateArg(p)) for p in self.get_params())
+    try:
+        return str(Template(tmpl, n))
+    except Exception as err:
+        return "Template error: %s\n    %s" % (tmpl, err)
+
+def time_update(flow_graph, repeat):
+    """The best time of repeat rewrites and validates."""
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        flow_graph.rewrite()
+        flow_graph.validate()
+        elapsed = time.time() - start
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+if __name__ == "__main__":
+    parser = OptionParser(usage='usage: %prog [options] flow_graph.grc...')
+    parser.add_option('-r', '--repeat', type='int', default=5,
+                      help='number of timed runs, the best is shown [default=%default]')
+    (options, args) = parser.parse_args()
+    if not args: parser.error('no flow graph given')
+
+    from gnuradio.grc.python.Platform import Platform
+    from gnuradio.grc.base.Block import Block
+    cached_resolve_dependencies = Block.resolve_dependencies.im_func
+    platform = Platform()
+
+    print '%-40s %7s %10s %10s %8s' % ('flow graph', 'blocks', 'before (s)', 'after (s)', 'speedup')
+    for flow_graph_file in args:
+        flow_graph = platform.get_new_flow_graph()
+        flow_graph.import_data(platform.parse_flow_graph(flow_graph_file))
+        flow_graph.rewrite()
+        flow_graph.validate()
+        try:
+            Block.resolve_dependencies = uncached_resolve_dependencies
+            before = time_update(flow_graph, options.repeat)
+        finally:
+            Block.resolve_dependencies = cached_resolve_dependencies
+        after = time_update(flow_graph, options.repeat)
+        print '%-40s %7d %10.4f %10.4f %7.1fx' % (
+            flow_graph_file[-40:], len(flow_graph.get_blocks()), before, after, before/after)
@@ -23,6 +23,8 @@ import os
 import re
 import sys
 import glob
+import hashlib
+import cPickle
 
 ########################################################################
 # Strip comments from a c/cpp file.
@@ -119,7 +121,8 @@ def flatten_section_text(sections):
 class impl_class:
     def __init__(self, kern_name, header, body):
         #extract LV_HAVE_*
-        self.deps = set(map(str.lower, re.findall('LV_HAVE_(\w+)', header)))
+        self._dep_names = map(str.lower, re.findall('LV_HAVE_(\w+)', header))
+        self.deps = set(self._dep_names)
         #extract function suffix and args
         body = flatten_section_text(body)
         try:
@@ -141,6 +144,11 @@ class impl_class:
         assert self.name
         self.is_aligned = self.name.startswith('a_')
 
+    def __setstate__(self, state):
+        #rebuild the set as parsed, an unpickled set may iterate in another order
+        self.__dict__.update(state)
+        self.deps = set(self._dep_names)
+
     def __repr__(self):
         return self.name
 
@@ -197,13 +205,49 @@ class kernel_class:
     def __repr__(self):
         return self.name
 
+########################################################################
+# Parse the kernels, reusing the parsed kernels of unchanged files
+# from the cache file, which holds the sha1 of this parser and a map
+# of file name to (sha1, kernel); a cache from another parser is unused
+########################################################################
+def load_kernels(kernel_files, cache_file=None):
+    cache = dict()
+    if cache_file:
+        try:
+            cached_parser_sha1, cache = cPickle.load(open(cache_file, 'rb'))
+            if cached_parser_sha1 != parser_sha1: cache = dict()
+        except Exception: cache = dict()
+    kernels = list()
+    new_cache = dict()
+    for kernel_file in kernel_files:
+        sha1 = hashlib.sha1(open(kernel_file, 'rb').read()).hexdigest()
+        try:
+            cached_sha1, kernel = cache[kernel_file]
+            if cached_sha1 != sha1: raise KeyError
+        except (KeyError, ValueError, TypeError):
+            kernel = kernel_class(kernel_file)
+        new_cache[kernel_file] = (sha1, kernel)
+        kernels.append(kernel)
+    if cache_file and new_cache != cache:
+        #write then rename so a concurrent reader never sees half a cache
+        tmp_file = '%s.%d'%(cache_file, os.getpid())
+        cPickle.dump((parser_sha1, new_cache), open(tmp_file, 'wb'), cPickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_file, cache_file)
+    return kernels
+
 ########################################################################
 # Extract information from the VOLK kernels
 ########################################################################
 __file__ = os.path.abspath(__file__)
 srcdir = os.path.dirname(os.path.dirname(__file__))
 kernel_files = glob.glob(os.path.join(srcdir, "kernels", "volk", "*.h"))
-kernels = map(kernel_class, kernel_files)
+parser_sha1 = hashlib.sha1(open(os.path.splitext(__file__)[0] + '.py', 'rb').read()).hexdigest()
+
+__kernels = dict()
+def get_kernels(cache_file=None):
+    if cache_file not in __kernels:
+        __kernels[cache_file] = load_kernels(kernel_files, cache_file)
+    return __kernels[cache_file]
 
 if __name__ == '__main__':
-    print kernels
+    print get_kernels()
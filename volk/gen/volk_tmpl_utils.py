@@ -44,31 +44,49 @@ def __escape_pre_processor(code):
         out.append(line)
     return '\n'.join(out)
 
-def __parse_tmpl(_tmpl, **kwargs):
+__tmpl_classes = dict()
+
+def __parse_tmpl(_tmpl, kernel_cache=None, **kwargs):
     defs = {
         'archs': volk_arch_defs.archs,
         'arch_dict': volk_arch_defs.arch_dict,
         'machines': volk_machine_defs.machines,
         'machine_dict': volk_machine_defs.machine_dict,
-        'kernels': volk_kernel_defs.kernels,
+        'kernels': volk_kernel_defs.get_kernels(kernel_cache),
     }
     defs.update(kwargs)
-    _tmpl = __escape_pre_processor(_tmpl)
-    _tmpl = """
+    #compile each template once, the machine template is rendered per machine
+    if _tmpl not in __tmpl_classes:
+        __tmpl_classes[_tmpl] = Template.Template.compile(__escape_pre_processor(_tmpl))
+    return """
 
 /* this file was generated by volk template utils, do not edit! */
 
-""" + _tmpl
-    return str(Template.Template(_tmpl, defs))
+""" + str(__tmpl_classes[_tmpl](searchList=[defs]))
+
+def __write(output, path):
+    if path: open(path, 'w').write(output)
+    else: print output
 
 def main():
     parser = optparse.OptionParser()
     parser.add_option('--input', type='string')
     parser.add_option('--output', type='string')
+    parser.add_option('--batch', type='string',
+        help='file with a tab separated "input output args..." line per template')
+    parser.add_option('--kernel-cache', type='string',
+        help='file caching the parsed kernels by kernel file hash')
     (opts, args) = parser.parse_args()
 
-    output = __parse_tmpl(open(opts.input).read(), args=args)
-    if opts.output: open(opts.output, 'w').write(output)
-    else: print output
+    if opts.batch:
+        for line in open(opts.batch).read().splitlines():
+            if not line.strip(): continue
+            fields = line.split('\t')
+            output = __parse_tmpl(open(fields[0]).read(), opts.kernel_cache, args=fields[2:])
+            __write(output, fields[1])
+        return
+
+    output = __parse_tmpl(open(opts.input).read(), opts.kernel_cache, args=args)
+    __write(output, opts.output)
 
 if __name__ == '__main__': main()